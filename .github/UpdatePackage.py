@@ -12,6 +12,8 @@ print(project_root)
 sys.path.append(project_root.as_posix())
 
 from functions.webFunc import *
+from functions.dowloads.delta_dow import build_manifest
+from functions.dowloads.segment_dow import build_checksum
 
 ADDRESS = "FaustLauncher"
 API_URL = "https://api.txttool.cn/netcut/note"
@@ -277,12 +279,26 @@ def main():
             print("LLC文件上传失败，取消更新")
             return
         
+        # 生成增量更新清单, 启动器据此只下载有变化的文件
+        manifest_name = f"LimbusLocalize_{new_llc_version}.manifest.json"
+        with open(manifest_name, "w", encoding="utf-8") as f:
+            json.dump(build_manifest(zip_asset.name, new_llc_version), f, ensure_ascii=False)
+        manifest_upload_result = file_transfer.upload(manifest_name)
+        if manifest_upload_result.get('success'):
+            current_data['llc_manifest'] = {'direct': manifest_upload_result.get('direct_download_url'),
+                                            'version': new_llc_version}
+        else:
+            print("增量更新清单上传失败, 启动器将下载完整压缩包")
+            current_data.pop('llc_manifest', None)
+        
         new_llc_mirror = {
             'zip': {'direct': llc_upload_result.get('direct_download_url'),
                     'web': llc_upload_result.get('download_url')},
             'seven': {'direct': llc_seven_upload_result.get('direct_download_url'),
                       'web': llc_seven_upload_result.get('download_url')}
         }
+        # 发布 7z 的大小与分块 sha256, 启动器下载时边下载边校验
+        current_data['llc_checksum'] = dict(build_checksum(seven_zip_asset.name), version=new_llc_version)
         current_data['llc_download_url'] = new_llc_download_url
         current_data['llc_download_mirror'] = new_llc_mirror
         current_data['llc_version'] = new_llc_version
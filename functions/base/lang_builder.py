@@ -0,0 +1,521 @@
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 构建格式版本, 变换逻辑改变时递增以使旧的构建缓存失效
+BUILD_VERSION = 1
+MANIFEST_PATH = "cache/lang_build_manifest.json"
+
+
+def apply_changes_to_data(original_data, changes):
+    """递归应用修改到数据 - 适配新的修改记录结构（包含id）"""
+
+    if isinstance(original_data, dict) and isinstance(changes, dict):
+        result = {}
+        for key, value in original_data.items():
+            if key in changes:
+                # 如果changes中有对应的键，应用修改
+                if isinstance(value, (dict, list)) and isinstance(changes[key], (dict, list)):
+                    result[key] = apply_changes_to_data(value, changes[key])
+                else:
+                    result[key] = changes[key]
+            else:
+                result[key] = value
+        return result
+    elif isinstance(original_data, list) and isinstance(changes, list):
+        result = []
+
+        # 检查是否是包含id的字典列表的特殊修改记录
+        if (len(original_data) > 0 and isinstance(original_data[0], dict) and
+            'id' in original_data[0] and len(changes) > 0 and
+            isinstance(changes[0], dict) and 'id' in changes[0]):
+
+            # 对于包含id的字典列表，根据id进行匹配修改
+            original_dict = {item['id']: item for item in original_data if 'id' in item}
+
+            for change_item in changes:
+                if isinstance(change_item, dict) and 'id' in change_item:
+                    change_id = change_item['id']
+
+                    if change_id in original_dict:
+                        # 找到对应的原始项
+                        original_item = original_dict[change_id]
+
+                        if 'action' in change_item:
+                            # 处理特殊操作
+                            if change_item['action'] == 'deleted':
+                                # 删除项，不添加到结果中
+                                continue
+                            elif change_item['action'] == 'added':
+                                # 新增项，直接添加到结果中
+                                result.append(change_item.get('changes', change_item))
+                                continue
+
+                        # 应用修改
+                        if 'changes' in change_item:
+                            # 有具体的修改内容
+                            modified_item = apply_changes_to_data(original_item, change_item['changes'])
+                            result.append(modified_item)
+                        else:
+                            # 没有具体修改内容，使用原始项
+                            result.append(original_item)
+                    else:
+                        # 新增项（id不在原始数据中）
+                        if 'action' in change_item and change_item['action'] == 'added':
+                            result.append(change_item.get('changes', change_item))
+                        else:
+                            # 未知情况，保留原始项
+                            result.append(original_dict.get(change_id, change_item))
+
+            # 添加未被修改的原始项
+            changed_ids = {item['id'] for item in changes if isinstance(item, dict) and 'id' in item}
+            for original_item in original_data:
+                if isinstance(original_item, dict) and 'id' in original_item:
+                    if original_item['id'] not in changed_ids:
+                        result.append(original_item)
+                else:
+                    # 对于不包含id的项，直接添加
+                    result.append(original_item)
+
+            return result
+        else:
+            # 对于普通的列表，使用原来的逻辑
+            for i, item in enumerate(original_data):
+                if i < len(changes):
+                    if isinstance(item, (dict, list)) and isinstance(changes[i], (dict, list)):
+                        result.append(apply_changes_to_data(item, changes[i]))
+                    else:
+                        result.append(changes[i])
+                else:
+                    result.append(item)
+            return result
+    else:
+        return original_data
+
+
+def hash_file(file_path: str) -> str:
+    """计算文件内容的 sha256"""
+    sha = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def copy_if_changed(source_path: str, target_path: str) -> str:
+    """仅当目标文件大小或修改时间与源文件不同时才复制, 可作为 copytree 的 copy_function"""
+    try:
+        src_stat = os.stat(source_path)
+        dst_stat = os.stat(target_path)
+        if src_stat.st_size == dst_stat.st_size and int(src_stat.st_mtime) == int(dst_stat.st_mtime):
+            return target_path
+    except OSError:
+        pass
+    return shutil.copy2(source_path, target_path)
+
+
+class LangTransform:
+    """
+    汉化文件变换
+    match(path, params) 根据相对路径判断是否处理该文件,
+    apply(path, data, params) 在内存中修改已解析的json数据并返回结果,
+    key(path, params) 返回影响该文件输出的设置(可json序列化), 用于增量构建的缓存键, 默认为 params.
+    三个函数都必须是模块级函数, 以便传递给构建进程池.
+    输出每次都不同(如随机选取)的变换应设置 cacheable=False, 匹配的文件每次构建都会重新生成.
+    """
+
+    def __init__(self, name: str, match: Callable[[str, Any], bool], apply: Callable[[str, Any, Any], Any],
+                 params: Any = None, key: Optional[Callable[[str, Any], Any]] = None, cacheable: bool = True) -> None:
+        self.name = name
+        self.match_func = match
+        self.apply_func = apply
+        self.params = params
+        self.key_func = key
+        self.cacheable = cacheable
+
+    def match(self, relative_path: str) -> bool:
+        return self.match_func(relative_path, self.params)
+
+    def apply(self, relative_path: str, data: Any) -> Any:
+        return self.apply_func(relative_path, data, self.params)
+
+    def key(self, relative_path: str) -> Any:
+        if self.key_func:
+            return self.key_func(relative_path, self.params)
+        return self.params
+
+
+def transform_file(source_path: str, relative_path: str, transforms: List[LangTransform]) -> Tuple[str, List[str]]:
+    """读取并解析文件, 依次执行变换, 返回序列化后的文本和错误信息"""
+    errors = []
+    with open(source_path, 'r', encoding='utf-8-sig') as f:
+        data = json.load(f)
+
+    for transform in transforms:
+        try:
+            data = transform.apply(relative_path, data)
+        except Exception as e:
+            errors.append(f"处理文件 {relative_path} 时 {transform.name} 失败: {e}")
+
+    return json.dumps(data, ensure_ascii=False), errors
+
+
+# 构建进程中的变换列表, 由进程池的 initializer 设置, 避免每个任务重复传递
+_worker_transforms: List[LangTransform] = []
+
+
+def _init_worker(transforms: List[LangTransform]) -> None:
+    global _worker_transforms
+    _worker_transforms = transforms
+
+
+def _transform_worker(task: Tuple[str, str, List[int]]) -> Tuple[str, List[str]]:
+    source_path, relative_path, indexes = task
+    return transform_file(source_path, relative_path, [_worker_transforms[i] for i in indexes])
+
+
+class LangBuilder:
+    """
+    汉化构建器
+    每个文件只读取、解析一次, 在内存中依次执行所有匹配的变换, 最后只写出一次.
+    没有任何变换的文件直接复制, 不做解析.
+    构建清单记录每个文件的输入哈希(源文件, 生效的变换及其设置), 输入未改变的文件会被跳过.
+    """
+
+    def __init__(self, source_dir: str, target_dir: str, manifest_path: Optional[str] = MANIFEST_PATH,
+                 workers: int = 0) -> None:
+        """
+        初始化汉化构建器
+
+        Args:
+            source_dir: 汉化源目录, 如 lang/LLC_zh-CN
+            target_dir: 输出目录, 如 游戏目录/LimbusCompany_Data/Lang/LLC_zh-CN
+            manifest_path: 构建清单路径, 为 None 时每次都完整构建
+            workers: 执行变换的进程数, 0 表示使用CPU核心数, 1 表示在当前进程中执行
+        """
+        self.source_dir = source_dir
+        self.target_dir = target_dir
+        self.manifest_path = manifest_path
+        # 设置页的滑动条保存的是浮点数, 如 2.0
+        workers = int(workers or 0)
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.transforms: List[LangTransform] = []
+        self.manifest: Dict[str, Any] = {}
+
+    def add_transform(self, name: str, match: Callable[[str, Any], bool], apply: Callable[[str, Any, Any], Any],
+                      params: Any = None, key: Optional[Callable[[str, Any], Any]] = None, cacheable: bool = True) -> None:
+        """注册一个变换, 按注册顺序执行"""
+        self.transforms.append(LangTransform(name, match, apply, params, key, cacheable))
+
+    def get_transforms(self, relative_path: str) -> List[LangTransform]:
+        """获取对指定文件生效的变换"""
+        return [t for t in self.transforms if t.match(relative_path)]
+
+    def list_source_files(self) -> List[str]:
+        """列出源目录下所有文件的相对路径"""
+        files = []
+        for root, dirs, names in os.walk(self.source_dir):
+            for name in names:
+                files.append(os.path.relpath(os.path.join(root, name), self.source_dir))
+        return files
+
+    def load_manifest(self) -> Dict[str, Any]:
+        """读取构建清单, 版本或输出目录不一致时视为空清单"""
+        if not self.manifest_path or not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except Exception as e:
+            print(f"读取构建清单失败: {e}")
+            return {}
+
+        if manifest.get('version') != BUILD_VERSION or \
+                os.path.normpath(manifest.get('target_dir', '')) != os.path.normpath(self.target_dir):
+            return {}
+        return manifest.get('files', {})
+
+    def save_manifest(self, files: Dict[str, Any]) -> None:
+        """写入构建清单"""
+        if not self.manifest_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.manifest_path) or '.', exist_ok=True)
+            temp_path = self.manifest_path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': BUILD_VERSION, 'target_dir': self.target_dir, 'files': files}, f, ensure_ascii=False)
+            os.replace(temp_path, self.manifest_path)
+        except Exception as e:
+            print(f"保存构建清单失败: {e}")
+
+    def get_source_hash(self, relative_path: str, source_stat: os.stat_result) -> str:
+        """获取源文件哈希, 大小和修改时间未变时复用清单中的记录"""
+        entry = self.manifest.get(relative_path)
+        if entry and entry.get('source_size') == source_stat.st_size and \
+                entry.get('source_mtime') == source_stat.st_mtime_ns:
+            return entry['source_hash']
+        return hash_file(os.path.join(self.source_dir, relative_path))
+
+    def get_input_key(self, relative_path: str, source_hash: str, transforms: List[LangTransform]) -> str:
+        """计算文件的输入哈希: 源文件哈希 + 生效的变换及其设置"""
+        settings = [[t.name, t.key(relative_path)] for t in transforms]
+        payload = json.dumps([source_hash, settings], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def is_up_to_date(self, relative_path: str, input_key: str) -> bool:
+        """输入哈希未变且输出文件未被外部修改时, 无需重新构建"""
+        entry = self.manifest.get(relative_path)
+        if not entry or entry.get('input_key') != input_key:
+            return False
+        try:
+            target_stat = os.stat(os.path.join(self.target_dir, relative_path))
+        except OSError:
+            return False
+        return entry.get('target_size') == target_stat.st_size and entry.get('target_mtime') == target_stat.st_mtime_ns
+
+    def run_transforms(self, pending: List[Tuple[str, List[LangTransform]]]):
+        """
+        执行需要变换的文件, 按输入顺序逐个产出 (相对路径, 序列化文本, 错误信息).
+        文件数量足够时分发到进程池, 结果统一交回当前进程写出.
+        进程池不可用时, 剩余的文件在当前进程中处理.
+        """
+        workers = min(self.workers, len(pending))
+        done = 0
+        if workers > 1:
+            print(f"使用 {workers} 个进程处理 {len(pending)} 个文件")
+            tasks = [
+                (os.path.join(self.source_dir, relative_path), relative_path, [self.transforms.index(t) for t in transforms])
+                for relative_path, transforms in pending
+            ]
+            chunksize = max(1, len(tasks) // (workers * 4))
+            try:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self.transforms,)) as executor:
+                    for (relative_path, _), (text, errors) in zip(pending, executor.map(_transform_worker, tasks, chunksize=chunksize)):
+                        done += 1
+                        yield relative_path, text, errors
+            except Exception as e:
+                print(f"构建进程池出错, 改为在当前进程中处理剩余的 {len(pending) - done} 个文件: {e}")
+
+        for relative_path, transforms in pending[done:]:
+            text, errors = transform_file(os.path.join(self.source_dir, relative_path), relative_path, transforms)
+            yield relative_path, text, errors
+
+    def write_file(self, relative_path: str, text: Optional[str] = None) -> None:
+        """写出单个文件, text 为 None 时直接复制源文件"""
+        target_path = os.path.join(self.target_dir, relative_path)
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+
+        if text is None:
+            shutil.copyfile(os.path.join(self.source_dir, relative_path), target_path)
+            return
+
+        with open(target_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def build(self) -> bool:
+        """增量构建整个汉化目录"""
+        if not os.path.exists(self.source_dir):
+            print(f"汉化源目录不存在: {self.source_dir}")
+            return False
+
+        self.manifest = self.load_manifest()
+        files = self.list_source_files()
+        print(f"开始构建汉化文件, 共 {len(files)} 个文件, {len(self.transforms)} 个变换")
+
+        new_manifest = {}
+        inputs = {}
+        pending = []
+        built_count = 0
+        skipped_count = 0
+        failed_count = 0
+
+        def record(relative_path):
+            source_hash, source_stat, input_key = inputs[relative_path]
+            target_stat = os.stat(os.path.join(self.target_dir, relative_path))
+            new_manifest[relative_path] = {
+                'source_hash': source_hash,
+                'source_size': source_stat.st_size,
+                'source_mtime': source_stat.st_mtime_ns,
+                'input_key': input_key,
+                'target_size': target_stat.st_size,
+                'target_mtime': target_stat.st_mtime_ns,
+            }
+
+        for relative_path in files:
+            try:
+                source_stat = os.stat(os.path.join(self.source_dir, relative_path))
+                source_hash = self.get_source_hash(relative_path, source_stat)
+                transforms = self.get_transforms(relative_path) if relative_path.endswith('.json') else []
+                input_key = self.get_input_key(relative_path, source_hash, transforms)
+                inputs[relative_path] = (source_hash, source_stat, input_key)
+
+                if all(t.cacheable for t in transforms) and self.is_up_to_date(relative_path, input_key):
+                    skipped_count += 1
+                    record(relative_path)
+                elif transforms:
+                    pending.append((relative_path, transforms))
+                else:
+                    self.write_file(relative_path)
+                    built_count += 1
+                    record(relative_path)
+            except Exception as e:
+                failed_count += 1
+                print(f"构建文件 {relative_path} 时出错: {e}")
+
+        written = 0
+        try:
+            for relative_path, text, errors in self.run_transforms(pending):
+                written += 1
+                for error in errors:
+                    print(error)
+                try:
+                    self.write_file(relative_path, text)
+                    built_count += 1
+                    record(relative_path)
+                except Exception as e:
+                    failed_count += 1
+                    print(f"构建文件 {relative_path} 时出错: {e}")
+        except Exception as e:
+            failed_count += len(pending) - written
+            print(f"处理汉化文件时出错: {e}")
+
+        # 删除源目录中已不存在的旧输出
+        for relative_path in set(self.manifest) - set(new_manifest):
+            target_path = os.path.join(self.target_dir, relative_path)
+            if os.path.exists(target_path) and not os.path.exists(os.path.join(self.source_dir, relative_path)):
+                os.remove(target_path)
+
+        self.save_manifest(new_manifest)
+        print(f"汉化构建完成, 重新生成 {built_count} 个文件, 跳过 {skipped_count} 个未改变的文件"
+              + (f", {failed_count} 个文件出错" if failed_count else ""))
+        return True
+
+
+def load_changes(changes_file: str = "lang/changes.json") -> Dict[str, Any]:
+    """
+    读取 changes.json, 键转换为相对于 LLC_zh-CN 的路径
+    changes.json 中的键是相对于 lang 目录的路径, 如 LLC_zh-CN\\xxx.json
+    """
+    if not os.path.exists(changes_file):
+        print("没有找到changes.json文件，跳过自定义汉化修改")
+        return {}
+
+    with open(changes_file, 'r', encoding='utf-8') as f:
+        changes_data = json.load(f)
+
+    if not changes_data:
+        print("没有自定义汉化修改需要应用")
+        return {}
+
+    print(f"找到 {len(changes_data)} 个文件的修改记录")
+    changes = {}
+    for relative_path, file_changes in changes_data.items():
+        parts = os.path.normpath(relative_path.replace('\\', '/')).split(os.sep)
+        if parts and parts[0] == 'LLC_zh-CN':
+            parts = parts[1:]
+        changes[os.path.join(*parts)] = file_changes
+    return changes
+
+
+def _match_changes(path, changes):
+    return path in changes
+
+
+def _apply_changes(path, data, changes):
+    return apply_changes_to_data(data, changes[path])
+
+
+def _key_changes(path, changes):
+    return changes[path]
+
+
+def _match_bubble(path, gradient_rate):
+    from functions.fancy.dialog_colorful import BUBBLE_JSON_FILES
+    return path in BUBBLE_JSON_FILES
+
+
+def _apply_bubble(path, data, gradient_rate):
+    from functions.fancy.dialog_colorful import process_bubble_data
+    process_bubble_data(data, gradient_rate)
+    return data
+
+
+def _match_user_name(path, user_name):
+    return path == 'UserInfo_Friends.json'
+
+
+def _apply_user_name(path, data, user_name):
+    for item in data['dataList']:
+        if item['id'] == 'Uid_Copy':
+            item['content'] = f'{user_name}'
+    return data
+
+
+def _match_ego(path, params):
+    from functions.fancy.EGO_colorful import is_ego_file
+    return is_ego_file(path)
+
+
+def _apply_ego(path, data, params):
+    from functions.fancy.EGO_colorful import process_ego_data
+    process_ego_data(data)
+    return data
+
+
+def _match_skill(path, params):
+    from functions.fancy.skill_info import is_skill_file
+    return is_skill_file(path)
+
+
+def _apply_skill(path, data, params):
+    from functions.fancy.skill_info import handle_skill_strcture
+    return handle_skill_strcture(data)
+
+
+def _match_hint(path, loading_texts):
+    return path == 'BattleHint.json'
+
+
+def _apply_hint(path, data, loading_texts):
+    from functions.fancy.hint_set import replace_hint_data
+    replace_hint_data(data, loading_texts)
+    return data
+
+
+def create_lang_builder(settings_manager, source_dir: str, target_dir: str, changes: Optional[Dict[str, Any]] = None) -> LangBuilder:
+    """根据设置创建汉化构建器, 注册所有启用的变换, 执行顺序与原先的处理顺序一致"""
+    builder = LangBuilder(source_dir, target_dir, workers=int(settings_manager.get_setting('lang_build_workers') or 0))
+
+    # 自定义汉化修改
+    if changes is None:
+        changes = load_changes()
+    if changes:
+        builder.add_transform('changes', _match_changes, _apply_changes, changes, _key_changes)
+
+    # 气泡渐变色
+    if settings_manager.get_setting('enable_text_gradient'):
+        gradient_rate = settings_manager.get_setting('bubble_text_gradient_rate') or 0.5
+        builder.add_transform('bubble_gradient', _match_bubble, _apply_bubble, gradient_rate)
+
+    # 用户名称
+    if settings_manager.get_setting('enable_show_user_name'):
+        builder.add_transform('user_name', _match_user_name, _apply_user_name, settings_manager.get_setting('user_name'))
+
+    # EGO 样式美化
+    if settings_manager.get_setting('enable_ego_style'):
+        builder.add_transform('ego_style', _match_ego, _apply_ego)
+
+    # 技能描述美化
+    if settings_manager.get_setting('enable_skill_style'):
+        builder.add_transform('skill_style', _match_skill, _apply_skill)
+
+    # 零协会私活Tip
+    if settings_manager.get_setting('enable_speical_tip'):
+        from functions.fancy.hint_set import load_loading_texts
+        # 每次启动随机选取Tip, 不使用构建缓存
+        builder.add_transform('speical_tip', _match_hint, _apply_hint, load_loading_texts(), cacheable=False)
+
+    return builder
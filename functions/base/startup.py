@@ -0,0 +1,158 @@
+import queue
+import time
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# 检查后台任务结果的间隔(毫秒)
+POLL_INTERVAL = 15
+
+
+class StartupTask:
+    """启动任务: 所有依赖完成后运行, ui 任务在 Tk 线程运行, 其余在线程池中运行"""
+
+    def __init__(self, name: str, func: Callable[[], Any], deps: Sequence[str] = (),
+                 ui: bool = False, critical: bool = True, text: str = ''):
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+        self.ui = ui
+        # 关键任务全部完成后才显示主窗口
+        self.critical = critical
+        # 启动画面上显示的说明
+        self.text = text or name
+        self.state = 'pending'
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.elapsed = 0.0
+
+
+class StartupOrchestrator:
+    """
+    按依赖关系调度启动任务
+    I/O 任务并发地在线程池中运行, 界面任务通过 after 排队在 Tk 线程中逐个运行,
+    两个界面任务之间会让出主循环, 启动画面因此可以按真实进度刷新.
+    关键任务全部完成时调用 on_ready, 非关键任务继续在后台运行.
+    """
+
+    def __init__(self, root: tk.Misc, max_workers: int = 4,
+                 on_progress: Optional[Callable[[str, int], None]] = None,
+                 on_ready: Optional[Callable[[], None]] = None,
+                 on_complete: Optional[Callable[[], None]] = None):
+        self.root = root
+        self.max_workers = max_workers
+        self.on_progress = on_progress
+        self.on_ready = on_ready
+        # 所有任务(包括非关键任务)完成后调用
+        self.on_complete = on_complete
+        self.tasks: Dict[str, StartupTask] = {}
+        self.order: List[str] = []
+        self.waiters: Dict[str, List[Callable[[StartupTask], None]]] = {}
+        # 线程池完成的任务, 由 Tk 线程取出处理
+        self.finished: "queue.Queue[StartupTask]" = queue.Queue()
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.ready = False
+        self.started_at = 0.0
+
+    def add(self, name: str, func: Callable[[], Any], deps: Sequence[str] = (),
+            ui: bool = False, critical: bool = True, text: str = '') -> StartupTask:
+        """声明一个启动任务, 依赖必须先声明"""
+        for dep in deps:
+            if dep not in self.tasks:
+                raise ValueError(f"启动任务 {name} 依赖未声明的任务 {dep}")
+        task = StartupTask(name, func, deps, ui, critical, text)
+        self.tasks[name] = task
+        self.order.append(name)
+        return task
+
+    def result(self, name: str) -> Any:
+        """任务的返回值, 任务失败时为 None"""
+        return self.tasks[name].result
+
+    def when_done(self, name: str, callback: Callable[[StartupTask], None]):
+        """任务完成(或失败)后在 Tk 线程中调用 callback, 已完成时立即调用"""
+        task = self.tasks[name]
+        if task.state in ('done', 'failed'):
+            callback(task)
+        else:
+            self.waiters.setdefault(name, []).append(callback)
+
+    def run(self):
+        """开始调度, 需要在 Tk 线程调用"""
+        self.started_at = time.perf_counter()
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='startup')
+        self.report_progress('')
+        self.schedule()
+        self.root.after(POLL_INTERVAL, self.poll)
+
+    def schedule(self):
+        """启动所有依赖已满足的任务"""
+        for name in self.order:
+            task = self.tasks[name]
+            if task.state != 'pending':
+                continue
+            if any(self.tasks[dep].state not in ('done', 'failed') for dep in task.deps):
+                continue
+
+            task.state = 'running'
+            if task.ui:
+                self.root.after(0, lambda t=task: self.run_ui_task(t))
+            else:
+                self.executor.submit(lambda t=task: self.finished.put(self.execute(t)))  # type: ignore
+
+    def run_ui_task(self, task: StartupTask):
+        self.report_progress(task.text)
+        self.finish(self.execute(task))
+
+    @staticmethod
+    def execute(task: StartupTask) -> StartupTask:
+        start = time.perf_counter()
+        try:
+            task.result = task.func()
+        except Exception as e:
+            # 单个任务失败不影响其他任务, 依赖它的任务仍会运行
+            task.error = e
+            print(f"启动任务 {task.name} 失败: {e}")
+        task.elapsed = time.perf_counter() - start
+        return task
+
+    def poll(self):
+        """取出线程池中完成的任务"""
+        while True:
+            try:
+                task = self.finished.get_nowait()
+            except queue.Empty:
+                break
+            self.finish(task)
+
+        if any(task.state in ('pending', 'running') for task in self.tasks.values()):
+            self.root.after(POLL_INTERVAL, self.poll)
+        elif self.executor:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+            print(f"启动任务全部完成, 用时 {time.perf_counter() - self.started_at:.2f}s")
+            if self.on_complete:
+                self.on_complete()
+
+    def finish(self, task: StartupTask):
+        """在 Tk 线程中记录任务完成, 并启动后续任务"""
+        task.state = 'failed' if task.error else 'done'
+        self.report_progress('')
+
+        for callback in self.waiters.pop(task.name, []):
+            callback(task)
+
+        if not self.ready and all(t.state in ('done', 'failed') for t in self.tasks.values() if t.critical):
+            self.ready = True
+            print(f"主界面就绪, 用时 {time.perf_counter() - self.started_at:.2f}s")
+            if self.on_ready:
+                self.on_ready()
+
+        self.schedule()
+
+    def report_progress(self, text: str):
+        if not self.on_progress:
+            return
+        critical = [task for task in self.tasks.values() if task.critical]
+        done = sum(task.state in ('done', 'failed') for task in critical)
+        self.on_progress(text, int(done * 100 / max(1, len(critical))))
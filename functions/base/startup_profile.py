@@ -0,0 +1,294 @@
+"""
+启动性能分析
+
+    python main.py --profile-startup
+        正常启动, 记录模块导入耗时、启动步骤耗时与首次绘制时间, 写入 cache/startup_profile.json
+        以及火焰图可用的折叠栈 cache/startup_profile.folded (flamegraph.pl / speedscope)
+
+    python -m functions.base.startup_profile --check [--budget 预算文件] [--runs 3]
+        无界面检查: 在子进程中导入 main 模块, 导入耗时超出预算或导入了不应在启动时导入的模块时返回 1
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import subprocess
+import importlib.abc
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional
+
+PROFILE_PATH = "cache/startup_profile.json"
+FOLDED_PATH = "cache/startup_profile.folded"
+
+# 默认预算, 可以用 --budget 指定的 JSON 文件覆盖
+STARTUP_BUDGET = {
+    # 导入 main 模块的总耗时(毫秒)
+    'import_ms': 1500,
+    # 这些模块应在用到时才导入
+    'forbidden_modules': ['PIL', 'pymysql', 'requests']
+}
+
+
+class TimedLoader:
+    """包装模块加载器, 记录 exec_module 的耗时"""
+
+    def __init__(self, loader, profiler: "ImportProfiler", name: str):
+        self.loader = loader
+        self.profiler = profiler
+        self.name = name
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        module.__loader__ = self.loader
+        with self.profiler.measure(self.name):
+            self.loader.exec_module(module)
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+
+class ImportProfiler(importlib.abc.MetaPathFinder):
+    """
+    统计每个模块的导入耗时, 与 -X importtime 类似, 但按模块汇总并记录调用栈
+    self_ms 不含该模块导入其他模块的时间
+    """
+
+    def __init__(self):
+        self.records: Dict[str, dict] = {}
+        # 折叠栈 -> 自身耗时(秒)
+        self.stacks: Dict[str, float] = {}
+        self.local = threading.local()
+        self.lock = threading.Lock()
+
+    def get_stack(self) -> List[list]:
+        if not hasattr(self.local, 'stack'):
+            self.local.stack = []
+        return self.local.stack
+
+    def find_spec(self, fullname, path, target=None):
+        if getattr(self.local, 'finding', False):
+            return None
+        self.local.finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, 'find_spec'):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self.local.finding = False
+
+        if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+            spec.loader = TimedLoader(spec.loader, self, fullname)
+        return spec
+
+    @contextmanager
+    def measure(self, name: str):
+        stack = self.get_stack()
+        # [模块名, 子模块导入耗时]
+        frame = [name, 0.0]
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            if stack:
+                stack[-1][1] += elapsed
+            self_time = elapsed - frame[1]
+            folded = ';'.join([item[0] for item in stack] + [name])
+            with self.lock:
+                self.records[name] = {
+                    'module': name,
+                    'parent': stack[-1][0] if stack else '',
+                    'self_ms': round(self_time * 1000, 3),
+                    'cumulative_ms': round(elapsed * 1000, 3),
+                    'thread': threading.current_thread().name
+                }
+                self.stacks[folded] = self.stacks.get(folded, 0.0) + self_time
+
+    def total_ms(self) -> float:
+        """顶层导入的总耗时"""
+        return round(sum(r['cumulative_ms'] for r in self.records.values() if not r['parent']), 3)
+
+
+class StartupProfiler:
+    """记录启动过程: 模块导入、启动步骤、启动任务以及首次绘制时间"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.imports = ImportProfiler()
+        self.steps: List[dict] = []
+        self.marks: Dict[str, float] = {}
+        self.tasks: List[dict] = []
+
+    def install(self):
+        sys.meta_path.insert(0, self.imports)
+
+    def uninstall(self):
+        if self.imports in sys.meta_path:
+            sys.meta_path.remove(self.imports)
+
+    def elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self.started_at) * 1000, 3)
+
+    @contextmanager
+    def step(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps.append({
+                'name': name,
+                'start_ms': round((start - self.started_at) * 1000, 3),
+                'ms': round((time.perf_counter() - start) * 1000, 3)
+            })
+
+    def mark(self, name: str):
+        """记录某个时间点, 如首次绘制"""
+        self.marks.setdefault(name, self.elapsed_ms())
+
+    def record_tasks(self, orchestrator):
+        """记录启动任务的耗时"""
+        self.tasks = [{
+            'name': task.name,
+            'ms': round(task.elapsed * 1000, 3),
+            'ui': task.ui,
+            'critical': task.critical,
+            'state': task.state
+        } for task in orchestrator.tasks.values()]
+
+    def report(self) -> dict:
+        imports = sorted(self.imports.records.values(), key=lambda r: r['cumulative_ms'], reverse=True)
+        return {
+            'created_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'python': sys.version.split()[0],
+            'import_total_ms': self.imports.total_ms(),
+            'marks_ms': self.marks,
+            'steps': self.steps,
+            'tasks': self.tasks,
+            'imports': imports
+        }
+
+    def folded_lines(self) -> List[str]:
+        """折叠栈格式, 单位为微秒"""
+        lines = [f"import;{stack} {int(seconds * 1e6)}" for stack, seconds in self.imports.stacks.items()]
+        lines += [f"step;{step['name']} {int(step['ms'] * 1000)}" for step in self.steps]
+        lines += [f"task;{'ui' if task['ui'] else 'worker'};{task['name']} {int(task['ms'] * 1000)}"
+                  for task in self.tasks]
+        return [line for line in lines if not line.endswith(' 0')]
+
+    def save(self, path: str = PROFILE_PATH, folded_path: Optional[str] = FOLDED_PATH) -> dict:
+        report = self.report()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        if folded_path:
+            with open(folded_path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(self.folded_lines()) + '\n')
+        print(f"启动性能报告已保存: {path}")
+        return report
+
+
+_startup_profiler: Optional[StartupProfiler] = None
+
+
+def enable_startup_profile() -> StartupProfiler:
+    """开启启动性能分析, 需要在导入其他模块之前调用"""
+    global _startup_profiler
+    if _startup_profiler is None:
+        _startup_profiler = StartupProfiler()
+        _startup_profiler.install()
+    return _startup_profiler
+
+
+def get_startup_profiler() -> Optional[StartupProfiler]:
+    """未开启时返回 None"""
+    return _startup_profiler
+
+
+def profile_step(name: str):
+    """记录一个启动步骤的耗时, 未开启分析时什么也不做"""
+    if _startup_profiler is None:
+        return nullcontext()
+    return _startup_profiler.step(name)
+
+
+def headless_run(output_path: str):
+    """在当前进程中导入 main 模块(不创建窗口)并保存报告"""
+    profiler = enable_startup_profile()
+    with profiler.step('import main'):
+        import main  # noqa: F401
+    profiler.uninstall()
+    profiler.save(output_path, None)
+
+
+def load_budget(path: Optional[str]) -> dict:
+    budget = dict(STARTUP_BUDGET)
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            budget.update(json.load(f))
+    return budget
+
+
+def check_budget(budget: dict, runs: int = 3, output_path: str = "cache/startup_profile_headless.json") -> List[str]:
+    """
+    运行无界面启动检查, 返回超出预算的问题列表
+    导入耗时取多次运行中的最小值, 减少机器抖动的影响
+    """
+    reports = []
+    for _ in range(max(1, runs)):
+        result = subprocess.run([sys.executable, '-m', 'functions.base.startup_profile',
+                                 '--headless-run', output_path],
+                                capture_output=True, text=True, encoding='utf-8', errors='replace')
+        if result.returncode != 0:
+            return [f"导入 main 失败:\n{result.stderr.strip()}"]
+        with open(output_path, 'r', encoding='utf-8') as f:
+            reports.append(json.load(f))
+
+    best = min(reports, key=lambda report: report['import_total_ms'])
+    print(f"导入 main 用时 {best['import_total_ms']:.1f} ms (预算 {budget['import_ms']} ms)")
+    for record in best['imports'][:10]:
+        print(f"  {record['cumulative_ms']:8.1f} ms  {record['module']}")
+
+    problems = []
+    if best['import_total_ms'] > budget['import_ms']:
+        problems.append(f"导入耗时 {best['import_total_ms']:.1f} ms 超出预算 {budget['import_ms']} ms")
+    imported = {record['module'] for record in best['imports']}
+    for module in budget.get('forbidden_modules', []):
+        if module in imported:
+            parent = next(r['parent'] for r in best['imports'] if r['module'] == module)
+            problems.append(f"启动时导入了 {module} (由 {parent or 'main'} 导入)")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FaustLauncher 启动性能检查")
+    parser.add_argument('--check', action='store_true', help="无界面检查启动预算")
+    parser.add_argument('--budget', help="预算 JSON 文件, 覆盖默认预算")
+    parser.add_argument('--runs', type=int, default=3, help="运行次数, 取最快的一次")
+    parser.add_argument('--headless-run', metavar='OUTPUT', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.headless_run:
+        headless_run(args.headless_run)
+        return 0
+
+    problems = check_budget(load_budget(args.budget), args.runs)
+    for problem in problems:
+        print(f"❌ {problem}")
+    if not problems:
+        print("✅ 启动预算检查通过")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,37 @@
+import os
+import time
+import atexit
+import weakref
+import threading
 from functions.webFunc import Note
-from json import loads, dumps
+from json import loads, dumps, dump, load
+from typing import Iterator, Optional
+
+# 下载中心目录缓存, 按笔记的 updated_time 判断是否过期
+CATALOG_CACHE_DIR = "cache/catalog"
+# 下载次数合并写回的等待时间与重试次数
+COUNTER_FLUSH_DELAY = 3
+COUNTER_RETRIES = 3
+
+# 所有 WebTrigger 实例, 退出程序前写回它们未写回的下载次数
+_web_triggers: "weakref.WeakSet[WebTrigger]" = weakref.WeakSet()
+
+
+def flush_pending_download_counts():
+    """立即写回所有未写回的下载次数, 在 os._exit 之类跳过 atexit 的退出方式之前调用"""
+    for trigger in list(_web_triggers):
+        trigger.flush_all_download_counts()
+
+
+def save_rejected(error: Exception) -> bool:
+    """
+    保存请求是否确定没有生效
+    服务器明确拒绝(返回的状态不为1, 或 4xx)时可以重试; 连接中断、5xx 或响应无法解析时无法确定是否已保存
+    """
+    if type(error) is ValueError:
+        return True
+    response = getattr(error, 'response', None)
+    return response is not None and response.status_code < 500
 
 class WebTrigger:
     """Web触发器，负责获取来自Web的插件和mod信息"""
@@ -8,6 +40,14 @@ class WebTrigger:
         self.addon_info = Note("FaustLauncher.addons.info")
         self.mod_info = Note("FaustLauncher.mod.info")
 
+        # 待写回的下载次数 {kind: {名称: 次数}}
+        self.pending_counts: dict[str, dict[str, int]] = {'addon': {}, 'mod': {}}
+        self.flush_timers: dict[str, Optional[threading.Timer]] = {}
+        self.counter_lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        _web_triggers.add(self)
+        atexit.register(self.flush_all_download_counts)
+
     def refersh_note_info(self):
         """刷新插件和mod信息"""
         self.addon_info._fetch_note_info_write()
@@ -31,48 +71,150 @@ class WebTrigger:
         self.mod_info._fetch_note_info_write()
         return loads(loads(self.mod_info.note_content)[page]['content'])
     
+    def get_catalog_note(self, kind: str) -> Note:
+        """kind 为 'addon' 或 'mod'"""
+        return self.addon_info if kind == 'addon' else self.mod_info
+
+    def get_catalog_cache_path(self, kind: str) -> str:
+        return os.path.join(CATALOG_CACHE_DIR, f"{kind}.json")
+
+    def load_cached_catalog(self, kind: str) -> Optional[list]:
+        """读取本地缓存的目录(不含总页数信息), 没有缓存时返回 None, 不发起网络请求"""
+        cache_path = self.get_catalog_cache_path(kind)
+        if not os.path.exists(cache_path):
+            return None
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                return load(f)['pages']
+        except Exception as e:
+            print(f"读取目录缓存失败: {e}")
+            return None
+
+    def fetch_catalog(self, kind: str) -> tuple[list, bool]:
+        """
+        请求最新目录并更新缓存
+        笔记的 updated_time 与缓存相同时直接返回缓存, 不再解析
+
+        Returns:
+            (所有页的条目列表, 是否与缓存不同)
+        """
+        note = self.get_catalog_note(kind)
+        note._fetch_note_info_write()
+        cache_path = self.get_catalog_cache_path(kind)
+
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cache = load(f)
+            if cache['updated_time'] == note.updated_time:
+                return cache['pages'], False
+        except Exception:
+            pass
+
+        pages = [loads(page['content']) for page in loads(note.note_content)]
+        pages = pages[1:pages[0]['total_page'] + 1]
+        try:
+            os.makedirs(CATALOG_CACHE_DIR, exist_ok=True)
+            with open(cache_path + '.tmp', 'w', encoding='utf-8') as f:
+                dump({'updated_time': note.updated_time, 'pages': pages}, f, ensure_ascii=False)
+            os.replace(cache_path + '.tmp', cache_path)
+        except Exception as e:
+            print(f"保存目录缓存失败: {e}")
+        return pages, True
+
     def fectch_all_addon_info(self) -> list[dict]:
         """获取所有插件信息"""
-        total_page = self.get_addon_info(0)['total_page']
-        addon_info_list = []
-        for page in range(1, total_page + 1):
-            addon_info_list.append(self.get_addon_info(page))
-        return addon_info_list
+        return self.fetch_catalog('addon')[0]
     
     def fectch_all_mod_info(self) -> list[dict]:
         """获取所有mod信息"""
-        total_page = self.get_mod_info(0)['total_page']
-        mod_info_list = []
-        for page in range(1, total_page + 1):
-            mod_info_list.append(self.get_mod_info(page))
-        return mod_info_list
+        return self.fetch_catalog('mod')[0]
+
+    def iter_addons(self) -> Iterator[dict]:
+        """逐个遍历所有插件条目, 整个遍历只请求一次"""
+        for page in self.fectch_all_addon_info():
+            yield from page
+
+    def iter_mods(self) -> Iterator[dict]:
+        """逐个遍历所有mod条目, 整个遍历只请求一次"""
+        for page in self.fectch_all_mod_info():
+            yield from page
     
     def add_download_nummber_addon(self, addon_name: str):
-        """增加指定插件的下载次数"""
-        if not addon_name:
-            return
-
-        pages = self.get_note_info_addon()
-        for page in pages[1:]:  # 跳过第一页的总页数信息
-                addons = loads(page['content'])
-                for addon in addons:
-                    if addon['name'] == addon_name:
-                        addon['download_count'] += 1
-                        page['content'] = dumps(addons, indent=4, ensure_ascii=False)
-                        self.addon_info.update_note_content(dumps(pages, indent=4, ensure_ascii=False))
-                        break
+        """增加指定插件的下载次数, 不阻塞, 稍后与其他计数一起写回"""
+        self.queue_download_count('addon', addon_name)
 
     def add_download_nummber_mod(self, mod_name: str):
-        """增加指定mod的下载次数"""
-        if not mod_name:
+        """增加指定mod的下载次数, 不阻塞, 稍后与其他计数一起写回"""
+        self.queue_download_count('mod', mod_name)
+
+    def queue_download_count(self, kind: str, name: str):
+        """记录一次下载, 在 COUNTER_FLUSH_DELAY 秒内的计数合并为一次写回"""
+        if not name:
             return
-        
-        pages = self.get_note_info_mod()
-        for page in pages[1:]:  # 跳过第一页的总页数信息
-            mods = loads(page['content'])
-            for mod in mods:
-                if mod['name'] == mod_name:
-                    mod['download_count'] += 1
-                    page['content'] = dumps(mods, indent=4, ensure_ascii=False)
-                    self.mod_info.update_note_content(dumps(pages, indent=4, ensure_ascii=False))
-                    break
\ No newline at end of file
+
+        with self.counter_lock:
+            self.pending_counts[kind][name] = self.pending_counts[kind].get(name, 0) + 1
+            if self.flush_timers.get(kind) is None:
+                timer = threading.Timer(COUNTER_FLUSH_DELAY, self.flush_download_counts, args=(kind,))
+                timer.daemon = True
+                self.flush_timers[kind] = timer
+                timer.start()
+
+    def flush_download_counts(self, kind: str) -> bool:
+        """
+        把累计的下载次数一次性写回笔记
+        每次写回都重新读取笔记, 保存被拒绝(如 note_token 已变化)时重新读取后重试,
+        最终失败的计数放回队列, 等待下一次写回.
+        保存请求发出后无法确定结果时不重试, 直接丢弃这些计数, 以免重复计数
+        """
+        with self.counter_lock:
+            self.flush_timers[kind] = None
+            counts, self.pending_counts[kind] = self.pending_counts[kind], {}
+        if not counts:
+            return True
+
+        note = self.get_catalog_note(kind)
+        with self.flush_lock:
+            for attempt in range(COUNTER_RETRIES):
+                if attempt:
+                    time.sleep(attempt)
+                try:
+                    note._fetch_note_info_write()
+                    pages = loads(note.note_content)
+                    for page in pages[1:]:  # 跳过第一页的总页数信息
+                        items = loads(page['content'])
+                        changed = False
+                        for item in items:
+                            if item.get('name') in counts:
+                                item['download_count'] = item.get('download_count', 0) + counts[item['name']]
+                                changed = True
+                        # 只重新序列化有变化的页
+                        if changed:
+                            page['content'] = dumps(items, indent=4, ensure_ascii=False)
+                    content = dumps(pages, indent=4, ensure_ascii=False)
+                except Exception as e:
+                    print(f"读取下载次数失败 (第 {attempt + 1} 次): {e}")
+                    continue
+
+                try:
+                    note.update_note_content(content)
+                    return True
+                except Exception as e:
+                    if not save_rejected(e):
+                        print(f"无法确定下载次数是否已保存, 放弃本次的 {sum(counts.values())} 次计数以免重复: {e}")
+                        return False
+                    print(f"写回下载次数失败 (第 {attempt + 1} 次): {e}")
+
+        with self.counter_lock:
+            for name, count in counts.items():
+                self.pending_counts[kind][name] = self.pending_counts[kind].get(name, 0) + count
+        return False
+
+    def flush_all_download_counts(self):
+        """立即写回所有未写回的下载次数, 退出程序时调用"""
+        for kind in ('addon', 'mod'):
+            with self.counter_lock:
+                timer = self.flush_timers.get(kind)
+            if timer:
+                timer.cancel()
+            self.flush_download_counts(kind)
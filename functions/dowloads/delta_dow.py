@@ -0,0 +1,221 @@
+import os
+import hashlib
+import zipfile
+import requests
+from typing import Callable, List, Optional
+
+# 增量更新清单格式版本
+MANIFEST_VERSION = 1
+# 远程读取 zip 时每次请求的最小字节数, 减少零碎的 Range 请求
+RANGE_BLOCK_SIZE = 64 * 1024
+# 需要更新的内容超过全量的该比例时, 直接下载完整压缩包更快
+DELTA_MAX_RATIO = 0.5
+LOCAL_LANG_DIR = 'lang/LLC_zh-CN'
+
+
+def hash_bytes_stream(stream, chunk_size: int = 1024 * 1024) -> str:
+    """计算文件流的 sha256"""
+    sha = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(chunk_size), b''):
+        sha.update(chunk)
+    return sha.hexdigest()
+
+
+def find_lang_root(names: List[str], lang_name: str = 'LLC_zh-CN') -> str:
+    """在压缩包文件列表中找到汉化目录的前缀, 如 LimbusCompany_Data/Lang/LLC_zh-CN/"""
+    marker = lang_name + '/'
+    for name in names:
+        index = name.find(marker)
+        if index != -1:
+            return name[:index + len(marker)]
+    return ''
+
+
+def build_manifest(zip_path: str, version: str) -> dict:
+    """
+    根据汉化包的 zip 生成增量更新清单, 由发布镜像的脚本调用
+    清单记录每个文件相对汉化目录的路径、大小与 sha256
+    """
+    files = {}
+    with zipfile.ZipFile(zip_path) as archive:
+        root = find_lang_root(archive.namelist())
+        for info in archive.infolist():
+            if info.is_dir() or not info.filename.startswith(root):
+                continue
+            with archive.open(info) as f:
+                files[info.filename[len(root):]] = {
+                    'size': info.file_size,
+                    'sha256': hash_bytes_stream(f)
+                }
+
+    return {
+        'manifest_version': MANIFEST_VERSION,
+        'version': version,
+        'root': root,
+        'files': files
+    }
+
+
+def fetch_manifest(url: str, timeout: float = 15) -> Optional[dict]:
+    """下载增量更新清单, 格式不符时返回 None"""
+    try:
+        response = requests.get(url, timeout=timeout, verify=False)
+        response.raise_for_status()
+        manifest = response.json()
+        if manifest.get('manifest_version') != MANIFEST_VERSION or 'files' not in manifest:
+            print("增量更新清单格式不支持")
+            return None
+        return manifest
+    except Exception as e:
+        print(f"获取增量更新清单失败: {e}")
+        return None
+
+
+def diff_manifest(manifest: dict, local_dir: str = LOCAL_LANG_DIR) -> List[str]:
+    """返回本地缺失或内容与清单不一致的文件"""
+    changed = []
+    for relative_path, entry in manifest['files'].items():
+        local_path = os.path.join(local_dir, relative_path)
+        try:
+            if os.path.getsize(local_path) == entry['size']:
+                with open(local_path, 'rb') as f:
+                    if hash_bytes_stream(f) == entry['sha256']:
+                        continue
+        except OSError:
+            pass
+        changed.append(relative_path)
+    return changed
+
+
+class HttpRangeFile:
+    """
+    通过 HTTP Range 请求按需读取远程文件的只读文件对象
+    zipfile 只需要读取中央目录与用到的成员, 因此不必下载整个压缩包
+    """
+
+    def __init__(self, url: str, session: Optional[requests.Session] = None, timeout: float = 30):
+        self.url = url
+        self.session = session or requests.Session()
+        self.timeout = timeout
+        self.position = 0
+        self.block_start = 0
+        self.block = b''
+        self.bytes_fetched = 0
+
+        response = self.session.get(url, headers={'Range': 'bytes=0-0'}, stream=True, timeout=timeout, verify=False)
+        try:
+            response.raise_for_status()
+            content_range = response.headers.get('Content-Range', '')
+            if response.status_code != 206 or not content_range.rsplit('/', 1)[-1].isdigit():
+                raise IOError("服务器不支持分段请求")
+            self.size = int(content_range.rsplit('/', 1)[1])
+        finally:
+            response.close()
+
+    def seekable(self) -> bool:
+        return True
+
+    def readable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        if whence == 1:
+            offset += self.position
+        elif whence == 2:
+            offset += self.size
+        self.position = max(0, offset)
+        return self.position
+
+    def fetch(self, start: int, length: int):
+        """请求 [start, start+length) 并缓存为当前数据块"""
+        end = min(start + length, self.size) - 1
+        response = self.session.get(self.url, headers={'Range': f'bytes={start}-{end}'},
+                                    timeout=self.timeout, verify=False)
+        if response.status_code != 206:
+            raise IOError(f"分段请求失败, 状态码: {response.status_code}")
+        self.block_start, self.block = start, response.content
+        self.bytes_fetched += len(self.block)
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self.size - self.position
+        size = min(size, self.size - self.position)
+        if size <= 0:
+            return b''
+
+        offset = self.position - self.block_start
+        if offset < 0 or offset + size > len(self.block):
+            self.fetch(self.position, max(size, RANGE_BLOCK_SIZE))
+            offset = 0
+        data = self.block[offset:offset + size]
+        self.position += len(data)
+        return data
+
+    def close(self):
+        self.block = b''
+
+
+def apply_delta(manifest: dict, zip_urls: List[str], local_dir: str = LOCAL_LANG_DIR,
+                progress_callback: Optional[Callable[[int, int], None]] = None) -> bool:
+    """
+    按清单增量更新本地汉化目录, 只从远程 zip 中读取有变化的文件
+    版本文件最后写入, 中途失败时下次启动会重新比较并继续更新
+
+    Args:
+        manifest: 新版本的清单
+        zip_urls: 同一个 zip 的多个下载地址, 按优先级排列
+        progress_callback: 进度回调 (已完成文件数, 需要更新的文件数)
+
+    Returns:
+        成功返回 True, 返回 False 时应退回下载完整压缩包
+    """
+    changed = diff_manifest(manifest, local_dir)
+    if not changed:
+        print("本地汉化文件已与清单一致")
+        return True
+
+    total_size = sum(entry['size'] for entry in manifest['files'].values()) or 1
+    changed_size = sum(manifest['files'][path]['size'] for path in changed)
+    print(f"增量更新: {len(changed)} 个文件, {changed_size / 1024:.1f} KB")
+    if changed_size / total_size > DELTA_MAX_RATIO:
+        print("变化的文件过多, 改为下载完整压缩包")
+        return False
+
+    # 版本信息最后更新
+    changed.sort(key=lambda path: path == 'info/version.json')
+    for url in zip_urls:
+        try:
+            remote = HttpRangeFile(url)
+            with zipfile.ZipFile(remote) as archive:  # type: ignore
+                for index, relative_path in enumerate(changed):
+                    entry = manifest['files'][relative_path]
+                    target_path = os.path.join(local_dir, relative_path)
+                    temp_path = target_path + '.delta'
+                    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+
+                    sha = hashlib.sha256()
+                    with archive.open(manifest.get('root', '') + relative_path) as source, \
+                            open(temp_path, 'wb') as target:
+                        for chunk in iter(lambda: source.read(1024 * 1024), b''):
+                            sha.update(chunk)
+                            target.write(chunk)
+                    if sha.hexdigest() != entry['sha256']:
+                        os.remove(temp_path)
+                        raise IOError(f"文件校验失败: {relative_path}")
+                    os.replace(temp_path, target_path)
+
+                    if progress_callback:
+                        progress_callback(index + 1, len(changed))
+
+            print(f"增量更新完成, 实际下载 {remote.bytes_fetched / 1024:.1f} KB")
+            return True
+        except Exception as e:
+            print(f"增量更新失败 {url}: {e}")
+            # 已经更新成功的文件保留, 换下一个地址时会被跳过
+            changed = diff_manifest(manifest, local_dir)
+            changed.sort(key=lambda path: path == 'info/version.json')
+
+    return False
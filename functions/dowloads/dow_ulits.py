@@ -1,5 +1,6 @@
 from json import load
 import os
+import shutil
 
 def check_need_up_translate(version_info:str = "") -> bool:
     try:
@@ -30,5 +31,20 @@ def check_need_up_translate(version_info:str = "") -> bool:
     except:
         return False
 
+def move_tree(source_dir: str, target_dir: str):
+    """把 source_dir 下的文件移动到 target_dir 并覆盖同名文件, 同一磁盘上只是重命名, 不复制文件内容"""
+    for root, _, files in os.walk(source_dir):
+        dest_root = os.path.normpath(os.path.join(target_dir, os.path.relpath(root, source_dir)))
+        os.makedirs(dest_root, exist_ok=True)
+        for name in files:
+            source_path = os.path.join(root, name)
+            dest_path = os.path.join(dest_root, name)
+            try:
+                os.replace(source_path, dest_path)
+            except OSError:
+                # 跨磁盘时无法重命名, 退回复制
+                shutil.copy2(source_path, dest_path)
+                os.remove(source_path)
+
 if __name__ == '__main__':
     print(check_need_up_translate("20250115"))
\ No newline at end of file
@@ -12,6 +12,7 @@ class ReleaseAsset:
     download_url: str
     content_type: str
     download_count: int
+    digest: str = ''  # GitHub 提供的 sha256, 格式为 "sha256:<hex>"
     
     @property
     def formatted_size(self) -> str:
@@ -273,7 +274,8 @@ class GitHubReleaseFetcher:
                 size=asset['size'],
                 download_url=asset['browser_download_url'],
                 content_type=asset.get('content_type', 'application/octet-stream'),
-                download_count=asset.get('download_count', 0)
+                download_count=asset.get('download_count', 0),
+                digest=asset.get('digest') or ''
             ))
         
         # 创建ReleaseInfo对象
@@ -0,0 +1,90 @@
+import os
+import json
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+# 测速时下载的字节数与超时时间
+PROBE_BYTES = 256 * 1024
+PROBE_TIMEOUT = 8
+# 测速结果缓存, 过期前直接按缓存的速度排序, 不再测速
+PROBE_CACHE_PATH = "cache/mirror_probe.json"
+PROBE_CACHE_TTL = 6 * 3600
+
+
+def probe_mirror(url: str, probe_bytes: int = PROBE_BYTES, timeout: float = PROBE_TIMEOUT) -> float:
+    """用小范围请求测量镜像的下载速度, 返回 KB/s, 失败返回 0"""
+    try:
+        start_time = time.time()
+        received = 0
+        headers = {'Range': f'bytes=0-{probe_bytes - 1}'}
+        with requests.get(url, headers=headers, stream=True, timeout=timeout, verify=False) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=16 * 1024):
+                received += len(chunk)
+                if received >= probe_bytes or time.time() - start_time > timeout:
+                    break
+        elapsed = max(time.time() - start_time, 1e-6)
+        return received / elapsed / 1024
+    except Exception as e:
+        print(f"镜像测速失败 {url}: {e}")
+        return 0.0
+
+
+def load_probe_cache(cache_path: str = PROBE_CACHE_PATH) -> Dict[str, dict]:
+    """读取测速缓存"""
+    if not os.path.exists(cache_path):
+        return {}
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def save_probe_cache(cache: Dict[str, dict], cache_path: str = PROBE_CACHE_PATH):
+    """保存测速缓存"""
+    try:
+        os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False, indent=4)
+    except Exception as e:
+        print(f"保存测速缓存失败: {e}")
+
+
+def record_mirror_speed(name: str, speed: float, cache_path: str = PROBE_CACHE_PATH):
+    """记录一次实际下载得到的镜像速度"""
+    cache = load_probe_cache(cache_path)
+    cache[name] = {'speed': speed, 'time': time.time()}
+    save_probe_cache(cache, cache_path)
+
+
+def rank_mirrors(mirrors: Dict[str, str], ttl: float = PROBE_CACHE_TTL,
+                 cache_path: str = PROBE_CACHE_PATH) -> List[str]:
+    """
+    按速度从快到慢排列镜像名称
+    所有镜像的缓存都未过期时直接使用缓存, 否则并发测速未缓存或已过期的镜像.
+    测速失败的镜像排在最后.
+
+    Args:
+        mirrors: 镜像名称 -> 下载地址
+    """
+    cache = load_probe_cache(cache_path)
+    now = time.time()
+    stale = [name for name in mirrors
+             if name not in cache or now - cache[name].get('time', 0) > ttl]
+
+    if stale:
+        print(f"正在测速 {len(stale)} 个下载源: {', '.join(stale)}")
+        with ThreadPoolExecutor(max_workers=len(stale)) as executor:
+            speeds = list(executor.map(lambda name: probe_mirror(mirrors[name]), stale))
+        for name, speed in zip(stale, speeds):
+            cache[name] = {'speed': speed, 'time': now}
+            print(f"下载源 {name}: {speed:.1f} KB/s")
+        save_probe_cache(cache, cache_path)
+    else:
+        print("使用缓存的下载源测速结果")
+
+    return sorted(mirrors, key=lambda name: cache[name].get('speed', 0), reverse=True)
+
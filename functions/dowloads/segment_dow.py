@@ -0,0 +1,411 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+# 默认分段数与每段最小大小, 小文件不值得分段
+DEFAULT_SEGMENTS = 4
+MIN_SEGMENT_SIZE = 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+SEGMENT_RETRIES = 3
+# 速度跌落到峰值的该比例以下并持续 COLLAPSE_SECONDS 秒时切换到下一个镜像
+COLLAPSE_RATIO = 0.2
+COLLAPSE_SECONDS = 5
+# 发布校验信息时的分块大小, 分块校验失败时只需重新下载该块
+CHECKSUM_BLOCK_SIZE = 4 * 1024 * 1024
+
+
+def build_checksum(file_path: str, block_size: int = CHECKSUM_BLOCK_SIZE) -> dict:
+    """计算文件的大小、整体 sha256 以及每个分块的 sha256, 由发布镜像的脚本调用"""
+    whole = hashlib.sha256()
+    blocks = []
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(block_size), b''):
+            whole.update(chunk)
+            blocks.append(hashlib.sha256(chunk).hexdigest())
+    return {
+        'size': os.path.getsize(file_path),
+        'sha256': whole.hexdigest(),
+        'block_size': block_size,
+        'blocks': blocks
+    }
+
+
+class SegmentedDownloader:
+    """
+    分段多连接下载器
+    把文件按字节范围切分为多段, 通过连接池并发下载.
+    分段进度保存在临时文件旁的 .state.json 中, 中断后再次下载会从断点继续.
+    服务器不支持 Range 时退回单连接下载.
+    提供多个镜像时, 当前镜像失败或速度崩溃会切换到下一个镜像继续下载剩余部分.
+    提供校验信息时边下载边计算 sha256, 分块校验失败只重新下载该块.
+    """
+
+    def __init__(self, url: str, local_filename: str, segments: int = DEFAULT_SEGMENTS,
+                 progress_callback: Optional[Callable[[int, int, float], None]] = None,
+                 should_continue: Optional[Callable[[], bool]] = None,
+                 session: Optional[requests.Session] = None, verify: bool = False,
+                 mirrors: Optional[List[str]] = None, checksum: Optional[dict] = None):
+        """
+        初始化下载器
+
+        Args:
+            url: 下载地址
+            local_filename: 最终保存路径
+            segments: 最大并发分段数
+            progress_callback: 进度回调 (已下载字节, 总字节, 速度KB/s), 只在调用 download 的线程中触发
+            should_continue: 返回 False 时中止下载(保留断点)
+            session: 复用的请求会话
+            verify: 是否校验SSL证书
+            mirrors: 备用镜像地址, 按优先级排列, 内容必须与 url 相同
+            checksum: 发布方提供的校验信息 {'size', 'sha256', 'block_size', 'blocks'}, 均可缺省
+        """
+        self.urls = [url] + [m for m in (mirrors or []) if m != url]
+        self.mirror_index = 0
+        self.mirror_generation = 0
+        self.url = url
+        self.local_filename = local_filename
+        self.part_filename = local_filename + '.part'
+        self.state_filename = local_filename + '.state.json'
+        self.segments = max(1, segments)
+        self.progress_callback = progress_callback
+        self.should_continue = should_continue or (lambda: True)
+        self.checksum = checksum or {}
+        self.block_size = self.checksum.get('block_size', 0) if self.checksum.get('blocks') else 0
+
+        self.session = session or requests.Session()
+        self.session.verify = verify
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.segments)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self.total_size = 0
+        self.etag = ''
+        self.segment_list: List[dict] = []
+        self.lock = threading.Lock()
+        self.error: Optional[Exception] = None
+        # 本次下载实际从网络接收的字节数, 不含断点续传前已经下载的部分
+        self.session_bytes = 0
+        self.resumed = False
+        self.start_time = 0.0
+
+    def probe(self):
+        """探测文件大小以及服务器是否支持 Range, 返回 (总大小, 是否支持Range)"""
+        response = self.session.get(self.url, headers={'Range': 'bytes=0-0'}, stream=True, timeout=15)
+        try:
+            response.raise_for_status()
+            self.etag = response.headers.get('ETag', '') or response.headers.get('Last-Modified', '')
+            content_range = response.headers.get('Content-Range', '')
+            if response.status_code == 206 and '/' in content_range:
+                total = content_range.rsplit('/', 1)[1]
+                if total.isdigit():
+                    return int(total), True
+            return int(response.headers.get('content-length', 0)), False
+        finally:
+            response.close()
+
+    def load_state(self) -> bool:
+        """读取断点信息, 与当前下载不一致时丢弃"""
+        if not (os.path.exists(self.state_filename) and os.path.exists(self.part_filename)):
+            return False
+        try:
+            with open(self.state_filename, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except Exception:
+            return False
+
+        if state.get('url') not in self.urls or state.get('total_size') != self.total_size or \
+                state.get('sha256', '') != self.checksum.get('sha256', '') or \
+                os.path.getsize(self.part_filename) != self.total_size:
+            return False
+        # 同一镜像的文件版本标识改变说明文件已更新
+        if state.get('url') == self.url and state.get('etag', '') != self.etag:
+            return False
+
+        self.segment_list = state['segments']
+        return True
+
+    def save_state(self):
+        """保存断点信息"""
+        with self.lock:
+            state = {
+                'url': self.url,
+                'total_size': self.total_size,
+                'etag': self.etag,
+                'sha256': self.checksum.get('sha256', ''),
+                'segments': [dict(segment) for segment in self.segment_list],
+            }
+        temp_path = self.state_filename + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(temp_path, self.state_filename)
+
+    def clear_state(self):
+        """删除断点文件"""
+        for path in (self.part_filename, self.state_filename):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def plan_segments(self):
+        """按总大小切分下载段, 每段记录 [start, end] 闭区间以及已下载字节数"""
+        count = max(1, min(self.segments, self.total_size // MIN_SEGMENT_SIZE))
+        segment_size = self.total_size // count
+        if self.block_size:
+            # 分段边界与校验分块对齐, 每个分块只属于一个分段
+            segment_size = max(1, -(-segment_size // self.block_size)) * self.block_size
+            count = -(-self.total_size // segment_size)
+        self.segment_list = []
+        for i in range(count):
+            start = i * segment_size
+            end = self.total_size - 1 if i == count - 1 else start + segment_size - 1
+            self.segment_list.append({'start': start, 'end': end, 'downloaded': 0})
+
+        # 预分配临时文件, 各段直接写入自己的偏移位置
+        with open(self.part_filename, 'wb') as f:
+            f.truncate(self.total_size)
+
+    def switch_mirror(self, reason: str) -> bool:
+        """切换到下一个镜像, 正在进行的分段会在下一个数据块处改用新镜像"""
+        with self.lock:
+            if self.mirror_index + 1 >= len(self.urls):
+                return False
+            self.mirror_index += 1
+            self.url = self.urls[self.mirror_index]
+            self.mirror_generation += 1
+        print(f"{reason}, 切换下载镜像: {self.url}")
+        return True
+
+    @property
+    def downloaded_size(self) -> int:
+        with self.lock:
+            return sum(segment['downloaded'] for segment in self.segment_list)
+
+    def verify_block(self, block_start: int, digest: str) -> bool:
+        """校验从 block_start 开始的分块"""
+        return digest == self.checksum['blocks'][block_start // self.block_size]
+
+    def read_part(self, start: int, end: int) -> bytes:
+        """读取临时文件中 [start, end) 的内容"""
+        with open(self.part_filename, 'rb') as f:
+            f.seek(start)
+            return f.read(end - start)
+
+    def download_segment(self, segment: dict):
+        """下载单个分段, 失败时从当前偏移重试; 有分块校验信息时边下载边校验"""
+        retries = 0
+        while True:
+            with self.lock:
+                offset = segment['start'] + segment['downloaded']
+                url, generation = self.url, self.mirror_generation
+            if offset > segment['end']:
+                return
+            if not self.should_continue() or self.error:
+                return
+
+            hasher = None
+            if self.block_size:
+                # 从分块开头计算, 断点续传时先读入该块已经下载的部分
+                block_start = offset - offset % self.block_size
+                block_end = min(block_start + self.block_size, self.total_size)
+                hasher = hashlib.sha256(self.read_part(block_start, offset))
+
+            try:
+                headers = {'Range': f"bytes={offset}-{segment['end']}"}
+                with self.session.get(url, headers=headers, stream=True, timeout=30) as response:
+                    content_range = response.headers.get('Content-Range', '')
+                    if response.status_code != 206 or not content_range.endswith(f'/{self.total_size}'):
+                        raise IOError(f"服务器未返回分段内容, 状态码: {response.status_code}")
+                    with open(self.part_filename, 'r+b') as f:
+                        f.seek(offset)
+                        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                            if not self.should_continue():
+                                return
+                            if generation != self.mirror_generation:
+                                break
+                            if not chunk:
+                                continue
+                            chunk = chunk[:segment['end'] + 1 - offset]
+                            f.write(chunk)
+                            received = len(chunk)
+                            if hasher:
+                                while chunk:
+                                    piece, chunk = chunk[:block_end - offset], chunk[block_end - offset:]
+                                    hasher.update(piece)
+                                    offset += len(piece)
+                                    if offset < block_end:
+                                        continue
+                                    if not self.verify_block(block_start, hasher.hexdigest()):
+                                        with self.lock:
+                                            segment['downloaded'] = block_start - segment['start']
+                                        raise IOError(f"分块 {block_start // self.block_size} 校验失败")
+                                    block_start = block_end
+                                    block_end = min(block_start + self.block_size, self.total_size)
+                                    hasher = hashlib.sha256()
+                            else:
+                                offset += len(chunk)
+                            with self.lock:
+                                segment['downloaded'] = offset - segment['start']
+                                self.session_bytes += received
+                            if offset > segment['end']:
+                                break
+                retries = 0
+            except Exception as e:
+                retries += 1
+                if retries > SEGMENT_RETRIES:
+                    # 当前镜像不可用时换下一个镜像, 没有可用镜像才放弃
+                    if generation == self.mirror_generation and not self.switch_mirror(f"分段下载失败: {e}"):
+                        self.error = e
+                        return
+                    retries = 0
+                    continue
+                print(f"分段下载出错, 准备重试: {e}")
+                time.sleep(retries)
+
+    def verify_file(self, file_path: str) -> bool:
+        """按整体 sha256 校验文件, 没有校验信息时直接通过"""
+        expected = self.checksum.get('sha256')
+        if not expected:
+            return True
+        with open(file_path, 'rb') as f:
+            sha = hashlib.sha256()
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(chunk)
+        if sha.hexdigest() != expected:
+            print(f"文件校验失败: {file_path}")
+            return False
+        return True
+
+    def download_single_stream(self) -> bool:
+        """不支持 Range 时的单连接下载"""
+        self.segment_list = [{'start': 0, 'end': max(self.total_size - 1, 0), 'downloaded': 0}]
+        with self.session.get(self.url, stream=True, timeout=30) as response:
+            response.raise_for_status()
+            self.total_size = int(response.headers.get('content-length', 0)) or self.total_size
+            last_report = time.time()
+            last_size = 0
+            sha = hashlib.sha256()
+            with open(self.part_filename, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    if not self.should_continue():
+                        return False
+                    if chunk:
+                        f.write(chunk)
+                        sha.update(chunk)
+                        with self.lock:
+                            self.segment_list[0]['downloaded'] += len(chunk)
+                            self.session_bytes += len(chunk)
+                    now = time.time()
+                    if now - last_report >= 0.1:
+                        downloaded = self.downloaded_size
+                        self.report(downloaded, (downloaded - last_size) / (now - last_report) / 1024)
+                        last_report, last_size = now, downloaded
+
+        self.total_size = self.downloaded_size
+        expected = self.checksum.get('sha256')
+        if expected and sha.hexdigest() != expected:
+            print("文件校验失败, 下载内容与发布信息不一致")
+            self.clear_state()
+            return False
+        os.replace(self.part_filename, self.local_filename)
+        self.report(self.total_size, 0)
+        return True
+
+    @property
+    def session_speed(self) -> Optional[float]:
+        """
+        本次从 self.url 下载的平均速度 KB/s
+        断点续传或中途切换过镜像时返回 None, 这时的字节数不能全部算作当前镜像的速度
+        """
+        if self.resumed or self.mirror_generation or not self.session_bytes:
+            return None
+        return self.session_bytes / max(time.time() - self.start_time, 1e-6) / 1024
+
+    def report(self, downloaded: int, speed: float):
+        if self.progress_callback:
+            self.progress_callback(downloaded, self.total_size, speed)
+
+    def download(self) -> bool:
+        """开始或继续下载, 成功返回 True"""
+        os.makedirs(os.path.dirname(self.local_filename) or '.', exist_ok=True)
+        self.start_time = time.time()
+        while True:
+            try:
+                self.total_size, accept_ranges = self.probe()
+                expected_size = self.checksum.get('size')
+                if expected_size and accept_ranges and self.total_size != expected_size:
+                    raise IOError(f"文件大小 {self.total_size} 与发布信息 {expected_size} 不一致")
+                break
+            except Exception as e:
+                if not self.switch_mirror(f"镜像不可用: {e}"):
+                    raise
+
+        if not accept_ranges or self.total_size <= 0:
+            print("服务器不支持分段下载, 使用单连接下载")
+            self.clear_state()
+            return self.download_single_stream()
+
+        if self.load_state():
+            self.resumed = self.downloaded_size > 0
+            print(f"从断点继续下载: {self.downloaded_size}/{self.total_size} bytes")
+        else:
+            self.plan_segments()
+            self.save_state()
+
+        pending = [s for s in self.segment_list if s['start'] + s['downloaded'] <= s['end']]
+        print(f"开始分段下载, 共 {len(self.segment_list)} 段, 剩余 {len(pending)} 段")
+
+        last_report = time.time()
+        last_size = self.downloaded_size
+        last_save = last_report
+        speed_window = []
+        peak_speed = 0.0
+        collapse_since = 0.0
+        with ThreadPoolExecutor(max_workers=max(1, len(pending))) as executor:
+            futures = [executor.submit(self.download_segment, segment) for segment in pending]
+            while not all(future.done() for future in futures):
+                time.sleep(0.1)
+                now = time.time()
+                downloaded = self.downloaded_size
+                speed = (downloaded - last_size) / max(now - last_report, 1e-6) / 1024
+                self.report(downloaded, speed)
+                last_report, last_size = now, downloaded
+                if now - last_save >= 1:
+                    self.save_state()
+                    last_save = now
+
+                # 速度崩溃检测: 取最近1秒的平均速度与峰值比较
+                # 有分段完成后总速度自然下降, 此时不再检测
+                if any(future.done() for future in futures):
+                    continue
+                speed_window = (speed_window + [speed])[-10:]
+                average_speed = sum(speed_window) / len(speed_window)
+                peak_speed = max(peak_speed, average_speed)
+                if average_speed < peak_speed * COLLAPSE_RATIO:
+                    collapse_since = collapse_since or now
+                    if now - collapse_since >= COLLAPSE_SECONDS and self.switch_mirror("下载速度过低"):
+                        speed_window, peak_speed, collapse_since = [], 0.0, 0.0
+                else:
+                    collapse_since = 0.0
+
+        self.save_state()
+        if self.error:
+            print(f"分段下载失败, 已保存断点: {self.error}")
+            return False
+        if self.downloaded_size < self.total_size:
+            print("下载已中止, 已保存断点")
+            return False
+
+        # 分块校验已经在下载时完成, 只有整体 sha256 时才需要重新读取文件
+        if not self.block_size and not self.verify_file(self.part_filename):
+            self.clear_state()
+            return False
+
+        os.replace(self.part_filename, self.local_filename)
+        os.remove(self.state_filename)
+        self.report(self.total_size, 0)
+        return True
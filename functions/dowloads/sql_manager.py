@@ -1,8 +1,181 @@
 import pymysql
 import os
+import time
+import zlib
+import shutil
+import hashlib
+import atexit
+import threading
+from contextlib import contextmanager
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 
+# 连接空闲超过该秒数后, 取用前先 ping 检查是否仍然可用
+HEALTH_CHECK_INTERVAL = 30
+# 连接池最多保留的空闲连接数
+POOL_MAX_IDLE = 2
+# 气泡文本的本地缓存目录, 按内容哈希保存
+BUBBLE_CACHE_DIR = "cache/bubble"
+BUBBLE_FILE_NAMES = (
+    'BattleSpeechBubbleDlg.json',
+    'BattleSpeechBubbleDlg_Cultivation.json',
+    'BattleSpeechBubbleDlg_mowe.json'
+)
+# 压缩后的气泡文本与内容哈希, 旧表格缺少这些列时自动添加
+BUBBLE_COLUMNS = {
+    'bubble_hash': 'CHAR(64)',
+    'battle_speech_bubble_z': 'LONGBLOB',
+    'battle_speech_bubble_cultivation_z': 'LONGBLOB',
+    'battle_speech_bubble_mowe_z': 'LONGBLOB'
+}
+
+
+class SqlClient:
+    """
+    共享的MySQL客户端
+    第一次查询时才建立连接, 用完放回连接池供后续查询复用, 避免每次查询都重新握手和认证.
+    表格是否存在的检查结果在进程内缓存.
+    """
+
+    def __init__(self, host, port, user, password, database, max_idle: int = POOL_MAX_IDLE):
+        self.config = dict(host=host, port=port, user=user, password=password, database=database)
+        self.max_idle = max_idle
+        # (连接, 放回连接池的时间)
+        self.idle = []
+        self.lock = threading.Lock()
+        self.known_tables = set()
+
+    def connect(self):
+        return pymysql.connect(
+            **self.config,
+            charset='utf8mb4',
+            cursorclass=pymysql.cursors.DictCursor
+        )
+
+    def acquire(self):
+        """从连接池取出一个可用连接, 没有时新建"""
+        while True:
+            with self.lock:
+                if not self.idle:
+                    break
+                connection, released_at = self.idle.pop()
+            if time.monotonic() - released_at < HEALTH_CHECK_INTERVAL:
+                return connection
+            try:
+                connection.ping(reconnect=False)
+                return connection
+            except pymysql.Error:
+                # 连接已被服务器断开, 丢弃后继续取下一个
+                self.discard(connection)
+        return self.connect()
+
+    def release(self, connection):
+        """把连接放回连接池, 超过上限时直接关闭"""
+        with self.lock:
+            if connection.open and len(self.idle) < self.max_idle:
+                self.idle.append((connection, time.monotonic()))
+                return
+        self.discard(connection)
+
+    @staticmethod
+    def discard(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    @contextmanager
+    def cursor(self):
+        """
+        借用一个连接并返回游标, 正常结束时提交, 出错时回滚
+        出错的连接不再放回连接池
+        """
+        connection = self.acquire()
+        try:
+            with connection.cursor() as cursor:
+                yield cursor
+            connection.commit()
+        except Exception:
+            try:
+                connection.rollback()
+            except pymysql.Error:
+                pass
+            self.discard(connection)
+            raise
+        self.release(connection)
+
+    def table_exists(self, cursor, table_name: str) -> bool:
+        """检查表格是否存在, 存在时记住结果, 之后不再查询"""
+        if table_name in self.known_tables:
+            return True
+        cursor.execute("SHOW TABLES LIKE %s", (table_name,))
+        if cursor.fetchone():
+            self.mark_table_exists(table_name)
+            return True
+        return False
+
+    def mark_table_exists(self, table_name: str):
+        self.known_tables.add(table_name)
+
+    def column_exists(self, cursor, table_name: str, column_name: str) -> bool:
+        """检查列是否存在, 存在时记住结果"""
+        key = f"{table_name}.{column_name}"
+        if key in self.known_tables:
+            return True
+        cursor.execute(f"SHOW COLUMNS FROM {table_name} LIKE %s", (column_name,))
+        if cursor.fetchone():
+            self.mark_table_exists(key)
+            return True
+        return False
+
+    def close(self):
+        """关闭连接池中的所有连接"""
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for connection, _ in idle:
+            self.discard(connection)
+
+
+_sql_clients = {}
+_sql_clients_lock = threading.Lock()
+
+
+def get_sql_client(host, port, user, password, database) -> SqlClient:
+    """获取对应数据库的共享客户端, 同一个数据库在进程内只创建一次"""
+    key = (host, port, user, database)
+    with _sql_clients_lock:
+        if key not in _sql_clients:
+            _sql_clients[key] = SqlClient(host, port, user, password, database)
+        return _sql_clients[key]
+
+
+@atexit.register
+def close_sql_clients():
+    """退出时关闭所有连接"""
+    for client in list(_sql_clients.values()):
+        client.close()
+
+
+def compute_bubble_hash(battle_speech_file, cultivation_file, mowe_file) -> str:
+    """三个气泡文本合在一起的 sha256, 用于判断内容是否变化"""
+    sha = hashlib.sha256()
+    for content in (battle_speech_file, cultivation_file, mowe_file):
+        data = content.encode('utf-8')
+        # 加上长度, 避免不同的切分得到相同的哈希
+        sha.update(len(data).to_bytes(8, 'little'))
+        sha.update(data)
+    return sha.hexdigest()
+
+
+def ensure_bubble_columns(client, cursor):
+    """给旧的faust_launcher表格添加哈希与压缩列, 只在上传时调用"""
+    for name, column_type in BUBBLE_COLUMNS.items():
+        if not client.column_exists(cursor, 'faust_launcher', name):
+            cursor.execute(f"ALTER TABLE faust_launcher ADD COLUMN {name} {column_type}")
+            client.mark_table_exists(f"faust_launcher.{name}")
+            print(f"添加列 {name} 成功")
+
+
 def set_bubble_json_files(host, port, user, password, database, battle_speech_file, cultivation_file, mowe_file):
     """
     在faust_launcher表格中设置三个JSON文件的内容
@@ -17,22 +190,18 @@ def set_bubble_json_files(host, port, user, password, database, battle_speech_fi
         cultivation_file: BattleSpeechBubbleDlg_Cultivation.json文件内容
         mowe_file: BattleSpeechBubbleDlg_mowe.json文件内容
     """
+    # 旧版启动器读取文本列, 新版只比较哈希并下载压缩列
+    bubble_hash = compute_bubble_hash(battle_speech_file, cultivation_file, mowe_file)
+    compressed = [zlib.compress(content.encode('utf-8'), 9)
+                  for content in (battle_speech_file, cultivation_file, mowe_file)]
+    
     try:
-        # 连接MySQL数据库
-        connection = pymysql.connect(
-            host=host,
-            port=port,
-            user=user,
-            password=password,
-            database=database,
-            charset='utf8mb4',
-            cursorclass=pymysql.cursors.DictCursor
-        )
+        # 使用共享的连接池
+        client = get_sql_client(host, port, user, password, database)
         
-        with connection.cursor() as cursor:
-            # 检查表格是否存在
-            cursor.execute("SHOW TABLES LIKE 'faust_launcher'")
-            table_exists = cursor.fetchone()
+        with client.cursor() as cursor:
+            # 检查表格是否存在, 结果在进程内缓存
+            table_exists = client.table_exists(cursor, 'faust_launcher')
             
             if not table_exists:
                 # 如果表格不存在，创建表格
@@ -47,8 +216,11 @@ def set_bubble_json_files(host, port, user, password, database, battle_speech_fi
                 )
                 """
                 cursor.execute(create_table_query)
+                client.mark_table_exists('faust_launcher')
                 print("创建faust_launcher表格成功")
             
+            ensure_bubble_columns(client, cursor)
+            
             # 检查记录是否存在
             cursor.execute("SELECT COUNT(*) as count FROM faust_launcher")
             record_count = cursor.fetchone()['count'] # type: ignore
@@ -56,10 +228,11 @@ def set_bubble_json_files(host, port, user, password, database, battle_speech_fi
             if record_count == 0:
                 # 插入新记录
                 insert_query = """
-                INSERT INTO faust_launcher (battle_speech_bubble, battle_speech_bubble_cultivation, battle_speech_bubble_mowe) 
-                VALUES (%s, %s, %s)
+                INSERT INTO faust_launcher (battle_speech_bubble, battle_speech_bubble_cultivation, battle_speech_bubble_mowe,
+                bubble_hash, battle_speech_bubble_z, battle_speech_bubble_cultivation_z, battle_speech_bubble_mowe_z) 
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
                 """
-                cursor.execute(insert_query, (battle_speech_file, cultivation_file, mowe_file))
+                cursor.execute(insert_query, (battle_speech_file, cultivation_file, mowe_file, bubble_hash, *compressed))
                 print("插入JSON文件记录成功")
             else:
                 # 更新现有记录
@@ -67,10 +240,14 @@ def set_bubble_json_files(host, port, user, password, database, battle_speech_fi
                 UPDATE faust_launcher SET 
                 battle_speech_bubble = %s, 
                 battle_speech_bubble_cultivation = %s, 
-                battle_speech_bubble_mowe = %s 
+                battle_speech_bubble_mowe = %s,
+                bubble_hash = %s,
+                battle_speech_bubble_z = %s,
+                battle_speech_bubble_cultivation_z = %s,
+                battle_speech_bubble_mowe_z = %s
                 WHERE id = 1
                 """
-                cursor.execute(update_query, (battle_speech_file, cultivation_file, mowe_file))
+                cursor.execute(update_query, (battle_speech_file, cultivation_file, mowe_file, bubble_hash, *compressed))
                 print("更新JSON文件记录成功")
             
             # 验证设置
@@ -82,9 +259,7 @@ def set_bubble_json_files(host, port, user, password, database, battle_speech_fi
                 print(f" - BattleSpeechBubbleDlg.json: {len(result['battle_speech_bubble'])} 字符")
                 print(f" - BattleSpeechBubbleDlg_Cultivation.json: {len(result['battle_speech_bubble_cultivation'])} 字符")
                 print(f" - BattleSpeechBubbleDlg_mowe.json: {len(result['battle_speech_bubble_mowe'])} 字符")
-        
-        # 提交更改
-        connection.commit()
+                print(f" - 压缩后共 {sum(len(data) for data in compressed)} 字节, 哈希 {bubble_hash[:12]}")
         
         return True
         
@@ -94,10 +269,6 @@ def set_bubble_json_files(host, port, user, password, database, battle_speech_fi
     except Exception as e:
         print(f"错误: {e}")
         return False
-    finally:
-        # 确保连接关闭
-        if 'connection' in locals() and connection.open: # type: ignore
-            connection.close() # type: ignore
 
 def get_bubble_json_files(host, port, user, password, database):
     """
@@ -114,21 +285,12 @@ def get_bubble_json_files(host, port, user, password, database):
         tuple: (battle_speech_file, cultivation_file, mowe_file) 如果不存在则返回(None, None, None)
     """
     try:
-        # 连接MySQL数据库
-        connection = pymysql.connect(
-            host=host,
-            port=port,
-            user=user,
-            password=password,
-            database=database,
-            charset='utf8mb4',
-            cursorclass=pymysql.cursors.DictCursor
-        )
+        # 使用共享的连接池
+        client = get_sql_client(host, port, user, password, database)
         
-        with connection.cursor() as cursor:
-            # 检查表格是否存在
-            cursor.execute("SHOW TABLES LIKE 'faust_launcher'")
-            table_exists = cursor.fetchone()
+        with client.cursor() as cursor:
+            # 检查表格是否存在, 结果在进程内缓存
+            table_exists = client.table_exists(cursor, 'faust_launcher')
             
             if not table_exists:
                 print("⚠️ faust_launcher表格不存在")
@@ -151,10 +313,120 @@ def get_bubble_json_files(host, port, user, password, database):
     except Exception as e:
         print(f"错误: {e}")
         return None, None, None
-    finally:
-        # 确保连接关闭
-        if 'connection' in locals() and connection.open: # type: ignore
-            connection.close() # type: ignore
+
+def get_bubble_hash(host, port, user, password, database):
+    """
+    只查询气泡文本的内容哈希, 用于判断本地缓存是否需要更新
+    
+    Returns:
+        str: 内容哈希, 表格不存在或尚未写入哈希时返回None
+    """
+    try:
+        client = get_sql_client(host, port, user, password, database)
+        
+        with client.cursor() as cursor:
+            if not client.table_exists(cursor, 'faust_launcher'):
+                print("⚠️ faust_launcher表格不存在")
+                return None
+            
+            if not client.column_exists(cursor, 'faust_launcher', 'bubble_hash'):
+                # 服务器还没有上传过压缩数据
+                return None
+            
+            cursor.execute("SELECT bubble_hash FROM faust_launcher WHERE id = 1")
+            result = cursor.fetchone()
+            return result['bubble_hash'] if result else None
+        
+    except pymysql.Error as e:
+        print(f"MySQL错误: {e}")
+        return None
+    except Exception as e:
+        print(f"错误: {e}")
+        return None
+
+def get_compressed_bubble_files(host, port, user, password, database, expected_hash):
+    """
+    获取压缩后的三个JSON文件并解压, 内容与哈希不一致时视为失败
+    
+    Returns:
+        tuple: (battle_speech_file, cultivation_file, mowe_file) 失败时返回(None, None, None)
+    """
+    try:
+        client = get_sql_client(host, port, user, password, database)
+        
+        with client.cursor() as cursor:
+            cursor.execute("SELECT battle_speech_bubble_z, battle_speech_bubble_cultivation_z, battle_speech_bubble_mowe_z FROM faust_launcher WHERE id = 1")
+            result = cursor.fetchone()
+        
+        if not result or not all(result.values()):
+            print("⚠️ 压缩字段为空或记录不存在")
+            return None, None, None
+        
+        compressed_size = sum(len(data) for data in result.values())
+        files = tuple(zlib.decompress(result[name]).decode('utf-8') for name in (
+            'battle_speech_bubble_z', 'battle_speech_bubble_cultivation_z', 'battle_speech_bubble_mowe_z'))
+        if compute_bubble_hash(*files) != expected_hash:
+            print("⚠️ 气泡文本哈希校验失败")
+            return None, None, None
+        
+        print(f"获取压缩JSON文件成功, 传输 {compressed_size} 字节")
+        return files
+        
+    except pymysql.Error as e:
+        print(f"MySQL错误: {e}")
+        return None, None, None
+    except Exception as e:
+        print(f"错误: {e}")
+        return None, None, None
+
+def load_cached_bubble_files(bubble_hash):
+    """读取本地缓存的气泡文本, 缓存不完整时返回None"""
+    cache_dir = os.path.join(BUBBLE_CACHE_DIR, bubble_hash)
+    try:
+        files = []
+        for name in BUBBLE_FILE_NAMES:
+            with open(os.path.join(cache_dir, name), 'r', encoding='utf-8') as f:
+                files.append(f.read())
+    except OSError:
+        return None
+    if compute_bubble_hash(*files) != bubble_hash:
+        return None
+    return tuple(files)
+
+def save_cached_bubble_files(bubble_hash, files):
+    """保存气泡文本到本地缓存, 并删除其他版本的缓存"""
+    try:
+        cache_dir = os.path.join(BUBBLE_CACHE_DIR, bubble_hash)
+        os.makedirs(cache_dir, exist_ok=True)
+        for name, content in zip(BUBBLE_FILE_NAMES, files):
+            with open(os.path.join(cache_dir, name), 'w', encoding='utf-8') as f:
+                f.write(content)
+        for item in os.listdir(BUBBLE_CACHE_DIR):
+            if item != bubble_hash:
+                shutil.rmtree(os.path.join(BUBBLE_CACHE_DIR, item), ignore_errors=True)
+    except OSError as e:
+        print(f"保存气泡文本缓存失败: {e}")
+
+def fetch_bubble_files(host, port, user, password, database):
+    """
+    获取三个JSON文件的内容, 优先使用本地缓存
+    先只查询内容哈希, 哈希与缓存一致时不再下载; 服务器尚未写入哈希时退回读取文本列
+    """
+    bubble_hash = get_bubble_hash(host, port, user, password, database)
+    if not bubble_hash:
+        return get_bubble_json_files(host, port, user, password, database)
+    
+    files = load_cached_bubble_files(bubble_hash)
+    if files:
+        print(f"气泡文本未变化, 使用本地缓存 {bubble_hash[:12]}")
+        return files
+    
+    files = get_compressed_bubble_files(host, port, user, password, database, bubble_hash)
+    if not all(files):
+        return get_bubble_json_files(host, port, user, password, database)
+    
+    save_cached_bubble_files(bubble_hash, files)
+    return files
 
 def upload_bubble_files_from_temp(host, port, user, password, database, temp_dir=None):
     """
@@ -239,7 +511,7 @@ def download_bubble_files_to_game(host, port, user, password, database, game_pat
     """
     # 从数据库获取三个JSON文件内容
     print("正在从数据库获取JSON文件内容...")
-    battle_speech, cultivation, mowe = get_bubble_json_files(host, port, user, password, database)
+    battle_speech, cultivation, mowe = fetch_bubble_files(host, port, user, password, database)
     
     if not battle_speech or not cultivation or not mowe:
         print("无法从数据库获取JSON文件内容")
@@ -262,23 +534,19 @@ def download_bubble_files_to_game(host, port, user, password, database, game_pat
         # 确保目标目录存在
         os.makedirs(target_dir, exist_ok=True)
         
-        # 保存BattleSpeechBubbleDlg.json
-        battle_speech_path = os.path.join(target_dir, 'BattleSpeechBubbleDlg.json')
-        with open(battle_speech_path, 'w', encoding='utf-8') as f:
-            f.write(battle_speech)
-        print(f"保存 BattleSpeechBubbleDlg.json 成功")
-        
-        # 保存BattleSpeechBubbleDlg_Cultivation.json
-        cultivation_path = os.path.join(target_dir, 'BattleSpeechBubbleDlg_Cultivation.json')
-        with open(cultivation_path, 'w', encoding='utf-8') as f:
-            f.write(cultivation)
-        print(f"保存 BattleSpeechBubbleDlg_Cultivation.json 成功")
-        
-        # 保存BattleSpeechBubbleDlg_mowe.json
-        mowe_path = os.path.join(target_dir, 'BattleSpeechBubbleDlg_mowe.json')
-        with open(mowe_path, 'w', encoding='utf-8') as f:
-            f.write(mowe)
-        print(f"保存 BattleSpeechBubbleDlg_mowe.json 成功")
+        for name, content in zip(BUBBLE_FILE_NAMES, (battle_speech, cultivation, mowe)):
+            file_path = os.path.join(target_dir, name)
+            
+            # 内容相同时不重写
+            if os.path.exists(file_path):
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    if f.read() == content:
+                        print(f"{name} 未变化")
+                        continue
+            
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            print(f"保存 {name} 成功")
         
         print(f"JSON文件已成功保存到: {target_dir}")
         return True
@@ -319,21 +587,12 @@ def get_all_records(host, port, user, password, database):
         list: 所有记录的列表
     """
     try:
-        # 连接MySQL数据库
-        connection = pymysql.connect(
-            host=host,
-            port=port,
-            user=user,
-            password=password,
-            database=database,
-            charset='utf8mb4',
-            cursorclass=pymysql.cursors.DictCursor
-        )
+        # 使用共享的连接池
+        client = get_sql_client(host, port, user, password, database)
         
-        with connection.cursor() as cursor:
-            # 检查表格是否存在
-            cursor.execute("SHOW TABLES LIKE 'faust_launcher'")
-            table_exists = cursor.fetchone()
+        with client.cursor() as cursor:
+            # 检查表格是否存在, 结果在进程内缓存
+            table_exists = client.table_exists(cursor, 'faust_launcher')
             
             if not table_exists:
                 print("⚠️ faust_launcher表格不存在")
@@ -352,10 +611,6 @@ def get_all_records(host, port, user, password, database):
     except Exception as e:
         print(f"错误: {e}")
         return []
-    finally:
-        # 确保连接关闭
-        if 'connection' in locals() and connection.open: # type: ignore
-            connection.close() # type: ignore
 
 def create_version_table(host, port, user, password, database):
     """
@@ -372,21 +627,12 @@ def create_version_table(host, port, user, password, database):
         bool: 创建是否成功
     """
     try:
-        # 连接MySQL数据库
-        connection = pymysql.connect(
-            host=host,
-            port=port,
-            user=user,
-            password=password,
-            database=database,
-            charset='utf8mb4',
-            cursorclass=pymysql.cursors.DictCursor
-        )
+        # 使用共享的连接池
+        client = get_sql_client(host, port, user, password, database)
         
-        with connection.cursor() as cursor:
-            # 检查表格是否存在
-            cursor.execute("SHOW TABLES LIKE 'faust_versions'")
-            table_exists = cursor.fetchone()
+        with client.cursor() as cursor:
+            # 检查表格是否存在, 结果在进程内缓存
+            table_exists = client.table_exists(cursor, 'faust_versions')
             
             if not table_exists:
                 # 如果表格不存在，创建表格
@@ -402,6 +648,7 @@ def create_version_table(host, port, user, password, database):
                 )
                 """
                 cursor.execute(create_table_query)
+                client.mark_table_exists('faust_versions')
                 print("创建faust_versions表格成功")
                 return True
             else:
@@ -414,10 +661,6 @@ def create_version_table(host, port, user, password, database):
     except Exception as e:
         print(f"错误: {e}")
         return False
-    finally:
-        # 确保连接关闭
-        if 'connection' in locals() and connection.open: # type: ignore
-            connection.close() # type: ignore
 
 def add_version(host, port, user, password, database, version_name, bilibili_url, version_description, is_latest=False):
     """
@@ -438,18 +681,10 @@ def add_version(host, port, user, password, database, version_name, bilibili_url
         bool: 添加是否成功
     """
     try:
-        # 连接MySQL数据库
-        connection = pymysql.connect(
-            host=host,
-            port=port,
-            user=user,
-            password=password,
-            database=database,
-            charset='utf8mb4',
-            cursorclass=pymysql.cursors.DictCursor
-        )
+        # 使用共享的连接池
+        client = get_sql_client(host, port, user, password, database)
         
-        with connection.cursor() as cursor:
+        with client.cursor() as cursor:
             # 如果设置为最新版本，先取消其他版本的最新标记
             if is_latest:
                 cursor.execute("UPDATE faust_versions SET is_latest = FALSE WHERE is_latest = TRUE")
@@ -461,9 +696,6 @@ def add_version(host, port, user, password, database, version_name, bilibili_url
             """
             cursor.execute(insert_query, (version_name, bilibili_url, version_description, is_latest))
             
-            # 提交更改
-            connection.commit()
-            
             print(f"添加版本信息成功: {version_name}")
             return True
         
@@ -473,10 +705,6 @@ def add_version(host, port, user, password, database, version_name, bilibili_url
     except Exception as e:
         print(f"错误: {e}")
         return False
-    finally:
-        # 确保连接关闭
-        if 'connection' in locals() and connection.open: # type: ignore
-            connection.close() # type: ignore
 
 def update_version(host, port, user, password, database, version_id, version_name, bilibili_url, version_description, is_latest=False):
     """
@@ -498,18 +726,10 @@ def update_version(host, port, user, password, database, version_id, version_nam
         bool: 更新是否成功
     """
     try:
-        # 连接MySQL数据库
-        connection = pymysql.connect(
-            host=host,
-            port=port,
-            user=user,
-            password=password,
-            database=database,
-            charset='utf8mb4',
-            cursorclass=pymysql.cursors.DictCursor
-        )
+        # 使用共享的连接池
+        client = get_sql_client(host, port, user, password, database)
         
-        with connection.cursor() as cursor:
+        with client.cursor() as cursor:
             # 如果设置为最新版本，先取消其他版本的最新标记
             if is_latest:
                 cursor.execute("UPDATE faust_versions SET is_latest = FALSE WHERE is_latest = TRUE AND id != %s", (version_id,))
@@ -526,9 +746,6 @@ def update_version(host, port, user, password, database, version_id, version_nam
             """
             cursor.execute(update_query, (version_name, bilibili_url, version_description, is_latest, version_id))
             
-            # 提交更改
-            connection.commit()
-            
             print(f"更新版本信息成功: {version_name}")
             return True
         
@@ -538,10 +755,6 @@ def update_version(host, port, user, password, database, version_id, version_nam
     except Exception as e:
         print(f"错误: {e}")
         return False
-    finally:
-        # 确保连接关闭
-        if 'connection' in locals() and connection.open: # type: ignore
-            connection.close() # type: ignore
 
 def delete_version(host, port, user, password, database, version_id):
     """
@@ -559,25 +772,14 @@ def delete_version(host, port, user, password, database, version_id):
         bool: 删除是否成功
     """
     try:
-        # 连接MySQL数据库
-        connection = pymysql.connect(
-            host=host,
-            port=port,
-            user=user,
-            password=password,
-            database=database,
-            charset='utf8mb4',
-            cursorclass=pymysql.cursors.DictCursor
-        )
+        # 使用共享的连接池
+        client = get_sql_client(host, port, user, password, database)
         
-        with connection.cursor() as cursor:
+        with client.cursor() as cursor:
             # 删除版本信息
             delete_query = "DELETE FROM faust_versions WHERE id = %s"
             cursor.execute(delete_query, (version_id,))
             
-            # 提交更改
-            connection.commit()
-            
             print(f"删除版本信息成功: ID {version_id}")
             return True
         
@@ -587,10 +789,6 @@ def delete_version(host, port, user, password, database, version_id):
     except Exception as e:
         print(f"错误: {e}")
         return False
-    finally:
-        # 确保连接关闭
-        if 'connection' in locals() and connection.open: # type: ignore
-            connection.close() # type: ignore
 
 def get_all_versions(host, port, user, password, database):
     """
@@ -607,18 +805,10 @@ def get_all_versions(host, port, user, password, database):
         list: 所有版本信息的列表
     """
     try:
-        # 连接MySQL数据库
-        connection = pymysql.connect(
-            host=host,
-            port=port,
-            user=user,
-            password=password,
-            database=database,
-            charset='utf8mb4',
-            cursorclass=pymysql.cursors.DictCursor
-        )
+        # 使用共享的连接池
+        client = get_sql_client(host, port, user, password, database)
         
-        with connection.cursor() as cursor:
+        with client.cursor() as cursor:
             # 查询所有版本信息
             cursor.execute("SELECT * FROM faust_versions ORDER BY created_at DESC")
             results = cursor.fetchall()
@@ -632,10 +822,6 @@ def get_all_versions(host, port, user, password, database):
     except Exception as e:
         print(f"错误: {e}")
         return []
-    finally:
-        # 确保连接关闭
-        if 'connection' in locals() and connection.open: # type: ignore
-            connection.close() # type: ignore
 
 def get_latest_version(host, port, user, password, database):
     """
@@ -652,18 +838,10 @@ def get_latest_version(host, port, user, password, database):
         dict: 最新版本信息，如果不存在则返回None
     """
     try:
-        # 连接MySQL数据库
-        connection = pymysql.connect(
-            host=host,
-            port=port,
-            user=user,
-            password=password,
-            database=database,
-            charset='utf8mb4',
-            cursorclass=pymysql.cursors.DictCursor
-        )
+        # 使用共享的连接池
+        client = get_sql_client(host, port, user, password, database)
         
-        with connection.cursor() as cursor:
+        with client.cursor() as cursor:
             # 查询最新版本信息
             cursor.execute("SELECT * FROM faust_versions WHERE is_latest = TRUE ORDER BY created_at DESC LIMIT 1")
             result = cursor.fetchone()
@@ -681,10 +859,6 @@ def get_latest_version(host, port, user, password, database):
     except Exception as e:
         print(f"错误: {e}")
         return None
-    finally:
-        # 确保连接关闭
-        if 'connection' in locals() and connection.open: # type: ignore
-            connection.close() # type: ignore
 
 def get_version_by_id(host, port, user, password, database, version_id):
     """
@@ -702,18 +876,10 @@ def get_version_by_id(host, port, user, password, database, version_id):
         dict: 版本信息，如果不存在则返回None
     """
     try:
-        # 连接MySQL数据库
-        connection = pymysql.connect(
-            host=host,
-            port=port,
-            user=user,
-            password=password,
-            database=database,
-            charset='utf8mb4',
-            cursorclass=pymysql.cursors.DictCursor
-        )
+        # 使用共享的连接池
+        client = get_sql_client(host, port, user, password, database)
         
-        with connection.cursor() as cursor:
+        with client.cursor() as cursor:
             # 根据ID查询版本信息
             cursor.execute("SELECT * FROM faust_versions WHERE id = %s", (version_id,))
             result = cursor.fetchone()
@@ -731,10 +897,6 @@ def get_version_by_id(host, port, user, password, database, version_id):
     except Exception as e:
         print(f"错误: {e}")
         return None
-    finally:
-        # 确保连接关闭
-        if 'connection' in locals() and connection.open: # type: ignore
-            connection.close() # type: ignore
 
 # GUI界面类
 class VersionManagerGUI:
@@ -0,0 +1,250 @@
+import os
+import zlib
+import struct
+import time
+import requests
+from typing import Callable, List, Optional
+
+# 每次从网络读取的字节数
+CHUNK_SIZE = 64 * 1024
+
+LOCAL_HEADER_SIGNATURE = b'PK\x03\x04'
+DESCRIPTOR_SIGNATURE = b'PK\x07\x08'
+# 本地文件头之后是中央目录(或空压缩包的目录结尾), 出现时说明所有文件都已解压
+END_SIGNATURES = (b'PK\x01\x02', b'PK\x05\x06')
+LOCAL_HEADER = struct.Struct('<4sHHHIIIIHH')
+
+FLAG_ENCRYPTED = 0x1
+FLAG_DATA_DESCRIPTOR = 0x8
+FLAG_UTF8 = 0x800
+METHOD_STORED = 0
+METHOD_DEFLATED = 8
+
+
+class ZipStreamExtractor:
+    """
+    边接收边解压的 zip 解压器
+    zip 的每个文件前都有本地文件头, 按顺序读取本地文件头即可逐个解压, 不需要先拿到位于末尾的中央目录.
+    每个文件先写到同目录的 .stream 临时文件, 校验 CRC 后再替换目标文件.
+    """
+
+    def __init__(self, extract_path: str):
+        self.extract_path = os.path.abspath(extract_path)
+        self.buffer = bytearray()
+        self.state = 'header'
+        self.entry = None
+        self.files = 0
+        self.finished = False
+
+    def feed(self, data: bytes):
+        """送入下一段数据, 解压其中已经完整的部分"""
+        self.buffer += data
+        while not self.finished:
+            if self.state == 'header':
+                progressed = self.read_header()
+            elif self.state == 'data':
+                progressed = self.read_data()
+            else:
+                progressed = self.read_descriptor()
+            if not progressed:
+                break
+
+    def close(self):
+        """删除未写完的临时文件"""
+        entry, self.entry = self.entry, None
+        if entry and entry['file']:
+            entry['file'].close()
+            os.remove(entry['temp_path'])
+
+    def target_path(self, name: str) -> Optional[str]:
+        """压缩包内路径对应的本地路径, 越出解压目录的路径返回 None"""
+        path = os.path.normpath(os.path.join(self.extract_path, name))
+        if os.path.commonpath([self.extract_path, path]) != self.extract_path:
+            return None
+        return path
+
+    def read_header(self) -> bool:
+        if len(self.buffer) < 4:
+            return False
+        signature = bytes(self.buffer[:4])
+        if signature in END_SIGNATURES:
+            self.finished = True
+            return False
+        if signature != LOCAL_HEADER_SIGNATURE:
+            raise IOError("无法识别的 zip 文件头")
+        if len(self.buffer) < LOCAL_HEADER.size:
+            return False
+
+        _, _, flags, method, _, crc, compressed_size, size, name_length, extra_length = \
+            LOCAL_HEADER.unpack_from(self.buffer)
+        header_size = LOCAL_HEADER.size + name_length + extra_length
+        if len(self.buffer) < header_size:
+            return False
+
+        raw_name = bytes(self.buffer[LOCAL_HEADER.size:LOCAL_HEADER.size + name_length])
+        name = raw_name.decode('utf-8' if flags & FLAG_UTF8 else 'cp437')
+        extra = bytes(self.buffer[LOCAL_HEADER.size + name_length:header_size])
+        del self.buffer[:header_size]
+
+        if flags & FLAG_ENCRYPTED:
+            raise IOError(f"不支持加密的文件: {name}")
+        if method not in (METHOD_STORED, METHOD_DEFLATED):
+            raise IOError(f"不支持的压缩方式 {method}: {name}")
+
+        # zip64 的大小记录在扩展字段中
+        zip64 = False
+        offset = 0
+        while offset + 4 <= len(extra):
+            field_id, field_size = struct.unpack_from('<HH', extra, offset)
+            if field_id == 0x0001:
+                zip64 = True
+                field = extra[offset + 4:offset + 4 + field_size]
+                if size == 0xFFFFFFFF and len(field) >= 8:
+                    size = struct.unpack_from('<Q', field)[0]
+                    field = field[8:]
+                if compressed_size == 0xFFFFFFFF and len(field) >= 8:
+                    compressed_size = struct.unpack_from('<Q', field)[0]
+            offset += 4 + field_size
+
+        has_descriptor = bool(flags & FLAG_DATA_DESCRIPTOR)
+        remaining = compressed_size
+        if has_descriptor and method == METHOD_DEFLATED:
+            remaining = None
+        elif has_descriptor and name.endswith('/'):
+            remaining = 0
+        elif has_descriptor:
+            # 未压缩的数据没有结束标记, 只能依赖中央目录中的大小
+            raise IOError(f"无法流式解压: {name}")
+
+        target_path = self.target_path(name)
+        if target_path is None:
+            print(f"跳过不安全的路径: {name}")
+        elif name.endswith('/'):
+            os.makedirs(target_path, exist_ok=True)
+            target_path = None
+
+        # 目录与跳过的文件仍要读过其数据, 只是不写入
+        temp_path = target_path + '.stream' if target_path else None
+        if temp_path:
+            os.makedirs(os.path.dirname(temp_path), exist_ok=True)
+        self.entry = {
+            'name': name,
+            'target_path': target_path,
+            'temp_path': temp_path,
+            'file': open(temp_path, 'wb') if temp_path else None,
+            'crc': crc,
+            'remaining': remaining,
+            'descriptor': has_descriptor,
+            'zip64': zip64,
+            'actual_crc': 0,
+            'decompressor': zlib.decompressobj(-zlib.MAX_WBITS) if method == METHOD_DEFLATED else None
+        }
+        self.state = 'data'
+        return True
+
+    def write(self, data: bytes):
+        entry = self.entry
+        entry['actual_crc'] = zlib.crc32(data, entry['actual_crc'])
+        if entry['file']:
+            entry['file'].write(data)
+
+    def read_data(self) -> bool:
+        entry = self.entry
+        decompressor = entry['decompressor']
+
+        if entry['remaining'] is None:
+            # 大小写在数据之后, 由 deflate 流自身的结束标记确定文件结尾
+            if not self.buffer:
+                return False
+            self.write(decompressor.decompress(bytes(self.buffer)))
+            self.buffer = bytearray(decompressor.unused_data)
+            if not decompressor.eof:
+                return False
+            self.state = 'descriptor'
+            return True
+
+        take = min(entry['remaining'], len(self.buffer))
+        if take:
+            data = bytes(self.buffer[:take])
+            del self.buffer[:take]
+            entry['remaining'] -= take
+            self.write(decompressor.decompress(data) if decompressor else data)
+        if entry['remaining']:
+            return False
+        if decompressor:
+            self.write(decompressor.flush())
+        if entry['descriptor']:
+            self.state = 'descriptor'
+        else:
+            self.finish_entry(entry['crc'])
+        return True
+
+    def read_descriptor(self) -> bool:
+        size_length = 8 if self.entry['zip64'] else 4
+        signature_length = 4 if self.buffer[:4] == DESCRIPTOR_SIGNATURE else 0
+        descriptor_length = signature_length + 4 + size_length * 2
+        if len(self.buffer) < descriptor_length:
+            return False
+        crc = struct.unpack_from('<I', self.buffer, signature_length)[0]
+        del self.buffer[:descriptor_length]
+        self.finish_entry(crc)
+        return True
+
+    def finish_entry(self, crc: int):
+        entry, self.entry = self.entry, None
+        self.state = 'header'
+        if not entry['file']:
+            return
+        entry['file'].close()
+        if entry['actual_crc'] != crc:
+            os.remove(entry['temp_path'])
+            raise IOError(f"文件校验失败: {entry['name']}")
+        os.replace(entry['temp_path'], entry['target_path'])
+        self.files += 1
+
+
+def stream_extract_zip(zip_urls: List[str], extract_path: str,
+                       progress_callback: Optional[Callable[[int, int, float], None]] = None,
+                       should_continue: Optional[Callable[[], bool]] = None, timeout: float = 30) -> bool:
+    """
+    下载 zip 的同时逐个解压其中的文件, 压缩包本身不落盘
+
+    Args:
+        zip_urls: 同一个 zip 的多个下载地址, 按优先级排列, 当前地址失败时从头换下一个地址
+        extract_path: 解压目录
+        progress_callback: 进度回调 (已下载字节, 总字节, 速度KB/s)
+        should_continue: 返回 False 时中止
+
+    Returns:
+        全部文件解压成功返回 True, 返回 False 时应退回下载完整压缩包
+    """
+    should_continue = should_continue or (lambda: True)
+    for url in zip_urls:
+        extractor = ZipStreamExtractor(extract_path)
+        try:
+            with requests.get(url, stream=True, timeout=timeout, verify=False) as response:
+                response.raise_for_status()
+                total = int(response.headers.get('content-length', 0))
+                downloaded = 0
+                start_time = time.time()
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    if not should_continue():
+                        print("边下载边解压已取消")
+                        return False
+                    extractor.feed(chunk)
+                    downloaded += len(chunk)
+                    if progress_callback:
+                        speed = downloaded / max(time.time() - start_time, 1e-6) / 1024
+                        progress_callback(downloaded, total, speed)
+                    if extractor.finished:
+                        # 之后只剩中央目录, 无需继续下载
+                        break
+            if not extractor.finished:
+                raise IOError("压缩包数据不完整")
+            print(f"边下载边解压完成, 共 {extractor.files} 个文件")
+            return True
+        except Exception as e:
+            print(f"边下载边解压失败 {url}: {e}")
+        finally:
+            extractor.close()
+    return False
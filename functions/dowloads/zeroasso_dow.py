@@ -5,8 +5,13 @@ import tkinter as tk
 from tkinter import ttk
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from functions.dowloads.github_ulits import GitHubReleaseFetcher
 from functions.dowloads.dow_ulits import check_need_up_translate
+from functions.dowloads.segment_dow import SegmentedDownloader
+from functions.dowloads.delta_dow import fetch_manifest, apply_delta
+from functions.dowloads.stream_dow import stream_extract_zip
+from functions.dowloads.mirror_race import rank_mirrors, record_mirror_speed
 from functions.base.settings_manager import get_settings_manager
 from functions.base.window_ulits import center_window
 
@@ -240,8 +245,8 @@ class DownloadGUI:
         finally:
             self.is_downloading = False
 
-def get_github_release_url() -> tuple[str, str] | None:
-    """从GitHub Release获取7z文件下载链接"""
+def get_github_release_url() -> tuple[str, str, dict] | None:
+    """从GitHub Release获取7z文件下载链接, 版本名称以及用于校验的大小与 sha256"""
     try:
         fetcher = GitHubReleaseFetcher(
             repo_owner="LocalizeLimbusCompany",
@@ -252,18 +257,21 @@ def get_github_release_url() -> tuple[str, str] | None:
         
         latest_release = fetcher.get_latest_release()
         if not latest_release:
-            return None, None # type: ignore
+            return None, None, None # type: ignore
             
         # 查找7z文件
         windows_assets = latest_release.get_assets_by_extension(".7z")
         for asset in windows_assets:
             if "LimbusLocalize" in asset.name:
-                return asset.download_url, latest_release.name
+                checksum = {'size': asset.size}
+                if asset.digest.startswith('sha256:'):
+                    checksum['sha256'] = asset.digest[len('sha256:'):]
+                return asset.download_url, latest_release.name, checksum
                 
-        return None, None # type: ignore
+        return None, None, None # type: ignore
     except Exception as e:
         print(f"获取GitHub Release失败: {e}")
-        return None, None # type: ignore
+        return None, None, None # type: ignore
 
 
 # 保留原有的函数（用于命令行模式）
@@ -380,6 +388,13 @@ def extract_7z_file(archive_path, extract_path):
     print("7-Zip解压失败，尝试使用zipfile备用方案...")
     return extract_with_zipfile_backup(archive_path, extract_path)
 
+def extract_and_cleanup(archive_path, extract_path):
+    """解压压缩包并删除临时文件, 在后台线程中运行"""
+    try:
+        return extract_7z_file(archive_path, extract_path)
+    finally:
+        cleanup_temp_files(archive_path)
+
 def create_config_file(game_path):
     """创建配置文件"""
     try:
@@ -438,104 +453,73 @@ def verify_download(file_path):
         print(f"文件验证失败: {e}")
         return False
     
-def download_file_with_gui(url, local_filename, gui, file_name):
-    """带GUI进度显示的下载文件函数"""
+def download_file_with_gui(url, local_filename, gui, file_name, mirrors = None, checksum = None):
+    """带GUI进度显示的下载文件函数, 使用分段下载, 中断后可断点续传
+    mirrors: 按速度排好序的 {镜像名称: 下载地址}, 下载中当前镜像失败或变慢时依次切换
+    checksum: 发布的大小与 sha256, 下载时边下载边校验
+    """
     try:
         # 更新GUI状态
         gui.current_file_var.set(f"正在下载: {file_name}")
         
-        # 发送请求
-        response = requests.get(url, stream=True, verify=False)
-        response.raise_for_status()
-        
-        # 获取文件大小
-        total_size = int(response.headers.get('content-length', 0))
-        if total_size == 0:
-            # 如果无法获取文件大小，使用默认值
-            total_size = 10 * 1024 * 1024  # 10MB作为默认值
-        
-        block_size = 8192
-        
-        # 创建目录
-        os.makedirs(os.path.dirname(local_filename), exist_ok=True)
-        
-        # 开始时间
-        start_time = time.time()
-        downloaded_size = 0
-        last_update_time = start_time
-        last_downloaded_size = 0
-        
         # 平滑进度条相关变量
-        current_animated_percent = 0.0  # 当前动画显示的百分比
-        target_percent = 0.0  # 目标百分比
         animation_speed = 0.15  # 动画速度系数，值越小越平滑
-        last_animation_time = start_time
+        progress_state = {'animated': 0.0, 'target': 0.0, 'downloaded': 0, 'total': 0}
         
-        # 下载文件
-        with open(local_filename, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=block_size):
-                if not gui.is_downloading:
-                    return False
-                    
-                if chunk:
-                    speed = 0
-                    f.write(chunk)
-                    downloaded_size += len(chunk)
-                    
-                    # 计算实时下载速度（每秒更新）
-                    current_time = time.time()
-
-                    elapsed_time = current_time - last_update_time
-                    downloaded_since_last = downloaded_size - last_downloaded_size
-                    
-                    speed = downloaded_since_last / elapsed_time / 1024  # KB/s
-                    
-                    # 计算目标百分比
-                    target_percent = (downloaded_size / total_size) * 100
-                        
-                    # 平滑渐变效果：持续向目标百分比移动
-                    animation_elapsed = current_time - last_animation_time
-                    if animation_elapsed > 0.1:  # 每0.1秒更新一次动画
-                        if current_animated_percent < target_percent:
-                            # 使用缓动函数实现平滑过渡
-                            progress_diff = target_percent - current_animated_percent
-                            current_animated_percent += progress_diff * animation_speed
-                            
-                            # 确保不超过目标值
-                            if current_animated_percent > target_percent:
-                                current_animated_percent = target_percent
-                        
-                        # 显示下载进度（使用平滑后的百分比）
-                        gui.update_progress(current_animated_percent, downloaded_size, total_size, speed)
-                        last_animation_time = current_time
-                    
-                    last_update_time = current_time
-                    last_downloaded_size = downloaded_size
+        def on_progress(downloaded_size, total_size, speed):
+            if total_size <= 0:
+                # 如果无法获取文件大小，使用默认值
+                total_size = 10 * 1024 * 1024  # 10MB作为默认值
+            
+            # 计算目标百分比
+            target_percent = min(downloaded_size / total_size * 100, 100)
+            current_animated_percent = progress_state['animated']
+            
+            # 平滑渐变效果：使用缓动函数持续向目标百分比移动
+            if current_animated_percent < target_percent:
+                current_animated_percent += (target_percent - current_animated_percent) * animation_speed
+            
+            progress_state.update(animated=current_animated_percent, target=target_percent,
+                                  downloaded=downloaded_size, total=total_size)
+            
+            # 显示下载进度（使用平滑后的百分比）
+            gui.update_progress(current_animated_percent, downloaded_size, total_size, speed)
+        
+        downloader = SegmentedDownloader(
+            url, local_filename,
+            progress_callback=on_progress,
+            should_continue=lambda: gui.is_downloading,
+            mirrors=list(mirrors.values()) if mirrors else None,
+            checksum=checksum
+        )
+        if not downloader.download():
+            return False
+        
+        # 记录实际使用的镜像速度, 供下次启动时选择镜像; 断点续传或切换过镜像时无法归属, 不记录
+        speed = downloader.session_speed
+        if mirrors and speed:
+            for name, mirror_url in mirrors.items():
+                if mirror_url == downloader.url:
+                    record_mirror_speed(name, speed)
         
-        # 下载完成后，平滑过渡到100%并停止震动
+        # 下载完成后，平滑过渡到100%
+        current_animated_percent = progress_state['animated']
         final_animation_start = time.time()
         while current_animated_percent < 99.9:
             current_time = time.time()
             animation_elapsed = current_time - final_animation_start
             
-            # 平滑过渡到100%
-            if current_animated_percent < target_percent:
-                progress_diff = target_percent - current_animated_percent
-                current_animated_percent += progress_diff * animation_speed * 2  # 加速完成
-            else:
-                # 如果已经达到目标值，继续平滑到100%
-                progress_diff = 100 - current_animated_percent
-                current_animated_percent += progress_diff * animation_speed * 1.5
+            progress_diff = 100 - current_animated_percent
+            current_animated_percent += progress_diff * animation_speed * 2  # 加速完成
             
             if current_animated_percent > 99.9:
                 current_animated_percent = 100
             
-            gui.update_progress(current_animated_percent, downloaded_size, total_size, 0)
+            gui.update_progress(current_animated_percent, progress_state['downloaded'], progress_state['total'], 0)
             time.sleep(0.01)  # 短暂延迟让动画更平滑
             
             # 防止无限循环
             if animation_elapsed > 2.0:  # 最多2秒完成动画
-                current_animated_percent = 100
                 break
         
         return True
@@ -547,15 +531,40 @@ def download_file_with_gui(url, local_filename, gui, file_name):
     except Exception as e:
         gui.current_file_var.set(f"❌ 下载过程中出现错误: {e}")
         # print(e)
+        return False
+
+# 一次下载流程中多处需要笔记内容, 短时间内复用同一份
+NOTE_CACHE_SECONDS = 60
+_note_cache = {'time': 0.0, 'content': None}
+
+def get_translate_note() -> dict:
+    """获取记录了汉化下载地址与版本号的笔记内容"""
+    if _note_cache['content'] is not None and time.time() - _note_cache['time'] < NOTE_CACHE_SECONDS:
+        return _note_cache['content']
 
-def get_dowload_path_ByNote() -> tuple[str, str] | None:
     from webFunc import Note
     from json import loads
     note = Note("FaustLauncher", 'AutoTranslate')
     note.fetch_note_info()
 
     # print("获取到笔记内容:", note.note_content)
-    note = loads(note.note_content)
+    _note_cache['content'] = loads(note.note_content)
+    _note_cache['time'] = time.time()
+    return _note_cache['content']
+
+def get_translate_checksum() -> dict | None:
+    """获取笔记中发布的当前版本汉化包校验信息"""
+    try:
+        note = get_translate_note()
+        checksum = note.get('llc_checksum')
+        if checksum and checksum.get('version') == note['llc_version']:
+            return checksum
+    except Exception as e:
+        print(f"获取校验信息失败: {e}")
+    return None
+
+def get_dowload_path_ByNote() -> tuple[str, str] | None:
+    note = get_translate_note()
     path = note['llc_download_mirror']['seven']['direct']
     version = note['llc_version']
 
@@ -566,13 +575,7 @@ def get_dowload_path_ByNote() -> tuple[str, str] | None:
     return None
 
 def get_dowload_path_ByGhProxy() -> tuple[str, str] | None:
-    from webFunc import Note
-    from json import loads
-    note = Note("FaustLauncher", 'AutoTranslate')
-    note.fetch_note_info()
-
-    # print("获取到笔记内容:", note.note_content)
-    note = loads(note.note_content)
+    note = get_translate_note()
     path = note['llc_download_url']['seven']
     path = 'https://gh-proxy.org/' + path
     version = note['llc_version']
@@ -582,7 +585,84 @@ def get_dowload_path_ByGhProxy() -> tuple[str, str] | None:
         return (path, version)
     print("未获取到下载地址,失败...")
     return None
+
+def get_dowload_path_ByRace() -> tuple[dict, str] | None:
+    """获取所有已知下载源, 按测速结果从快到慢排序, 返回 ({名称: 地址}, 版本号)"""
+    note = get_translate_note()
+    github_url = note['llc_download_url']['seven']
+    mirrors = {
+        'gh-proxy': 'https://gh-proxy.org/' + github_url if github_url else '',
+        'upfile': note['llc_download_mirror']['seven']['direct'],
+        'github': github_url,
+    }
+    mirrors = {name: url for name, url in mirrors.items() if url}
+    if not mirrors:
+        print("未获取到下载地址,失败...")
+        return None
+
+    ranked = rank_mirrors(mirrors)
+    print(f"下载源测速排序: {' > '.join(ranked)}")
+    return {name: mirrors[name] for name in ranked}, note['llc_version']
     
+def try_delta_update(gui, dowload_way, lang_dir) -> bool:
+    """尝试按清单增量更新汉化文件, 没有清单或更新失败时返回 False, 由调用方下载完整压缩包"""
+    try:
+        note = get_translate_note()
+        manifest_info = note.get('llc_manifest')
+        if not manifest_info or manifest_info.get('version') != note['llc_version']:
+            print("当前版本没有增量更新清单")
+            return False
+
+        manifest = fetch_manifest(manifest_info['direct'])
+        if not manifest:
+            return False
+
+        gui.current_file_var.set("正在增量更新: 零协会汉化包")
+
+        def on_progress(done, total):
+            gui.progress_var.set(done / total * 100)
+            gui.progress_text_var.set(f"{done / total * 100:.1f}% ({done}/{total} 个文件)")
+
+        return apply_delta(manifest, get_translate_zip_urls(dowload_way), lang_dir, on_progress)
+    except Exception as e:
+        print(f"增量更新失败: {e}")
+        return False
+
+def get_translate_zip_urls(dowload_way) -> list[str]:
+    """汉化包 zip 版本的下载地址, 与完整下载使用相同的下载源偏好"""
+    note = get_translate_note()
+    github_zip = note['llc_download_url'].get('zip', '')
+    mirror_zip = note['llc_download_mirror'].get('zip', {}).get('direct', '')
+    proxy_zip = 'https://gh-proxy.org/' + github_zip if github_zip else ''
+    if dowload_way == 1:
+        zip_urls = [mirror_zip, proxy_zip, github_zip]
+    else:
+        zip_urls = [proxy_zip, mirror_zip, github_zip]
+    return [url for url in zip_urls if url]
+
+def try_stream_extract(gui, dowload_way, extract_path) -> bool:
+    """
+    下载汉化包的 zip 版本并同时逐个解压其中的文件, 压缩包不写入磁盘
+    7z 的文件头在末尾且需要随机读取, 无法边下载边解压, 所以这里使用同时发布的 zip
+    没有 zip 地址或失败时返回 False, 由调用方下载 7z 压缩包
+    """
+    try:
+        zip_urls = get_translate_zip_urls(dowload_way)
+        if not zip_urls:
+            print("当前版本没有 zip 压缩包")
+            return False
+
+        gui.current_file_var.set("正在下载并解压: 零协会汉化包")
+
+        def on_progress(downloaded, total, speed):
+            total = total or 100 * 1024 * 1024
+            gui.update_progress(min(downloaded / total * 100, 100), downloaded, total, speed)
+
+        return stream_extract_zip(zip_urls, extract_path, on_progress, lambda: gui.is_downloading)
+    except Exception as e:
+        print(f"边下载边解压失败: {e}")
+        return False
+
 def download_and_extract_gui(gui:DownloadGUI, config_path: str = "", download_files = None) -> bool:
     """带GUI的下载和解压主函数"""
     # 加载配置
@@ -629,93 +709,134 @@ def download_and_extract_gui(gui:DownloadGUI, config_path: str = "", download_fi
     
     success_count = 0
     dowload_way = settings_manager.get_setting('translate_download_way')
+    # 解压在单独的线程中进行, 下一个文件的下载与上一个文件的解压同时进行
+    extract_executor = ThreadPoolExecutor(max_workers=1)
+    extract_jobs = []
     
-    for file_info in download_files:
-        if not gui.is_downloading:
-            break
+    try:
+        for file_info in download_files:
+            if not gui.is_downloading:
+                break
 
-        # 检查字体文件是否已存在
-        if os.path.exists("assets/Font/Context/ChineseFont.ttf") and \
-           file_info['name'] == 'TTF 字体文件':
-            print("字体文件已存在, 无需下载.")
-            success_count += 1
-            continue
+            # 检查字体文件是否已存在
+            if os.path.exists("assets/Font/Context/ChineseFont.ttf") and \
+               file_info['name'] == 'TTF 字体文件':
+                print("字体文件已存在, 无需下载.")
+                success_count += 1
+                continue
 
-        if file_info['name'] == '零协会汉化包':
+            if file_info['name'] == '零协会汉化包':
 
-            if dowload_way == 2:
-                print("使用 GitHub Release 方式下载汉化文件...")
+                if dowload_way == 2:
+                    print("使用 GitHub Release 方式下载汉化文件...")
 
-                while not dowload_url:
-                    if timeout_counter >= 10:
-                        gui.current_file_var.set("❌ 获取GitHub Release信息失败，已达最大重试次数")
-                        return False
+                    while not dowload_url:
+                        if timeout_counter >= 10:
+                            gui.current_file_var.set("❌ 获取GitHub Release信息失败，已达最大重试次数")
+                            return False
                     
-                    dowload_url, name = get_github_release_url() # type: ignore
+                        dowload_url, name, file_info['checksum'] = get_github_release_url() # type: ignore
+
+                        if not dowload_url:
+                            timeout_counter += 1
+                            gui.current_file_var.set(f"❌ 获取GitHub Release信息失败，准备重试...\n(剩余次数 {10 - timeout_counter})")
+                            time.sleep(1)
+                        else:
+                            print (f"获取到下载链接: {dowload_url}\n 零协汉化版本号: {name}")
+                            file_info['url'] = dowload_url
+                            if not check_need_up_translate(name):
+                                print("当前已是最新汉化版本，无需更新。")
+                                need_update_translate = False
+                            else:
+                                print("检测到新版本，准备更新...")
+
+                elif dowload_way == 3:
+                    print("测速并选择最快的下载源...")
+                    result = get_dowload_path_ByRace()
+                    if not result:
+                        gui.current_file_var.set("❌ 获取下载地址失败")
+                        return False
 
-                    if not dowload_url:
-                        timeout_counter += 1
-                        gui.current_file_var.set(f"❌ 获取GitHub Release信息失败，准备重试...\n(剩余次数 {10 - timeout_counter})")
-                        time.sleep(1)
+                    file_info['mirrors'], version = result
+                    file_info['url'] = next(iter(file_info['mirrors'].values()))
+                    file_info['checksum'] = get_translate_checksum()
+                    print (f"获取到下载链接: {file_info['url']}\n 零协汉化版本号: {version}")
+
+                    if not check_need_up_translate(version):
+                        print("当前已是最新汉化版本，无需更新。")
+                        need_update_translate = False
                     else:
-                        print (f"获取到下载链接: {dowload_url}\n 零协汉化版本号: {name}")
+                        print("检测到新版本，准备更新...")
+
+                elif dowload_way == 0 or dowload_way == 1:
+                    if dowload_way == 1:
+                        print("使用upfile下载汉化文件...")
+                        result = get_dowload_path_ByNote()      
+                    elif dowload_way == 0:
+                        print('使用 gh-proxy 代理加速下载')
+                        result = get_dowload_path_ByGhProxy()
+
+                    if result: # type: ignore
+                        dowload_url, version = result
+                        print (f"获取到下载链接: {dowload_url}\n 零协汉化版本号: {version}")
                         file_info['url'] = dowload_url
-                        if not check_need_up_translate(name):
-                            print("当前已是最新汉化版本，无需更新。")
-                            need_update_translate = False
-                        else:
-                            print("检测到新版本，准备更新...")
-
-            elif dowload_way == 0 or dowload_way == 1:
-                if dowload_way == 1:
-                    print("使用upfile下载汉化文件...")
-                    result = get_dowload_path_ByNote()      
-                elif dowload_way == 0:
-                    print('使用 gh-proxy 代理加速下载')
-                    result = get_dowload_path_ByGhProxy()
-
-                if result: # type: ignore
-                    dowload_url, version = result
-                    print (f"获取到下载链接: {dowload_url}\n 零协汉化版本号: {version}")
-                    file_info['url'] = dowload_url
-                else:
-                    gui.current_file_var.set("❌ 获取下载地址失败")
-                    return False
-
-                if not check_need_up_translate(version):
-                    print("当前已是最新汉化版本，无需更新。")
-                    need_update_translate = False
-                else:
-                    print("检测到新版本，准备更新...")
-
-        if not need_update_translate and \
-            file_info['name'] == '零协会汉化包':
-            success_count += 1
-            continue
-
-        temp_file = os.path.join(temp_dir, file_info['temp_filename'])
-        
-        try:
-            # 下载文件
-            if not download_file_with_gui(file_info['url'], temp_file, gui, file_info['name']):
+                        file_info['checksum'] = get_translate_checksum()
+                    else:
+                        gui.current_file_var.set("❌ 获取下载地址失败")
+                        return False
+
+                    if not check_need_up_translate(version):
+                        print("当前已是最新汉化版本，无需更新。")
+                        need_update_translate = False
+                    else:
+                        print("检测到新版本，准备更新...")
+
+            if not need_update_translate and \
+                file_info['name'] == '零协会汉化包':
+                success_count += 1
                 continue
-            
-            # 验证下载的文件
-            if not verify_download(temp_file):
+
+            # 优先增量更新, 只下载有变化的文件
+            if file_info['name'] == '零协会汉化包' and dowload_way != 2 and \
+                try_delta_update(gui, dowload_way, os.path.join(game_path, 'LLC_zh-CN')):
+                success_count += 1
                 continue
-            
-            # 解压文件
-            if not extract_7z_file(temp_file, game_path):
+
+            # 其次下载 zip 并边下载边解压, 失败时再下载完整的 7z
+            if file_info['name'] == '零协会汉化包' and dowload_way != 2 and \
+                try_stream_extract(gui, dowload_way, game_path):
+                success_count += 1
                 continue
+
+            temp_file = os.path.join(temp_dir, file_info['temp_filename'])
+        
+            try:
+                # 下载文件
+                if not download_file_with_gui(file_info['url'], temp_file, gui, file_info['name'],
+                                              file_info.get('mirrors'), file_info.get('checksum')):
+                    continue
             
-            success_count += 1
+                # 验证下载的文件
+                if not verify_download(temp_file):
+                    cleanup_temp_files(temp_file)
+                    continue
             
+                # 解压文件, 完成后清理临时文件
+                extract_jobs.append(extract_executor.submit(extract_and_cleanup, temp_file, game_path))
+            
+            except Exception as e:
+                print(e)
+    finally:
+        # 等待所有解压完成, 无论成功与否都关闭下载界面
+        extract_executor.shutdown(wait=True)
+        gui.root.destroy()  # 关闭下载界面
+
+    for job in extract_jobs:
+        try:
+            if job.result():
+                success_count += 1
         except Exception as e:
             print(e)
-        finally:
-            # 清理临时文件
-            gui.root.destroy()  # 关闭下载界面
-            cleanup_temp_files(temp_file)
     
     # 创建配置文件（只在至少一个文件处理成功时创建）
     if success_count > 0 and not is_custome:
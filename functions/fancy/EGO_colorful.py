@@ -43,10 +43,7 @@ def process_single_json_file(file_path: str) -> bool:
             data = json.load(f)
         
         # 处理dataList中的每个字典
-        if 'dataList' in data and isinstance(data['dataList'], list):
-            for item in data['dataList']:
-                process_ego_item(item)
-            
+        if process_ego_data(data):
             # 保存修改后的数据
             with open(file_path, 'w', encoding='utf-8') as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
@@ -60,6 +57,20 @@ def process_single_json_file(file_path: str) -> bool:
         print(f"处理文件 {file_path} 时出错: {e}")
         return False
 
+def process_ego_data(data: Dict[str, Any]) -> bool:
+    """处理已解析的EGO技能JSON数据，没有dataList字段时返回False"""
+    if 'dataList' not in data or not isinstance(data['dataList'], list):
+        return False
+    
+    for item in data['dataList']:
+        process_ego_item(item)
+    
+    return True
+
+def is_ego_file(file_name: str) -> bool:
+    """判断文件名是否为EGO技能JSON文件"""
+    return file_name.startswith('Skills_Ego_Personality-') and file_name.endswith('.json')
+
 def process_ego_item(item: Dict[str, Any]):
     """处理单个EGO项目"""
     # 检查是否有levelList
@@ -474,6 +474,32 @@ def test_color_gradient(gradient_rate: float = 2.0):
         
         print("-" * 40)
 
+BUBBLE_JSON_FILES = [
+    'BattleSpeechBubbleDlg.json',
+    'BattleSpeechBubbleDlg_Cultivation.json',
+    'BattleSpeechBubbleDlg_mowe.json'
+]
+
+def process_bubble_data(data: dict, gradient_rate: float = 2.0) -> int:
+    """对已解析的气泡JSON数据应用渐变，返回处理的条目数量
+    Args:
+        data: 气泡JSON数据（包含dataList）
+        gradient_rate: 渐变度，越大渐变越快（默认2.0）
+    """
+    processed_count = 0
+    
+    # 处理每个条目
+    for item in data.get('dataList', []):
+        if 'dlg' in item and item['dlg']:
+            original_dlg = item['dlg']
+            processed_dlg = process_dlg_text(original_dlg, gradient_rate)
+            
+            if processed_dlg != original_dlg:
+                item['dlg'] = processed_dlg
+                processed_count += 1
+    
+    return processed_count
+
 def process_json_file(file_path: str, gradient_rate: float = 2.0) -> bool:
     """处理单个JSON文件
     Args:
@@ -490,18 +516,8 @@ def process_json_file(file_path: str, gradient_rate: float = 2.0) -> bool:
             print(f"文件 {file_path} 格式不正确")
             return False
         
-        processed_count = 0
         total_count = len(data['dataList'])
-        
-        # 处理每个条目
-        for item in data['dataList']:
-            if 'dlg' in item and item['dlg']:
-                original_dlg = item['dlg']
-                processed_dlg = process_dlg_text(original_dlg, gradient_rate)
-                
-                if processed_dlg != original_dlg:
-                    item['dlg'] = processed_dlg
-                    processed_count += 1
+        processed_count = process_bubble_data(data, gradient_rate)
         
         # 保存处理后的文件
         with open(file_path, 'w', encoding='utf-8') as f:
@@ -529,11 +545,7 @@ def process_all_json_files(game_path: str, gradient_rate: float = 2.0) -> bool:
         return False
     
     # 要处理的JSON文件列表
-    json_files = [
-        'BattleSpeechBubbleDlg.json',
-        'BattleSpeechBubbleDlg_Cultivation.json',
-        'BattleSpeechBubbleDlg_mowe.json'
-    ]
+    json_files = BUBBLE_JSON_FILES
     
     success_count = 0
     
@@ -563,11 +575,7 @@ def process_temp_json_files(gradient_rate: float = 2.0) -> bool:
         return False
     
     # 要处理的JSON文件列表
-    json_files = [
-        'BattleSpeechBubbleDlg.json',
-        'BattleSpeechBubbleDlg_Cultivation.json',
-        'BattleSpeechBubbleDlg_mowe.json'
-    ]
+    json_files = BUBBLE_JSON_FILES
     
     success_count = 0
     
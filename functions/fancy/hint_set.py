@@ -1,8 +1,8 @@
 import json
 import random
 
-def simple_replace(battlehint_path:str):
-    """简单版本，直接替换BattleHint.json中的内容"""
+def load_loading_texts() -> list:
+    """读取loadingText.json中的私活Tip文本"""
     
     # 文件路径
     loadingtext_path = r"config\loadingText.json"
@@ -11,11 +11,10 @@ def simple_replace(battlehint_path:str):
     with open(loadingtext_path, 'r', encoding='utf-8') as f:
         loading_data = json.load(f)
     
-    loading_texts = loading_data["loadingTexts"]
-    
-    # 读取BattleHint.json
-    with open(battlehint_path, 'r', encoding='utf-8') as f:
-        battlehint_data = json.load(f)
+    return loading_data["loadingTexts"]
+
+def replace_hint_data(battlehint_data:dict, loading_texts:list) -> int:
+    """替换已解析的BattleHint数据中的Tip内容，返回替换的数量"""
     
     data_list = battlehint_data["dataList"]
     
@@ -30,6 +29,19 @@ def simple_replace(battlehint_path:str):
     for i, idx in enumerate(indices_to_replace):
         data_list[idx]["content"] = replacement_texts[i]
     
+    return num_replacements
+
+def simple_replace(battlehint_path:str):
+    """简单版本，直接替换BattleHint.json中的内容"""
+    
+    loading_texts = load_loading_texts()
+    
+    # 读取BattleHint.json
+    with open(battlehint_path, 'r', encoding='utf-8') as f:
+        battlehint_data = json.load(f)
+    
+    num_replacements = replace_hint_data(battlehint_data, loading_texts)
+    
     # 保存修改后的文件
     with open(battlehint_path, 'w', encoding='utf-8') as f:
         json.dump(battlehint_data, f, ensure_ascii=False, indent=2)
@@ -124,6 +124,10 @@ def handle_skill_strcture(skill_content:dict) -> dict: # type: ignore
 
     return skill_content
         
+def is_skill_file(file_name:str) -> bool:
+    # 名字为Skill***.json的文件需要进行技能描述美化
+    return file_name.endswith('.json') and file_name[:5] == "Skill"
+
 def get_skill_files(translate_pack_path) -> list:
     # 遍历json文件, 并选择名字为Skill***.json的文件, 获取其文件名字为列表
     import os
@@ -131,9 +135,8 @@ def get_skill_files(translate_pack_path) -> list:
     for root, dirs, files in os.walk(translate_pack_path):
         for file in files:
             file:str
-            if file.endswith('.json'):
-                if file[:5] == "Skill":
-                    skill_info_list.append(file)
+            if is_skill_file(file):
+                skill_info_list.append(file)
 
     return skill_info_list
 
@@ -2,6 +2,16 @@ import os
 import json
 import shutil
 from typing import List, Dict, Any
+from functions.modloader.mod_index import MOD_PRIORITY_FILE
+
+def get_mod_priority(mod_info: Dict[str, Any], mod_name: str) -> int:
+    """mod_info.json 中的 priority, 缺省或不是整数时按 0 处理"""
+    priority = mod_info.get('priority', 0)
+    try:
+        return int(priority)
+    except (TypeError, ValueError):
+        print(f"警告: Mod {mod_name} 的 priority 不是整数: {priority!r}, 按 0 处理")
+        return 0
 
 class ModUtils:
     def __init__(self):
@@ -41,6 +51,8 @@ class ModUtils:
         """
         loaded_mods = []
         mods_dir = 'mods'
+        # 文件名 -> mod_info.json 中的 priority, 优先级高的mod覆盖同一对象时生效
+        priorities = {}
         
         # 遍历所有mod目录
         for mod_name in os.listdir(mods_dir):
@@ -55,6 +67,7 @@ class ModUtils:
                     # 检查settings键值
                     if mod_info["settings"].get("enable", False):
                         file_names = mod_info.get('file_names', [])
+                        priority = get_mod_priority(mod_info, mod_name)
                         
                         # 获取目标目录
                         target_dir = self.get_mod_directory()
@@ -71,6 +84,9 @@ class ModUtils:
                             shutil.copy2(source_file, target_file)
                             print(f"复制文件: {source_file} -> {target_file}")
                         
+                        for file_name in file_names:
+                            priorities[os.path.basename(file_name)] = priority
+                        
                         loaded_mods.append(mod_name)
                         print(f"成功加载Mod: {mod_name}")
                     else:
@@ -78,6 +94,10 @@ class ModUtils:
                 except Exception as e:
                     print(f"加载Mod {mod_name} 失败: {e}")
         
+        # 交给mod加载器决定冲突对象的覆盖顺序
+        with open(os.path.join(self.get_mod_directory(), MOD_PRIORITY_FILE), 'w', encoding='utf-8') as f:
+            json.dump(priorities, f, indent=4, ensure_ascii=False)
+        
         return loaded_mods
     
     def unload_all_mods(self) -> List[str]:
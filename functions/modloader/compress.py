@@ -1,10 +1,29 @@
+import glob
 import logging
 import lzma
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional, Tuple
 from zipfile import ZipFile
 
 import UnityPy
 from xxhash import xxh128
 
+# LZMA preset of the final .carra2 archives
+COMPRESS_PRESET = 9
+# Preset used when a lunartique mod is first imported, the archive can be recompressed later
+FAST_COMPRESS_PRESET = 1
+# Bundles submitted ahead per worker, finished results wait in memory until written in order
+COMPRESS_WINDOW_FACTOR = 2
+
+# progress(done, total, name), called in the main process after each step
+ProgressCallback = Callable[[int, int, str], None]
+
+
+def log_progress(done: int, total: int, name: str):
+    logging.info("* [%d/%d] %s", done, total, name)
+
 
 def scan_lunartique_mod_root(zip_file: ZipFile) -> str:
     names = set()
@@ -31,38 +50,144 @@ def scan_lunartique_data(zip_path: ZipFile, data_folder: str) -> set[str]:
     return names
 
 
-def compress_lunartique_mod(zip_path: str, output: str):
+def diff_lunartique_bundle(zip_path: str, vanilla_path: str, preset: int) -> Tuple[List[str], List[Tuple[str, bytes]]]:
+    """
+    Compress the objects of one Installation bundle that differ from its Uninstallation bundle
+    Returns the keys of new objects and the (key, compressed data) of every changed object
+    """
     with ZipFile(zip_path, "r") as root:
         vanilla_dict = {}
-        vanilla_paths = scan_lunartique_data(root, "Uninstallation")
-        if len(vanilla_paths) == 0:
-            raise Exception("No asset files found")
-
-        for vanilla_path in vanilla_paths:
-            parts = vanilla_path.split("/")[-3:]
-            with root.open(vanilla_path, "r") as f:
-                env = UnityPy.load(f)
-
-                for obj in env.objects:
-                    data = obj.get_raw_data()
-                    parts[2] = str(obj.path_id)
-                    vanilla_dict["/".join(parts)] = xxh128(data).digest()
-
-        with ZipFile(output, "w") as z:
-            for modded_path in map(lambda s: s.replace("Uninstallation", "Installation"), vanilla_paths):
-                parts = modded_path.split("/")[-3:]
-                with root.open(modded_path, "r") as f:
-                    env = UnityPy.load(f)
-
-                    for obj in env.objects:
-                        data = obj.get_raw_data()
-                        parts[2] = str(obj.path_id)
-                        key = "/".join(parts)
-                        if vanilla_dict.get(key) == xxh128(data).digest():
-                            continue
-                        if key not in vanilla_dict:
-                            logging.info("* New object found: %s","/".join(parts))
-                        key += f".{obj.type_id}"
-                        with z.open(key, "w") as z_f:
-                            logging.info("* Writing %s", key)
-                            z_f.write(lzma.compress(data, preset=9, format=lzma.FORMAT_XZ))
+        parts = vanilla_path.split("/")[-3:]
+        with root.open(vanilla_path, "r") as f:
+            env = UnityPy.load(f)
+
+            for obj in env.objects:
+                data = obj.get_raw_data()
+                parts[2] = str(obj.path_id)
+                vanilla_dict["/".join(parts)] = xxh128(data).digest()
+
+        new_objects, entries = [], []
+        modded_path = vanilla_path.replace("Uninstallation", "Installation")
+        parts = modded_path.split("/")[-3:]
+        with root.open(modded_path, "r") as f:
+            env = UnityPy.load(f)
+
+            for obj in env.objects:
+                data = obj.get_raw_data()
+                parts[2] = str(obj.path_id)
+                key = "/".join(parts)
+                if vanilla_dict.get(key) == xxh128(data).digest():
+                    continue
+                if key not in vanilla_dict:
+                    new_objects.append(key)
+                key += f".{obj.type_id}"
+                entries.append((key, lzma.compress(data, preset=preset, format=lzma.FORMAT_XZ)))
+        return new_objects, entries
+
+
+def compress_lunartique_mod(zip_path: str, output: str, preset: int = COMPRESS_PRESET, max_workers: int = None,
+                            progress: Optional[ProgressCallback] = log_progress):
+    """
+    Convert a lunartique mod to .carra2, bundles are diffed and compressed in a process pool
+    Results are written in bundle order as they arrive, so the archive is the same for any worker count.
+    Only max_workers * COMPRESS_WINDOW_FACTOR bundles are in flight, so memory does not grow with the mod.
+    """
+    with ZipFile(zip_path, "r") as root:
+        vanilla_paths = sorted(scan_lunartique_data(root, "Uninstallation"))
+    if len(vanilla_paths) == 0:
+        raise Exception("No asset files found")
+
+    max_workers = min(max_workers or os.cpu_count() or 1, len(vanilla_paths))
+    tmp_output = f"{output}.tmp"
+    executor = ProcessPoolExecutor(max_workers=max_workers) if max_workers > 1 else None
+    try:
+        with ZipFile(tmp_output, "w") as z:
+            # Recorded so a fast first import can be found and recompressed later
+            z.comment = f"preset={preset}".encode()
+            futures, submitted = deque(), 0
+            for done, vanilla_path in enumerate(vanilla_paths, 1):
+                if executor:
+                    while submitted < len(vanilla_paths) and len(futures) < max_workers * COMPRESS_WINDOW_FACTOR:
+                        futures.append(executor.submit(diff_lunartique_bundle, zip_path, vanilla_paths[submitted],
+                                                       preset))
+                        submitted += 1
+                    new_objects, entries = futures.popleft().result()
+                else:
+                    new_objects, entries = diff_lunartique_bundle(zip_path, vanilla_path, preset)
+                for key in new_objects:
+                    logging.info("* New object found: %s", key)
+                for key, data in entries:
+                    logging.info("* Writing %s", key)
+                    with z.open(key, "w") as z_f:
+                        z_f.write(data)
+                if progress:
+                    progress(done, len(vanilla_paths), vanilla_path)
+        os.replace(tmp_output, output)
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+        if os.path.exists(tmp_output):
+            os.remove(tmp_output)
+
+
+def archive_preset(path: str) -> int:
+    """Preset recorded in a .carra2 archive, archives without one were written at COMPRESS_PRESET"""
+    with ZipFile(path, "r") as z:
+        comment = z.comment.decode(errors="ignore")
+    if comment.startswith("preset="):
+        try:
+            return int(comment[len("preset="):])
+        except ValueError:
+            pass
+    return COMPRESS_PRESET
+
+
+def recompress_mod(path: str, preset: int = COMPRESS_PRESET) -> str:
+    """Recompress every member of a .carra2 archive at preset, no bundle is loaded"""
+    tmp_path = f"{path}.tmp"
+    try:
+        with ZipFile(path, "r") as src, ZipFile(tmp_path, "w") as dst:
+            dst.comment = f"preset={preset}".encode()
+            for info in src.infolist():
+                data = src.read(info)
+                if not info.is_dir():
+                    data = lzma.compress(lzma.decompress(data, format=lzma.FORMAT_XZ), preset=preset,
+                                         format=lzma.FORMAT_XZ)
+                with dst.open(info.filename, "w") as f:
+                    f.write(data)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+def mods_to_recompress(mod_zips_root: str, preset: int = COMPRESS_PRESET) -> List[str]:
+    """Archives that were imported with a lower preset"""
+    paths = []
+    for path in glob.glob(f"{mod_zips_root}/*.carra2"):
+        try:
+            if archive_preset(path) < preset:
+                paths.append(path)
+        except Exception as e:
+            logging.info("Error reading %s: %s", path, e)
+    return paths
+
+
+def recompress_mods(mod_zips_root: str, preset: int = COMPRESS_PRESET, max_workers: int = None,
+                    progress: Optional[ProgressCallback] = log_progress):
+    """Recompress the archives that were imported with a lower preset, meant to run as a separate process"""
+    paths = mods_to_recompress(mod_zips_root, preset)
+    if not paths:
+        return
+
+    logging.info("Recompressing %d mod(s) with preset %d", len(paths), preset)
+    with ProcessPoolExecutor(max_workers=min(max_workers or os.cpu_count() or 1, len(paths))) as executor:
+        futures = [executor.submit(recompress_mod, path, preset) for path in paths]
+        for done, (path, future) in enumerate(zip(paths, futures), 1):
+            try:
+                future.result()
+            except Exception as e:
+                logging.info("* Error recompressing %s: %s", path, e)
+            if progress:
+                progress(done, len(paths), path)
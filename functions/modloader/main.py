@@ -1,8 +1,8 @@
 import atexit
+import multiprocessing
 import signal
 import subprocess
 import sys
-import tempfile
 
 # Needed for embedded python
 import os
@@ -14,27 +14,36 @@ file_dir = os.path.dirname(__file__)
 sys.path.append(file_dir)
 
 from modfolder import get_mod_folder
+import compress
+import mod_index
 import patch
 import sound
 
 mod_zips_root_path = get_mod_folder()
 os.makedirs(mod_zips_root_path, exist_ok=True)
+# Patched bundles reused across launches while the game data and mods stay the same
+patch_cache_path = os.path.join(mod_zips_root_path, "patch_cache")
+# Runs only the recompression of fast-imported mods, started by the loader after the game
+RECOMPRESS_ARG = "--recompress"
 
 
 # from functions.base.settings_manager import get_settings_manager
 # game_path = get_settings_manager().get_setting("game_path")
 game_path = '1123'
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[
-        logging.FileHandler(os.path.join(mod_zips_root_path, "log.txt")),
-        logging.StreamHandler(stream=sys.stdout)
-    ]
-)
 
-logging.info("Limbus Mod Loader version: v1.8")
+def setup_logging():
+    # Not at import time, pool workers import this module too and must not open the log file
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        handlers=[
+            logging.FileHandler(os.path.join(mod_zips_root_path, "log.txt")),
+            logging.StreamHandler(stream=sys.stdout)
+        ]
+    )
+
+    logging.info("Limbus Mod Loader version: v1.8")
 
 
 def kill_handler(*args) -> None:
@@ -49,6 +58,20 @@ def cleanup_assets():
     except Exception as e:
         logging.error("Error: %s", e)
 
+def start_recompress():
+    """
+    Recompress mods imported with the fast preset in a separate process, so this process
+    exits (and restores the assets) without waiting for it
+    """
+    if not compress.mods_to_recompress(mod_zips_root_path):
+        return
+    if getattr(sys, "frozen", False):
+        args = [sys.executable, RECOMPRESS_ARG]
+    else:
+        args = [sys.executable, os.path.abspath(__file__), RECOMPRESS_ARG]
+    subprocess.Popen(args, creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0))
+
+
 def main():
     try:
         logging.info("Limbus args: %s", sys.argv)
@@ -57,18 +80,30 @@ def main():
 
         logging.info("Detecting lunartique mods")
         patch.detect_lunartique_mods(mod_zips_root_path)
-        tmp_asset_root = tempfile.mkdtemp()
-        logging.info("Extracting mod assets to %s", tmp_asset_root)
-        patch.extract_assets(tmp_asset_root, mod_zips_root_path)
+        mod_index.log_mod_conflicts(mod_zips_root_path)
+        logging.info("Indexing mod assets")
+        mod_assets = mod_index.build_mod_asset_index(mod_zips_root_path)
         logging.info("Backing up data and patching assets....")
-        patch.patch_assets(tmp_asset_root)
-        patch.shutil.rmtree(tmp_asset_root)
+        patch.patch_assets(mod_assets, cache_root=patch_cache_path)
         sound.replace_sound(mod_zips_root_path)
         logging.info("Starting game")
 
         # subprocess.call(sys.argv[1:])
         subprocess.Popen(['start', 'steam://rungameid/1973530'], shell=True)
 
+        # Mods imported with the fast preset are recompressed once the game is on its way
+        start_recompress()
+
     except Exception as e:
         logging.error("Error: %s", e)
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    # Ships frozen as yisangModLoader.exe, process pool workers start the same executable
+    multiprocessing.freeze_support()
+    setup_logging()
+    if RECOMPRESS_ARG in sys.argv:
+        compress.recompress_mods(mod_zips_root_path)
+    else:
+        main()
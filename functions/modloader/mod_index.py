@@ -0,0 +1,221 @@
+import glob
+import json
+import logging
+import lzma
+import os
+from itertools import combinations
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from zipfile import ZipFile
+
+
+class ModAsset(NamedTuple):
+    path_id: int
+    # -1 when the file name has no type id
+    type_id: int
+    # Archive holding the asset, None for an already extracted file
+    archive: Optional[str]
+    # Member name inside the archive, or the file path of an extracted file
+    member: str
+    # Cheap content fingerprint used for the patch cache key (CRC and size from the zip directory)
+    digest: str
+
+
+# bundle name -> (path_id, type_id) -> asset
+ModAssetIndex = Dict[str, Dict[Tuple[int, int], ModAsset]]
+
+# Archive file name -> priority, written by the launcher from mod_info.json, higher priority wins
+MOD_PRIORITY_FILE = "mod_priority.json"
+# Objects touched by each archive, reused while the archive is unchanged
+CONFLICT_CACHE_FILE = "conflict_index.json"
+# Bumped when archive_objects changes, older cache entries are rebuilt
+CONFLICT_CACHE_VERSION = 2
+
+
+def mod_file_size(file):
+    try:
+        return os.path.getsize(file)
+    except:
+        return 1 << 64
+
+
+def load_mod_priorities(mod_zips_root: str) -> Dict[str, int]:
+    try:
+        with open(os.path.join(mod_zips_root, MOD_PRIORITY_FILE), "r", encoding="utf-8") as f:
+            return {name: int(priority) for name, priority in json.load(f).items()}
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logging.info("Error reading %s: %s", MOD_PRIORITY_FILE, e)
+        return {}
+
+
+def sort_mod_archives(paths: List[str], priorities: Dict[str, int]) -> List[str]:
+    """
+    Override order, a later archive wins: lower priority first, then largest first so that
+    smaller mods override bigger ones when no priority is set
+    """
+    return sorted(paths, key=lambda path: (priorities.get(os.path.basename(path), 0), -mod_file_size(path)))
+
+
+def mod_archive_paths(mod_zips_root: str) -> List[str]:
+    """Mod archives in override order"""
+    paths = [os.path.normpath(mod_zip) for mod_zip in glob.glob(f"{mod_zips_root}/*.carra*")]
+    return sort_mod_archives(paths, load_mod_priorities(mod_zips_root))
+
+
+def parse_asset_name(name: str) -> Optional[Tuple[int, int]]:
+    """'<path_id>' or '<path_id>.<type_id>', None for anything else"""
+    try:
+        parts = name.split(".")
+        return int(parts[0]), int(parts[1]) if len(parts) > 1 else -1
+    except ValueError:
+        return None
+
+
+def member_asset(name: str) -> Optional[Tuple[str, Tuple[int, int]]]:
+    """
+    Bundle name and (path_id, type_id) of an archive member laid out as
+    <bundle>/<hash>/<path_id>.<type_id> or <bundle>/<path_id>.<type_id>, None for anything else
+    """
+    parts = name.split("/")
+    if len(parts) not in (2, 3):
+        return None
+    key = parse_asset_name(parts[-1])
+    return (parts[0], key) if key else None
+
+
+def build_mod_asset_index(mod_zips_root: str) -> ModAssetIndex:
+    """
+    Index mod assets straight from the zip central directories, nothing is extracted.
+    An asset in a later archive overrides the same asset in an earlier one, the same as
+    extracting them in order.
+    """
+    index: ModAssetIndex = {}
+    for mod_zip in mod_archive_paths(mod_zips_root):
+        try:
+            with ZipFile(mod_zip) as z:
+                logging.info("Indexing %s", mod_zip)
+                for info in z.infolist():
+                    if info.is_dir():
+                        continue
+                    asset = member_asset(info.filename)
+                    if asset is None:
+                        logging.info("* Skipped %s, expected <bundle>/[<hash>/]<path_id>.<type_id>", info.filename)
+                        continue
+                    bundle_name, key = asset
+                    index.setdefault(bundle_name, {})[key] = ModAsset(
+                        key[0], key[1], mod_zip, info.filename, f"{info.CRC:08x}:{info.file_size}")
+        except Exception as e:
+            logging.info("Error processing %s: %s", mod_zip, e)
+    return index
+
+
+def index_mod_asset_dir(mod_asset_root: str) -> ModAssetIndex:
+    """Index an already extracted <bundle>/<path_id>.<type_id> tree"""
+    index: ModAssetIndex = {}
+    for bundle_name in os.listdir(mod_asset_root):
+        bundle_path = os.path.join(mod_asset_root, bundle_name)
+        if not os.path.isdir(bundle_path):
+            continue
+        for name in os.listdir(bundle_path):
+            file_path = os.path.join(bundle_path, name)
+            key = parse_asset_name(name)
+            if key is None or not os.path.isfile(file_path):
+                continue
+            stat = os.stat(file_path)
+            index.setdefault(bundle_name, {})[key] = ModAsset(
+                key[0], key[1], None, file_path, f"{stat.st_size}:{stat.st_mtime_ns}")
+    return index
+
+
+def archive_fingerprint(path: str) -> str:
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def archive_objects(path: str) -> List[str]:
+    """'<bundle>/<path_id>' of every object in an archive, read from the central directory only"""
+    objects = set()
+    with ZipFile(path) as z:
+        for name in z.namelist():
+            if asset := member_asset(name):
+                objects.add(f"{asset[0]}/{asset[1][0]}")
+    return sorted(objects)
+
+
+def load_archive_objects(paths: List[str], cache_path: str) -> Dict[str, List[str]]:
+    """archive_objects of every archive, cached in cache_path by archive size and modification time"""
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except Exception:
+        cache = {}
+
+    result, changed = {}, False
+    for path in paths:
+        try:
+            fingerprint = archive_fingerprint(path)
+            entry = cache.get(path)
+            if not entry or entry.get("fingerprint") != fingerprint or entry.get("version") != CONFLICT_CACHE_VERSION:
+                entry = {"fingerprint": fingerprint, "version": CONFLICT_CACHE_VERSION, "objects": archive_objects(path)}
+                cache[path] = entry
+                changed = True
+            result[path] = entry["objects"]
+        except Exception as e:
+            logging.info("Error indexing %s: %s", path, e)
+
+    # Forget archives that no longer exist
+    for path in [path for path in cache if not os.path.exists(path)]:
+        del cache[path]
+        changed = True
+    if changed:
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        with open(cache_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+    return result
+
+
+def find_mod_conflicts(paths: List[str], cache_path: str) -> List[dict]:
+    """
+    Objects touched by more than one archive, one entry per archive pair
+    paths must be in override order (see sort_mod_archives), the later archive of a pair wins
+    """
+    objects = load_archive_objects(paths, cache_path)
+    conflicts = []
+    for first, second in combinations([path for path in paths if path in objects], 2):
+        overlap = set(objects[first]).intersection(objects[second])
+        if overlap:
+            conflicts.append({
+                "mods": [first, second],
+                "winner": second,
+                "objects": sorted(overlap)
+            })
+    return conflicts
+
+
+def log_mod_conflicts(mod_zips_root: str):
+    paths = mod_archive_paths(mod_zips_root)
+    for conflict in find_mod_conflicts(paths, os.path.join(mod_zips_root, CONFLICT_CACHE_FILE)):
+        first, second = map(os.path.basename, conflict["mods"])
+        logging.info("Conflict: %s and %s both modify %d object(s), %s wins: %s", first, second,
+                     len(conflict["objects"]), os.path.basename(conflict["winner"]),
+                     ", ".join(conflict["objects"][:5]) + (" ..." if len(conflict["objects"]) > 5 else ""))
+
+
+def asset_label(asset: ModAsset) -> str:
+    return asset.member if asset.archive is None else f"{asset.archive}:{asset.member}"
+
+
+def read_mod_asset(asset: ModAsset, archives: Dict[str, ZipFile]) -> bytes:
+    """
+    Decompress an asset straight from its archive member
+    archives caches the opened archives, the caller closes them
+    """
+    if asset.archive is None:
+        source = open(asset.member, "rb")
+    else:
+        if asset.archive not in archives:
+            archives[asset.archive] = ZipFile(asset.archive)
+        source = archives[asset.archive].open(asset.member)
+    with source, lzma.open(source, format=lzma.FORMAT_XZ) as f:
+        return f.read()
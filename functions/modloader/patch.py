@@ -1,19 +1,34 @@
 import glob
+import json
 import xxhash
-import lzma
 import os.path
 import shutil
 import logging
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 from pathlib import Path
+from typing import Dict, List, Union
 from zipfile import ZipFile
 
 from UnityPy.files import SerializedFile, BundleFile, ObjectReader
 from UnityPy.streams import EndianBinaryReader
 
-from compress import compress_lunartique_mod
+from compress import FAST_COMPRESS_PRESET, ProgressCallback, compress_lunartique_mod, log_progress
+from mod_index import ModAsset, ModAssetIndex, asset_label, index_mod_asset_dir, read_mod_asset
 
 import UnityPy
 
+# Rough peak memory of loading, patching and saving a bundle, as a multiple of its size
+PATCH_MEMORY_FACTOR = 4
+# Bundles being patched at the same time may not exceed this estimated memory
+PATCH_MEMORY_BUDGET = 2 << 30
+# Patched bundles kept in the cache per bundle, older mod sets are pruned
+PATCH_CACHE_KEEP = 2
+# Written next to __original at patch time, lets cleanup_assets restore without loading the bundle
+PATCH_MARKER = "__patch.json"
+# Stored next to a cached bundle, the digest of the patched bundle so a cache hit never hashes it
+CACHE_DIGEST_SUFFIX = ".digest"
+
 
 def bundle_data_paths(appdata: str = os.getenv("APPDATA")):
     cache_path = os.path.join(appdata, "../LocalLow/Unity/ProjectMoon_LimbusCompany/*/*/")
@@ -29,48 +44,145 @@ def file_digest(file_path):
         return xxdigest.hexdigest()
 
 
-def detect_lunartique_mods(mod_zips_root: str):
-    for mod_zip in glob.glob(f"{mod_zips_root}/*.zip"):
-        logging.info("Compressing lunartique format mod (might take a while!): %s", mod_zip)
-        try:
-            compress_lunartique_mod(mod_zip, mod_zip.replace(".zip", ".carra2"))
-            os.remove(mod_zip)
-            logging.info("* Done")
-        except Exception as e:
-            logging.info("* Error: %s", e)
+def mod_set_digest(assets: List[ModAsset]) -> str:
+    """Digest of the mod objects applied to a bundle, in order"""
+    key = xxhash.xxh128()
+    for asset in assets:
+        key.update(f"{asset.path_id}.{asset.type_id}:{asset.digest}\n".encode())
+    return key.hexdigest()
+
+
+def bundle_cache_key(original_digest: str, assets: List[ModAsset]) -> str:
+    """Cache key of a patched bundle: the vanilla bundle digest plus the mod set digest"""
+    return xxhash.xxh128(f"{original_digest}:{mod_set_digest(assets)}".encode()).hexdigest()
 
 
-def mod_file_size(file):
+def stat_key(file_path: str) -> list:
+    stat = os.stat(file_path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def write_patch_marker(bundle_root: str, assets: List[ModAsset], original_digest: str = None,
+                       patched_digest: str = None):
+    """Record what was swapped in, must be written after the last change to __data"""
+    bundle_path = os.path.join(bundle_root, "__data")
+    new_path = os.path.join(bundle_root, "__original")
+    marker = {
+        "original": original_digest or file_digest(new_path),
+        "original_stat": stat_key(new_path),
+        "patched": patched_digest or file_digest(bundle_path),
+        "patched_stat": stat_key(bundle_path),
+        "mods": mod_set_digest(assets)
+    }
+    with open(os.path.join(bundle_root, PATCH_MARKER), "w") as f:
+        json.dump(marker, f)
+
+
+def read_patch_marker(bundle_root: str):
     try:
-        return os.path.getsize(file)
-    except:
-        return 1 << 64
+        with open(os.path.join(bundle_root, PATCH_MARKER), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def marker_matches(marker: dict, bundle_path: str, new_path: str) -> bool:
+    """
+    Whether __data is still the bundle we patched and __original the vanilla one
+    Sizes and modification times are enough unless they moved, then the digests decide
+    """
+    try:
+        if stat_key(bundle_path) == marker["patched_stat"] and stat_key(new_path) == marker["original_stat"]:
+            return True
+        return file_digest(bundle_path) == marker["patched"] and file_digest(new_path) == marker["original"]
+    except (OSError, KeyError, TypeError):
+        return False
+
+
+def bundle_cache_path(cache_root: str, bundle_root: str, key: str) -> str:
+    return os.path.join(cache_root, Path(bundle_root).parent.name, key)
 
 
-def extract_assets(mod_asset_root: str, mod_zips_root: str):
-    for mod_zip in sorted(glob.glob(f"{mod_zips_root}/*.carra*"), key=mod_file_size, reverse=True):
-        mod_zip = os.path.normpath(mod_zip)
+def link_or_copy(src: str, dst: str):
+    """Put src at dst without leaving a partial file, hard linked when possible so nothing is copied"""
+    tmp_path = f"{dst}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    try:
+        os.link(src, tmp_path)
+    except OSError:
+        # Different volume or no hard link support
+        shutil.copyfile(src, tmp_path)
+    os.replace(tmp_path, dst)
+
+
+def read_cached_digest(cache_path: str):
+    try:
+        with open(cache_path + CACHE_DIGEST_SUFFIX, "r") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def store_cached_bundle(bundle_path: str, cache_path: str, patched_digest: str):
+    """Keep the patched bundle and its digest in the cache and drop the oldest entries of the same bundle"""
+    cache_dir = os.path.dirname(cache_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    link_or_copy(bundle_path, cache_path)
+    os.utime(cache_path)
+    with open(cache_path + CACHE_DIGEST_SUFFIX + ".tmp", "w") as f:
+        f.write(patched_digest)
+    os.replace(cache_path + CACHE_DIGEST_SUFFIX + ".tmp", cache_path + CACHE_DIGEST_SUFFIX)
+
+    entries = sorted((os.path.join(cache_dir, name) for name in os.listdir(cache_dir)
+                      if not name.endswith((".tmp", CACHE_DIGEST_SUFFIX))),
+                     key=os.path.getmtime, reverse=True)
+    for old_path in entries[PATCH_CACHE_KEEP:]:
         try:
-            with ZipFile(mod_zip) as z:
-                logging.info("Extracting %s", mod_zip)
-                z.extractall(mod_asset_root)
-        except Exception as e:
-            logging.info("Error processing %s: %s", mod_zip, e)
+            os.remove(old_path)
+            if os.path.isfile(old_path + CACHE_DIGEST_SUFFIX):
+                os.remove(old_path + CACHE_DIGEST_SUFFIX)
+        except OSError as e:
+            logging.info("* Failed to prune patch cache %s: %s", old_path, e)
+
 
-    for mod_carra in glob.glob(f"{mod_asset_root}/*/*/*"):
-        mod_carra_path = Path(mod_carra)
-        new_mod_carra = os.path.join(mod_carra_path.parent.parent, mod_carra_path.name)
-        os.replace(mod_carra, new_mod_carra)
+def detect_lunartique_mods(mod_zips_root: str, preset: int = FAST_COMPRESS_PRESET,
+                           progress: ProgressCallback = log_progress):
+    """Convert lunartique mods, a fast preset by default so the first launch isn't held up (see compress.recompress_mods)"""
+    for mod_zip in glob.glob(f"{mod_zips_root}/*.zip"):
+        logging.info("Compressing lunartique format mod (might take a while!): %s", mod_zip)
+        try:
+            compress_lunartique_mod(mod_zip, mod_zip.replace(".zip", ".carra2"), preset=preset, progress=progress)
+            os.remove(mod_zip)
+            logging.info("* Done")
+        except Exception as e:
+            logging.info("* Error: %s", e)
 
 
 def cleanup_assets(bundle_data=bundle_data_paths):
+    """
+    Restore every patched bundle. A bundle whose patch marker still matches is restored with a
+    stat and a rename, UnityPy only checks the bundles without a marker or with a stale one.
+    """
     logging.info("Restoring data")
     for bundle_root in bundle_data():
         bundle_path = os.path.join(bundle_root, "__data")
         new_path = os.path.join(bundle_root, "__original")
+        marker_path = os.path.join(bundle_root, PATCH_MARKER)
         if not os.path.isfile(new_path):
+            if os.path.isfile(marker_path):
+                os.remove(marker_path)
             continue
 
+        marker = read_patch_marker(bundle_root)
+        if marker:
+            os.remove(marker_path)
+            if marker_matches(marker, bundle_path, new_path):
+                logging.info("Restoring %s", bundle_path)
+                os.replace(new_path, bundle_path)
+                continue
+            logging.info("Patch marker out of date %s, checking the bundle", bundle_path)
+
         try:
             env = UnityPy.load(bundle_path)
             if env.file.version_player != "limbus_modded":
@@ -83,67 +195,198 @@ def cleanup_assets(bundle_data=bundle_data_paths):
         os.replace(new_path, bundle_path)
 
 
-def patch_bundle_asset(env: UnityPy.Environment, mod_path: str):
-    for f in env.file.files.values():
-        if not isinstance(f, SerializedFile):
-            logging.info("Expected serialized file but got a %s instead?? Skipped", type(f))
-            return
-
-        objects = f.objects
-        for modded_asset in os.listdir(mod_path):
-            try:
-                name = modded_asset.split(".")
-                path_id = int(name[0])
-                type_id = -1
-                if len(name) > 1:
-                    type_id = int(name[1])
-            except ValueError:
-                continue
+def patch_bundle_asset(env: UnityPy.Environment, assets: List[ModAsset]):
+    archives: Dict[str, ZipFile] = {}
+    try:
+        for f in env.file.files.values():
+            if not isinstance(f, SerializedFile):
+                logging.info("Expected serialized file but got a %s instead?? Skipped", type(f))
+                return
 
-            mod_part_path = os.path.join(mod_path, modded_asset)
-            if not os.path.isfile(mod_part_path):
-                continue
-            if obj := objects.get(path_id):
-                if not isinstance(obj, ObjectReader):
-                    logging.error("- Object is not ObjectReader, wtf?")
-                    continue
-                logging.info("- Loading %s", mod_part_path)
-                if type_id > 0 and type_id != obj.type_id:
-                    logging.info("- Mismatching asset type, vanilla: %d, modded: %d, skipped", obj.type_id, type_id)
-                    continue
-                with open(mod_part_path, "rb") as mf:
-                    obj.set_raw_data(lzma.decompress(mf.read(), format=lzma.FORMAT_XZ))
-            elif type_id > 0:
-                logging.info("- Adding unused mod asset of type %d: %s", type_id, mod_part_path)
-                reader = EndianBinaryReader(bytes(bytearray(1024)))
-                obj = ObjectReader(assets_file=f, reader=reader)
-                obj.path_id = path_id
-                obj.type_id = type_id
-                with open(mod_part_path, "rb") as mf:
-                    obj.set_raw_data(lzma.decompress(mf.read(), format=lzma.FORMAT_XZ))
-                objects[path_id] = obj
-
-
-def patch_assets(mod_asset_root: str, bundle_data=bundle_data_paths):
-    for bundle_root in bundle_data():
-        # Move the original data to a new location temporarily
-        bundle_root_path = Path(bundle_root)
-        mod_path = os.path.join(mod_asset_root, bundle_root_path.parent.name)
-        if not os.path.isdir(mod_path):
-            continue
+            objects = f.objects
+            for asset in assets:
+                path_id, type_id = asset.path_id, asset.type_id
+                if obj := objects.get(path_id):
+                    if not isinstance(obj, ObjectReader):
+                        logging.error("- Object is not ObjectReader, wtf?")
+                        continue
+                    logging.info("- Loading %s", asset_label(asset))
+                    if type_id > 0 and type_id != obj.type_id:
+                        logging.info("- Mismatching asset type, vanilla: %d, modded: %d, skipped", obj.type_id, type_id)
+                        continue
+                    obj.set_raw_data(read_mod_asset(asset, archives))
+                elif type_id > 0:
+                    logging.info("- Adding unused mod asset of type %d: %s", type_id, asset_label(asset))
+                    reader = EndianBinaryReader(bytes(bytearray(1024)))
+                    obj = ObjectReader(assets_file=f, reader=reader)
+                    obj.path_id = path_id
+                    obj.type_id = type_id
+                    obj.set_raw_data(read_mod_asset(asset, archives))
+                    objects[path_id] = obj
+    finally:
+        for archive in archives.values():
+            archive.close()
+
+
+@contextmanager
+def capture_logs():
+    """Collect log records instead of emitting them, so parallel jobs can be logged in a fixed order"""
+    records = []
+
+    class ListHandler(logging.Handler):
+        def emit(self, record):
+            records.append((record.levelno, record.getMessage()))
+
+    root_logger = logging.getLogger()
+    handlers, level = root_logger.handlers[:], root_logger.level
+    root_logger.handlers = [ListHandler()]
+    root_logger.setLevel(logging.INFO)
+    try:
+        yield records
+    finally:
+        root_logger.handlers = handlers
+        root_logger.setLevel(level)
 
+
+def apply_cached_bundle(bundle_root: str, assets: List[ModAsset], cache_path: str, original_digest: str = None):
+    """Swap a previously patched bundle in without loading it, returns the same as patch_bundle"""
+    with capture_logs() as records:
         bundle_path = os.path.join(bundle_root, "__data")
         new_path = os.path.join(bundle_root, "__original")
-        os.chmod(bundle_path, 0o777)
-        logging.info("Backing up %s", bundle_path)
-        os.replace(bundle_path, new_path)
-
-        logging.info("Patching %s", bundle_path)
-        env = UnityPy.load(new_path)
-        patch_bundle_asset(env, mod_path)
-
-        env.file.version_player = "limbus_modded"
-        with open(bundle_path, "wb") as f:
-            f.write(env.file.save(packer="none"))
-        logging.info("* Patching complete %s (%d) -> %s (%d)", file_digest(new_path), os.path.getsize(new_path),
-                     file_digest(bundle_path), os.path.getsize(bundle_path))
+        try:
+            os.chmod(bundle_path, 0o777)
+            logging.info("Backing up %s", bundle_path)
+            os.replace(bundle_path, new_path)
+            link_or_copy(cache_path, bundle_path)
+            os.utime(cache_path)
+            # Entries cached before the digest was stored are hashed once here
+            write_patch_marker(bundle_root, assets, original_digest, read_cached_digest(cache_path))
+            logging.info("* Patched from cache %s", bundle_path)
+            return records, None
+        except Exception as e:
+            logging.error("* Patching from cache failed %s: %s", bundle_path, e)
+            if os.path.isfile(new_path):
+                os.replace(new_path, bundle_path)
+            return records, e
+
+
+def patch_bundle(bundle_root: str, assets: List[ModAsset], cache_path: str = None, original_digest: str = None):
+    """Patch a single bundle, returns the log records and the error (if any)"""
+    with capture_logs() as records:
+        bundle_path = os.path.join(bundle_root, "__data")
+        new_path = os.path.join(bundle_root, "__original")
+        try:
+            # Move the original data to a new location temporarily
+            os.chmod(bundle_path, 0o777)
+            logging.info("Backing up %s", bundle_path)
+            os.replace(bundle_path, new_path)
+
+            logging.info("Patching %s", bundle_path)
+            env = UnityPy.load(new_path)
+            patch_bundle_asset(env, assets)
+
+            env.file.version_player = "limbus_modded"
+            with open(bundle_path, "wb") as f:
+                f.write(env.file.save(packer="none"))
+            logging.info("* Patching complete %s (%d) -> (%d)", bundle_path, os.path.getsize(new_path),
+                         os.path.getsize(bundle_path))
+        except Exception as e:
+            logging.error("* Patching failed %s: %s", bundle_path, e)
+            # Put the vanilla bundle back so a failed bundle never stays half written
+            if os.path.isfile(new_path):
+                os.replace(new_path, bundle_path)
+            return records, e
+
+        patched_digest = None
+        try:
+            patched_digest = file_digest(bundle_path)
+            if cache_path:
+                store_cached_bundle(bundle_path, cache_path, patched_digest)
+        except Exception as e:
+            # The patched bundle is in place, only the next launch loses the shortcut
+            logging.info("* Failed to cache %s: %s", bundle_path, e)
+        try:
+            # Written last, caching may touch the modification time of a hard linked __data
+            write_patch_marker(bundle_root, assets, original_digest, patched_digest)
+        except Exception as e:
+            # Restoring falls back to loading the bundle
+            logging.info("* Failed to write patch marker %s: %s", bundle_root, e)
+        return records, None
+
+
+def patch_assets(mod_assets: Union[ModAssetIndex, str], bundle_data=bundle_data_paths, max_workers: int = None,
+                 memory_budget: int = PATCH_MEMORY_BUDGET, cache_root: str = None):
+    """
+    Patch every bundle that has mod assets, independent bundles are patched in a process pool.
+    mod_assets is an index from mod_index.build_mod_asset_index, or a directory of extracted assets.
+    Bundles run concurrently only while their estimated memory fits in memory_budget, a bundle
+    larger than the budget runs alone. Logs are emitted in bundle order regardless of completion order.
+    With cache_root set, patched bundles are kept there and reused while neither the vanilla
+    bundle nor its mod objects change, those bundles are never loaded with UnityPy.
+    """
+    if isinstance(mod_assets, str):
+        mod_assets = index_mod_asset_dir(mod_assets)
+
+    jobs = []
+    for bundle_root in bundle_data():
+        if assets := mod_assets.get(Path(bundle_root).parent.name):
+            jobs.append((bundle_root, [assets[key] for key in sorted(assets)], None, None))
+    if not jobs:
+        return
+
+    results = {}
+    pending = []
+    for index, (bundle_root, assets, _, _) in enumerate(jobs):
+        bundle_path = os.path.join(bundle_root, "__data")
+        if cache_root and os.path.isfile(bundle_path):
+            original_digest = file_digest(bundle_path)
+            cache_path = bundle_cache_path(cache_root, bundle_root, bundle_cache_key(original_digest, assets))
+            if os.path.isfile(cache_path):
+                results[index] = apply_cached_bundle(bundle_root, assets, cache_path, original_digest)
+                continue
+            jobs[index] = (bundle_root, assets, cache_path, original_digest)
+        pending.append(index)
+
+    max_workers = min(max_workers or os.cpu_count() or 1, len(pending)) if pending else 0
+    if max_workers == 1:
+        for index in pending:
+            results[index] = patch_bundle(*jobs[index])
+    elif pending:
+        # Estimated before any bundle is moved to __original
+        costs = {index: os.path.getsize(os.path.join(jobs[index][0], "__data")) * PATCH_MEMORY_FACTOR
+                 if os.path.isfile(os.path.join(jobs[index][0], "__data")) else 0 for index in pending}
+
+        # Largest bundles first so the long ones don't end up running last
+        queue = sorted(pending, key=lambda index: costs[index], reverse=True)
+        running, in_use = {}, 0
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            while queue or running:
+                while queue and len(running) < max_workers:
+                    # The largest bundle that still fits, or the largest one if nothing is running
+                    fits = [index for index in queue if in_use + costs[index] <= memory_budget]
+                    if not fits and running:
+                        break
+                    index = fits[0] if fits else queue[0]
+                    queue.remove(index)
+                    running[executor.submit(patch_bundle, *jobs[index])] = index
+                    in_use += costs[index]
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = running.pop(future)
+                    in_use -= costs[index]
+                    try:
+                        results[index] = future.result()
+                    except Exception as e:
+                        # The worker process itself died (e.g. out of memory)
+                        results[index] = ([(logging.ERROR, f"* Patching failed {jobs[index][0]}: {e}")], e)
+
+    errors = []
+    for index in range(len(jobs)):
+        records, error = results[index]
+        for level, message in records:
+            logging.log(level, "%s", message)
+        if error:
+            errors.append(error)
+    if errors:
+        raise errors[0]
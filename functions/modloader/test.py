@@ -14,5 +14,6 @@ logging.basicConfig(
 def test_bundle_data_paths():
     return map(os.path.normpath, glob.glob("assets/bundle/Uninstallation/*/*/"))
 
-cleanup_assets(bundle_data=test_bundle_data_paths)
-patch_assets("assets/mod_root", bundle_data=test_bundle_data_paths)
\ No newline at end of file
+if __name__ == "__main__":
+    cleanup_assets(bundle_data=test_bundle_data_paths)
+    patch_assets("assets/mod_root", bundle_data=test_bundle_data_paths)
\ No newline at end of file
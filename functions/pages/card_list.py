@@ -0,0 +1,130 @@
+import json
+import tkinter as tk
+from tkinter import ttk
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 首次显示的卡片数量, 之后滚动接近底部时每次再创建的数量
+CARD_BATCH_SIZE = 8
+# 滚动到该位置以下时创建下一批卡片
+LOAD_MORE_THRESHOLD = 0.85
+
+
+def item_signature(item: Any) -> str:
+    """条目内容的签名, 用于判断卡片是否需要重建"""
+    return json.dumps(item, sort_keys=True, ensure_ascii=False, default=str)
+
+
+class CardList:
+    """
+    分批创建卡片的滚动列表
+    先只创建前一批卡片, 滚动接近底部时再追加下一批; 已创建的卡片会一直保留, 不会在滚出视野后回收.
+    重新设置条目时按 key 比较内容, 内容未变化的卡片保留原控件, 只重建变化的卡片.
+    """
+
+    def __init__(self, parent, bg_color: str, build_card: Callable[[tk.Frame, Any], tk.Frame],
+                 key: Callable[[Any], str], pack_options: Optional[dict] = None,
+                 batch_size: int = CARD_BATCH_SIZE):
+        """
+        Args:
+            parent: 放置列表的容器
+            build_card: 在给定父控件中创建卡片并返回卡片框架(不需要 pack)
+            key: 返回条目的唯一标识
+            pack_options: 卡片的 pack 参数
+        """
+        self.bg_color = bg_color
+        self.build_card = build_card
+        self.key = key
+        self.pack_options = pack_options or dict(fill=tk.X, padx=10, pady=8, ipady=8, ipadx=8)
+        self.batch_size = batch_size
+
+        self.items: List[Any] = []
+        self.order: List[Tuple[str, str]] = []
+        # key -> (签名, 卡片框架)
+        self.cards: Dict[str, Tuple[str, tk.Frame]] = {}
+        self.materialized = 0
+        self.message_label: Optional[tk.Label] = None
+
+        # 创建滚动区域
+        self.canvas = tk.Canvas(parent, bg=bg_color, highlightthickness=0)
+        self.scrollbar = ttk.Scrollbar(parent, orient="vertical", command=self.canvas.yview)
+        self.frame = tk.Frame(self.canvas, bg=bg_color)
+
+        self.frame.bind(
+            "<Configure>",
+            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        )
+
+        self.canvas.create_window((0, 0), window=self.frame, anchor="nw")
+        self.canvas.configure(yscrollcommand=self.on_scroll)
+
+        # 绑定鼠标滚轮事件
+        def _on_mousewheel(event):
+            self.canvas.yview_scroll(int(-1*(event.delta/120)), "units")
+        self.canvas.bind("<MouseWheel>", _on_mousewheel)
+        self.frame.bind("<MouseWheel>", _on_mousewheel)
+
+    def pack(self):
+        """打包滚动区域"""
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+    def on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if float(last) >= LOAD_MORE_THRESHOLD and self.materialized < len(self.items):
+            self.frame.after_idle(lambda: self.materialize(self.materialized + self.batch_size))
+
+    def set_message(self, text: str):
+        """清空列表并显示提示文字, 如 加载中/没有数据"""
+        self.set_items([])
+        if self.message_label is None:
+            self.message_label = tk.Label(self.frame, font=('微软雅黑', 12),
+                                          bg=self.bg_color, fg='#bdc3c7')
+        self.message_label.configure(text=text)
+        self.message_label.pack(expand=True, pady=50)
+
+    def set_items(self, items: List[Any]):
+        """设置条目; 内容与顺序都没变时不做任何事"""
+        order = []
+        seen: Dict[str, int] = {}
+        for item in items:
+            # 同名条目加上序号区分
+            key = self.key(item)
+            seen[key] = seen.get(key, 0) + 1
+            if seen[key] > 1:
+                key = f"{key}#{seen[key]}"
+            order.append((key, item_signature(item)))
+        if order == self.order and self.message_label is None:
+            return
+
+        if self.message_label is not None:
+            self.message_label.destroy()
+            self.message_label = None
+
+        # 删除已不存在或内容变化的卡片
+        current = dict(order)
+        for key in list(self.cards):
+            signature, card = self.cards[key]
+            if current.get(key) != signature:
+                card.destroy()
+                del self.cards[key]
+
+        # 保持已创建的数量, 按新顺序重新排列
+        for _, card in self.cards.values():
+            card.pack_forget()
+        previous = self.materialized
+        self.items, self.order = list(items), order
+        self.materialized = 0
+        self.materialize(max(previous, self.batch_size))
+
+    def materialize(self, count: int):
+        """创建并显示前 count 个卡片"""
+        count = min(count, len(self.items))
+        for index in range(self.materialized, count):
+            key, signature = self.order[index]
+            if key not in self.cards:
+                self.cards[key] = (signature, self.build_card(self.frame, self.items[index]))
+            self.cards[key][1].pack(**self.pack_options)
+        self.materialized = max(self.materialized, count)
+
+    def scroll_to_top(self):
+        self.canvas.yview_moveto(0)
@@ -1,10 +1,9 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import os
 import threading
-from PIL import Image, ImageTk
-import requests
 from functions.base.web_trigger import WebTrigger
+from functions.pages.icon_loader import get_icon_loader
+from functions.pages.card_list import CardList
 
 class DownloadCenterPage:
     def __init__(self, parent, root, bg_color, lighten_bg_color):
@@ -13,8 +12,7 @@ class DownloadCenterPage:
         self.bg_color = bg_color
         self.lighten_bg_color = lighten_bg_color
         self.web_trigger = WebTrigger()
-        self.icon_cache_dir = "cache/icons"
-        os.makedirs(self.icon_cache_dir, exist_ok=True)
+        self.icon_loader = get_icon_loader()
         
         self.current_addon_page = 1
         self.current_mod_page = 1
@@ -62,178 +60,50 @@ class DownloadCenterPage:
         addons_frame = ttk.Frame(self.notebook)
         self.notebook.add(addons_frame, text="🔌 插件下载")
         
-        # 创建滚动区域
-        canvas = tk.Canvas(addons_frame, bg=self.bg_color, highlightthickness=0)
-        scrollbar = ttk.Scrollbar(addons_frame, orient="vertical", command=canvas.yview)
-        self.addon_scrollable_frame = tk.Frame(canvas, bg=self.bg_color)
-        
-        self.addon_scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
+        self.addon_page_label = self.create_pagination(
+            addons_frame,
+            lambda: self.display_addon_page(self.current_addon_page - 1) if self.current_addon_page > 1 else None,
+            lambda: self.display_addon_page(self.current_addon_page + 1) if self.current_addon_page < len(self.addon_data) else None
         )
         
-        canvas.create_window((0, 0), window=self.addon_scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-        
-        # 绑定鼠标滚轮事件
-        def _on_mousewheel(event):
-            canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-        canvas.bind("<MouseWheel>", _on_mousewheel)
-        self.addon_scrollable_frame.bind("<MouseWheel>", _on_mousewheel)
-        
-        # 打包滚动区域
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        # 卡片列表只创建可见部分, 翻页时复用未变化的卡片
+        self.addon_list = CardList(addons_frame, self.bg_color, self.create_addon_card,
+                                   key=lambda addon: addon.get('name', ''))
+        self.addon_list.pack()
     
     def create_mods_tab(self):
         """创建Mod下载标签页"""
         mods_frame = ttk.Frame(self.notebook)
         self.notebook.add(mods_frame, text="🎮 Mod下载")
         
-        # 创建滚动区域
-        canvas = tk.Canvas(mods_frame, bg=self.bg_color, highlightthickness=0)
-        scrollbar = ttk.Scrollbar(mods_frame, orient="vertical", command=canvas.yview)
-        self.mod_scrollable_frame = tk.Frame(canvas, bg=self.bg_color)
-        
-        self.mod_scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
+        self.mod_page_label = self.create_pagination(
+            mods_frame,
+            lambda: self.display_mod_page(self.current_mod_page - 1) if self.current_mod_page > 1 else None,
+            lambda: self.display_mod_page(self.current_mod_page + 1) if self.current_mod_page < len(self.mod_data) else None
         )
         
-        canvas.create_window((0, 0), window=self.mod_scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-        
-        # 绑定鼠标滚轮事件
-        def _on_mousewheel(event):
-            canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-        canvas.bind("<MouseWheel>", _on_mousewheel)
-        self.mod_scrollable_frame.bind("<MouseWheel>", _on_mousewheel)
-        
-        # 打包滚动区域
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        self.mod_list = CardList(mods_frame, self.bg_color, self.create_mod_card,
+                                 key=lambda mod: mod.get('name', ''))
+        self.mod_list.pack()
     
-    def load_addon_data(self):
-        # 清空现有内容
-        for widget in self.addon_scrollable_frame.winfo_children():
-            widget.destroy()
-        
-        # 显示加载中
-        loading_label = tk.Label(
-            self.addon_scrollable_frame, 
-            text="加载中...", 
-            bg=self.bg_color, 
-            fg="#ecf0f1",
-            font=('微软雅黑', 12)
-        )
-        loading_label.pack(pady=20)
-        self.addon_scrollable_frame.update()
-
-        def load_data_addon():
-            try:
-                self.status_var.set("正在获取插件列表...")
-                self.addon_data = self.web_trigger.fectch_all_addon_info()
-                if self.addon_data:
-                    self.display_addon_page(1)
-                else:
-                    self.show_error("未获取到插件数据")
-            except Exception as e:
-                self.show_error(f"加载插件数据失败: {str(e)}")
-
-        thread = threading.Thread(target=load_data_addon)
-        thread.start()
-        
-    def load_data(self):
-        # 在后台线程中加载数据
-        def load_data_addon():
-            try:
-                self.status_var.set("正在获取插件列表...")
-                self.addon_data = self.web_trigger.fectch_all_addon_info()
-                if self.addon_data:
-                    self.display_addon_page(1)
-                else:
-                    self.show_error("未获取到插件数据")
-            except Exception as e:
-                self.show_error(f"加载插件数据失败: {str(e)}")
-        def load_data_mod():
-            try:
-                self.status_var.set("正在获取Mod列表...")
-                self.mod_data = self.web_trigger.fectch_all_mod_info()
-                if self.mod_data:
-                    self.display_mod_page(1)
-                else:
-                    self.show_error("未获取到Mod数据")
-            except Exception as e:
-                self.show_error(f"加载Mod数据失败: {str(e)}")
-        
-        thread = threading.Thread(target=load_data_addon)
-        thread2 = threading.Thread(target=load_data_mod)
-        thread2.start()
-        thread.start()
-    
-    def load_mod_data(self):
-        # 清空现有内容
-        for widget in self.mod_scrollable_frame.winfo_children():
-            widget.destroy()
-        
-        # 显示加载中
-        loading_label = tk.Label(
-            self.mod_scrollable_frame, 
-            text="加载中...", 
-            bg=self.bg_color, 
-            fg="#ecf0f1",
-            font=('微软雅黑', 12)
-        )
-        loading_label.pack(pady=20)
-        self.mod_scrollable_frame.update()
-        
-        def load_data_mod():
-            try:
-                self.status_var.set("正在获取Mod列表...")
-                self.mod_data = self.web_trigger.fectch_all_mod_info()
-                if self.mod_data:
-                    self.display_mod_page(1)
-                else:
-                    self.show_error("未获取到Mod数据")
-            except Exception as e:
-                self.show_error(f"加载Mod数据失败: {str(e)}")
-
-        thread = threading.Thread(target=load_data_mod)
-        thread.start()
-    
-    def display_addon_page(self, page_num):
-        # 清空现有内容
-        for widget in self.addon_scrollable_frame.winfo_children():
-            widget.destroy()
-        
-        if not self.addon_data or page_num < 1 or page_num > len(self.addon_data):
-            empty_label = tk.Label(self.addon_scrollable_frame, 
-                                 text="未获取到插件数据\n请检查网络连接后重试",
-                                 font=('微软雅黑', 12),
-                                 bg=self.bg_color, fg='#bdc3c7')
-            empty_label.pack(expand=True, pady=50)
-            return
-        
-        self.current_addon_page = page_num
-        addon_page_data = self.addon_data[page_num - 1]
-        
-        # 显示分页信息
-        pagination_frame = tk.Frame(self.addon_scrollable_frame, bg=self.bg_color)
-        pagination_frame.pack(fill=tk.X, pady=10)
+    def create_pagination(self, parent, prev_command, next_command):
+        """创建固定在列表上方的分页栏, 返回页码标签"""
+        pagination_frame = tk.Frame(parent, bg=self.bg_color)
+        pagination_frame.pack(fill=tk.X, side=tk.TOP)
         
         page_label = tk.Label(
             pagination_frame, 
-            text=f"第 {page_num} 页，共 {len(self.addon_data)} 页", 
+            text="", 
             bg=self.bg_color, 
             fg="#ecf0f1"
         )
-        page_label.pack(side=tk.LEFT, padx=10)
+        page_label.pack(side=tk.LEFT, padx=10, pady=10)
         
         # 上一页按钮
         prev_button = tk.Button(
             pagination_frame, 
             text="上一页", 
-            command=lambda: self.display_addon_page(page_num - 1) if page_num > 1 else None,
+            command=prev_command,
             bg="#2c3e50",
             fg="#ecf0f1",
             relief=tk.FLAT,
@@ -246,7 +116,7 @@ class DownloadCenterPage:
         next_button = tk.Button(
             pagination_frame, 
             text="下一页", 
-            command=lambda: self.display_addon_page(page_num + 1) if page_num < len(self.addon_data) else None,
+            command=next_command,
             bg="#2c3e50",
             fg="#ecf0f1",
             relief=tk.FLAT,
@@ -255,88 +125,128 @@ class DownloadCenterPage:
         )
         next_button.pack(side=tk.LEFT, padx=5)
         
-        # 显示插件列表
-        for addon in addon_page_data:
-            self.create_addon_card(addon)
+        return page_label
     
-    def display_mod_page(self, page_num):
-        # 清空现有内容
-        for widget in self.mod_scrollable_frame.winfo_children():
-            widget.destroy()
-        
-        if not self.mod_data or page_num < 1 or page_num > len(self.mod_data):
-            empty_label = tk.Label(self.mod_scrollable_frame, 
-                                 text="未获取到Mod数据\n请检查网络连接后重试",
-                                 font=('微软雅黑', 12),
-                                 bg=self.bg_color, fg='#bdc3c7')
-            empty_label.pack(expand=True, pady=50)
+    def load_addon_data(self):
+        self.load_catalog('addon')
+    
+    def load_mod_data(self):
+        self.load_catalog('mod')
+    
+    def load_catalog(self, kind):
+        """先显示本地缓存的目录, 再在后台重新获取, 不阻塞界面"""
+        cached = self.web_trigger.load_cached_catalog(kind)
+        if cached:
+            self.apply_catalog(kind, cached)
+        else:
+            # 显示加载中
+            card_list = self.addon_list if kind == 'addon' else self.mod_list
+            card_list.set_message("加载中...")
+        
+        threading.Thread(target=self.revalidate_catalog, args=(kind,), daemon=True).start()
+    
+    def load_data(self):
+        # 在后台线程中重新获取, 只有变化的页才会重新渲染
+        threading.Thread(target=self.revalidate_catalog, args=('addon',), daemon=True).start()
+        threading.Thread(target=self.revalidate_catalog, args=('mod',), daemon=True).start()
+    
+    def run_on_ui(self, func):
+        """在Tk线程中执行 func, 后台线程更新界面时使用"""
+        try:
+            self.parent.after(0, func)
+        except (RuntimeError, tk.TclError):
+            # 窗口已经关闭
+            pass
+    
+    def revalidate_catalog(self, kind):
+        """在后台线程中重新获取目录, 结果交给Tk线程处理"""
+        name = "插件" if kind == 'addon' else "Mod"
+        self.run_on_ui(lambda: self.status_var.set(f"正在获取{name}列表..."))
+        try:
+            pages, changed = self.web_trigger.fetch_catalog(kind)
+        except Exception as e:
+            self.run_on_ui(lambda e=e: self.on_catalog_failed(kind, e))
+            return
+        self.run_on_ui(lambda: self.on_catalog_fetched(kind, pages, changed))
+    
+    def on_catalog_fetched(self, kind, pages, changed):
+        """目录获取完成, 与缓存不同时更新显示"""
+        self.status_var.set("就绪 - 点击下载按钮开始下载")
+        if not changed:
+            return
+        if pages:
+            self.apply_catalog(kind, pages)
+        else:
+            self.show_error(f"未获取到{'插件' if kind == 'addon' else 'Mod'}数据")
+    
+    def on_catalog_failed(self, kind, error):
+        """目录获取失败, 已经显示了缓存时只记录错误"""
+        name = "插件" if kind == 'addon' else "Mod"
+        shown = self.addon_data if kind == 'addon' else self.mod_data
+        if shown:
+            print(f"刷新{name}数据失败: {error}")
+            self.status_var.set("就绪 - 点击下载按钮开始下载")
+        else:
+            self.show_error(f"加载{name}数据失败: {str(error)}")
+    
+    def apply_catalog(self, kind, pages):
+        """更新目录数据, 只在当前页内容或总页数变化时重新渲染"""
+        if kind == 'addon':
+            old_pages, page_num = self.addon_data, self.current_addon_page
+            self.addon_data = pages
+            display = self.display_addon_page
+        else:
+            old_pages, page_num = self.mod_data, self.current_mod_page
+            self.mod_data = pages
+            display = self.display_mod_page
+        
+        page_num = min(max(page_num, 1), len(pages))
+        if not old_pages or len(old_pages) != len(pages) or old_pages[page_num - 1] != pages[page_num - 1]:
+            display(page_num)
+    
+    def display_addon_page(self, page_num):
+        if not self.addon_data or page_num < 1 or page_num > len(self.addon_data):
+            self.addon_page_label.configure(text="")
+            self.addon_list.set_message("未获取到插件数据\n请检查网络连接后重试")
             return
-        
-        self.current_mod_page = page_num
-        mod_page_data = self.mod_data[page_num - 1]
         
         # 显示分页信息
-        pagination_frame = tk.Frame(self.mod_scrollable_frame, bg=self.bg_color)
-        pagination_frame.pack(fill=tk.X, pady=10)
-        
-        page_label = tk.Label(
-            pagination_frame, 
-            text=f"第 {page_num} 页，共 {len(self.mod_data)} 页", 
-            bg=self.bg_color, 
-            fg="#ecf0f1"
-        )
-        page_label.pack(side=tk.LEFT, padx=10)
+        if page_num != self.current_addon_page:
+            self.addon_list.scroll_to_top()
+        self.current_addon_page = page_num
+        self.addon_page_label.configure(text=f"第 {page_num} 页，共 {len(self.addon_data)} 页")
         
-        # 上一页按钮
-        prev_button = tk.Button(
-            pagination_frame, 
-            text="上一页", 
-            command=lambda: self.display_mod_page(page_num - 1) if page_num > 1 else None,
-            bg="#2c3e50",
-            fg="#ecf0f1",
-            relief=tk.FLAT,
-            padx=10,
-            pady=5
-        )
-        prev_button.pack(side=tk.LEFT, padx=5)
+        # 显示插件列表, 只重建变化的卡片
+        self.addon_list.set_items(self.addon_data[page_num - 1])
+    
+    def display_mod_page(self, page_num):
+        if not self.mod_data or page_num < 1 or page_num > len(self.mod_data):
+            self.mod_page_label.configure(text="")
+            self.mod_list.set_message("未获取到Mod数据\n请检查网络连接后重试")
+            return
         
-        # 下一页按钮
-        next_button = tk.Button(
-            pagination_frame, 
-            text="下一页", 
-            command=lambda: self.display_mod_page(page_num + 1) if page_num < len(self.mod_data) else None,
-            bg="#2c3e50",
-            fg="#ecf0f1",
-            relief=tk.FLAT,
-            padx=10,
-            pady=5
-        )
-        next_button.pack(side=tk.LEFT, padx=5)
+        # 显示分页信息
+        if page_num != self.current_mod_page:
+            self.mod_list.scroll_to_top()
+        self.current_mod_page = page_num
+        self.mod_page_label.configure(text=f"第 {page_num} 页，共 {len(self.mod_data)} 页")
         
-        # 显示Mod列表
-        for mod in mod_page_data:
-            self.create_mod_card(mod)
+        # 显示Mod列表, 只重建变化的卡片
+        self.mod_list.set_items(self.mod_data[page_num - 1])
     
-    def create_addon_card(self, addon):
-        addon_frame = tk.Frame(self.addon_scrollable_frame, bg=self.bg_color, relief='raised', borderwidth=1)
-        addon_frame.pack(fill=tk.X, padx=10, pady=8, ipady=8, ipadx=8)
+    def create_addon_card(self, parent, addon):
+        """创建卡片, 由卡片列表负责显示"""
+        addon_frame = tk.Frame(parent, bg=self.bg_color, relief='raised', borderwidth=1)
         
         # 插件头部（包含图标和标题）
         header_frame = tk.Frame(addon_frame, bg=self.bg_color)
         header_frame.pack(fill=tk.X, padx=15, pady=(5, 5))
         
-        # 下载并显示图标
-        icon_path = self.download_icon(addon.get('icon_url'), addon.get('name', 'unknown'))
-        if icon_path and os.path.exists(icon_path):
-            try:
-                image = Image.open(icon_path)
-                image = image.resize((64, 64), Image.Resampling.LANCZOS)
-                icon = ImageTk.PhotoImage(image)
-                icon_label = tk.Label(header_frame, image=icon, bg=self.bg_color)
-                icon_label.image = icon  # type: ignore # 保存引用
-                icon_label.pack(side=tk.LEFT, padx=(0, 10))
-            except Exception as e:
-                print(f"加载图标失败: {e}")
+        # 异步下载并显示图标, 加载完成前显示占位图
+        if addon.get('icon_url'):
+            icon_label = tk.Label(header_frame, bg=self.bg_color)
+            icon_label.pack(side=tk.LEFT, padx=(0, 10))
+            self.icon_loader.attach(icon_label, addon.get('icon_url'), addon.get('name', 'unknown'))
         
         # 名称和版本
         title_version_frame = tk.Frame(header_frame, bg=self.bg_color)
@@ -417,27 +327,22 @@ class DownloadCenterPage:
                                  bg='#27ae60', fg='white',
                                  relief='flat', padx=10, pady=3)
         download_button.pack(side=tk.RIGHT, padx=5)
+        
+        return addon_frame
     
-    def create_mod_card(self, mod):
-        mod_frame = tk.Frame(self.mod_scrollable_frame, bg=self.bg_color, relief='raised', borderwidth=1)
-        mod_frame.pack(fill=tk.X, padx=10, pady=8, ipady=8, ipadx=8)
+    def create_mod_card(self, parent, mod):
+        """创建卡片, 由卡片列表负责显示"""
+        mod_frame = tk.Frame(parent, bg=self.bg_color, relief='raised', borderwidth=1)
         
         # Mod头部（包含图标和标题）
         header_frame = tk.Frame(mod_frame, bg=self.bg_color)
         header_frame.pack(fill=tk.X, padx=15, pady=(5, 5))
         
-        # 下载并显示图标
-        icon_path = self.download_icon(mod.get('icon_url'), mod.get('name', 'unknown'))
-        if icon_path and os.path.exists(icon_path):
-            try:
-                image = Image.open(icon_path)
-                image = image.resize((64, 64), Image.Resampling.LANCZOS)
-                icon = ImageTk.PhotoImage(image)
-                icon_label = tk.Label(header_frame, image=icon, bg=self.bg_color)
-                icon_label.image = icon  # type: ignore # 保存引用
-                icon_label.pack(side=tk.LEFT, padx=(0, 10))
-            except Exception as e:
-                print(f"加载图标失败: {e}")
+        # 异步下载并显示图标, 加载完成前显示占位图
+        if mod.get('icon_url'):
+            icon_label = tk.Label(header_frame, bg=self.bg_color)
+            icon_label.pack(side=tk.LEFT, padx=(0, 10))
+            self.icon_loader.attach(icon_label, mod.get('icon_url'), mod.get('name', 'unknown'))
         
         # 名称和版本
         title_version_frame = tk.Frame(header_frame, bg=self.bg_color)
@@ -518,38 +423,13 @@ class DownloadCenterPage:
                                  bg='#27ae60', fg='white',
                                  relief='flat', padx=10, pady=3)
         download_button.pack(side=tk.RIGHT, padx=5)
-    
-    def download_icon(self, icon_url, item_name):
-        if not icon_url:
-            return None
-        
-        # 生成图标缓存路径
-        icon_filename = f"{item_name.replace(' ', '_')}_icon.png"
-        icon_path = os.path.join(self.icon_cache_dir, icon_filename)
-        
-        # 如果图标已存在，直接返回
-        if os.path.exists(icon_path):
-            return icon_path
-        
-        # 下载图标
-        try:
-            print(f"正在下载图标: {icon_url}")
-            response = requests.get(icon_url, timeout=10, verify=False)
-            if response.status_code == 200:
-                with open(icon_path, 'wb') as f:
-                    f.write(response.content)
-                print(f"图标下载成功: {icon_path}")
-                return icon_path
-            else:
-                print(f"图标下载失败，状态码: {response.status_code}")
-        except Exception as e:
-            print(f"图标下载异常: {str(e)}")
         
-        return None
+        return mod_frame
     
     def refresh_center(self):
         self.load_data()  # 重新加载数据
-        self.root.mod_addon_page.refresh_all_tabs()  # 刷新列表
+        if self.root.mod_addon_page:  # 插件&Mod页面创建后才需要刷新
+            self.root.mod_addon_page.refresh_all_tabs()  # 刷新列表
     
     def download_addon(self, addon):
         # 准备下载信息
@@ -585,8 +465,8 @@ class DownloadCenterPage:
         finally:
             # 恢复状态栏
             self.status_var.set("就绪 - 点击下载按钮开始下载")
-        threading.Thread(target=self.web_trigger.add_download_nummber_addon, args=(addon.get('name', None),)).start()  # 增加下载次数
-        threading.Thread(target=self.refresh_center).start()  # 刷新界面显示最新下载次数
+        self.web_trigger.add_download_nummber_addon(addon.get('name', None))  # 增加下载次数, 稍后合并写回
+        self.refresh_center()  # 刷新界面显示最新下载次数, 获取目录在后台线程中进行
     
     def download_mod(self, mod):
         # 准备下载信息
@@ -620,8 +500,8 @@ class DownloadCenterPage:
         finally:
             # 恢复状态栏
             self.status_var.set("就绪 - 点击下载按钮开始下载")
-        threading.Thread(target=self.web_trigger.add_download_nummber_mod, args=(mod.get('name', None),)).start()  # 增加下载次数
-        threading.Thread(target=self.refresh_center).start()  # 刷新界面显示最新下载次数
+        self.web_trigger.add_download_nummber_mod(mod.get('name', None))  # 增加下载次数, 稍后合并写回
+        self.refresh_center()  # 刷新界面显示最新下载次数, 获取目录在后台线程中进行
     
     def open_url(self, url):
         import webbrowser
@@ -634,8 +514,7 @@ class DownloadCenterPage:
             # 更新状态栏
             self.status_var.set("就绪 - 点击下载按钮开始下载")
         
-        if self.parent.winfo_exists():
-            self.parent.after(0, show)
+        self.run_on_ui(show)
 
 def init_download_center(parent, root, bg_color, lighten_bg_color):
     """初始化下载中心页面"""
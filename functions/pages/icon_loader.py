@@ -0,0 +1,161 @@
+import os
+import threading
+import tkinter as tk
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+import requests
+from PIL import Image, ImageTk
+
+ICON_CACHE_DIR = "cache/icons"
+ICON_SIZE = (64, 64)
+PLACEHOLDER_COLOR = '#34495e'
+
+
+class IconLoader:
+    """
+    异步图标加载器
+    下载与解码在有限大小的线程池中进行, 完成后通过 after 回到 Tk 线程创建 PhotoImage.
+    解码后的缩略图保存在内存 LRU 中, 翻页时不再重复解码.
+    """
+
+    def __init__(self, size: Tuple[int, int] = ICON_SIZE, cache_dir: str = ICON_CACHE_DIR,
+                 max_workers: int = 4, max_cached: int = 128):
+        self.size = size
+        self.cache_dir = cache_dir
+        self.max_cached = max_cached
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='icon')
+        self.photos: "OrderedDict[str, ImageTk.PhotoImage]" = OrderedDict()
+        # 正在加载的图标 -> 等待结果的标签, 同一个图标只加载一次
+        self.pending: dict = {}
+        self.lock = threading.Lock()
+        self.placeholder: Optional[ImageTk.PhotoImage] = None
+
+    def get_placeholder(self) -> ImageTk.PhotoImage:
+        """占位图, 只能在 Tk 线程调用"""
+        if self.placeholder is None:
+            self.placeholder = ImageTk.PhotoImage(Image.new('RGB', self.size, PLACEHOLDER_COLOR))
+        return self.placeholder
+
+    def get_cache_path(self, item_name: str) -> str:
+        """生成图标缓存路径"""
+        return os.path.join(self.cache_dir, f"{item_name.replace(' ', '_')}_icon.png")
+
+    def fetch(self, icon_url: str, item_name: str) -> Optional[str]:
+        """下载图标到本地缓存, 已存在时直接返回路径"""
+        icon_path = self.get_cache_path(item_name)
+        if os.path.exists(icon_path):
+            return icon_path
+
+        try:
+            print(f"正在下载图标: {icon_url}")
+            response = requests.get(icon_url, timeout=10, verify=False)
+            if response.status_code == 200:
+                with open(icon_path + '.tmp', 'wb') as f:
+                    f.write(response.content)
+                os.replace(icon_path + '.tmp', icon_path)
+                print(f"图标下载成功: {icon_path}")
+                return icon_path
+            else:
+                print(f"图标下载失败，状态码: {response.status_code}")
+        except Exception as e:
+            print(f"图标下载异常: {str(e)}")
+
+        return None
+
+    def decode(self, icon_path: str) -> Image.Image:
+        """读取并缩放图标, 在工作线程中进行"""
+        with Image.open(icon_path) as image:
+            image.load()
+            return image.resize(self.size, Image.Resampling.LANCZOS)
+
+    def load_worker(self, path: Optional[str], icon_url: Optional[str], item_name: str) -> Optional[Image.Image]:
+        icon_path = path or self.fetch(icon_url, item_name)  # type: ignore
+        if not icon_path or not os.path.exists(icon_path):
+            return None
+        return self.decode(icon_path)
+
+    def attach(self, label: tk.Label, icon_url: Optional[str] = None, item_name: str = '',
+               path: Optional[str] = None):
+        """
+        给标签设置图标: 已缓存时立即显示, 否则先显示占位图, 加载完成后替换
+        只能在 Tk 线程调用
+
+        Args:
+            label: 显示图标的标签
+            icon_url: 远程图标地址, 下载后缓存到 cache_dir
+            item_name: 用于生成缓存文件名
+            path: 本地图标路径, 与 icon_url 二选一
+        """
+        if path:
+            # 本地图标按修改时间区分, 文件更新后重新解码
+            key = f"{path}|{os.path.getmtime(path)}"
+        else:
+            key = self.get_cache_path(item_name)
+        if key in self.photos:
+            self.photos.move_to_end(key)
+            self.set_image(label, self.photos[key])
+            return
+
+        self.set_image(label, self.get_placeholder())
+        with self.lock:
+            if key in self.pending:
+                self.pending[key].append(label)
+                return
+            self.pending[key] = [label]
+
+        future = self.executor.submit(self.load_worker, path, icon_url, item_name)
+        future.add_done_callback(lambda f: self.on_loaded(label, key, f))
+
+    def on_loaded(self, label: tk.Label, key: str, future):
+        """工作线程完成后, 把结果交给 Tk 线程"""
+        try:
+            image = future.result()
+        except Exception as e:
+            print(f"加载图标失败: {e}")
+            image = None
+        try:
+            label.after(0, lambda: self.finish(key, image))
+        except (RuntimeError, tk.TclError):
+            # 窗口已经关闭
+            with self.lock:
+                self.pending.pop(key, None)
+
+    def finish(self, key: str, image: Optional[Image.Image]):
+        """在 Tk 线程中创建 PhotoImage 并更新所有等待该图标的标签"""
+        with self.lock:
+            labels = self.pending.pop(key, [])
+        if image is None:
+            # 加载失败时与原来一样不显示图标
+            for label in labels:
+                if label.winfo_exists():
+                    label.pack_forget()
+            return
+
+        photo = ImageTk.PhotoImage(image)
+        self.photos[key] = photo
+        while len(self.photos) > self.max_cached:
+            self.photos.popitem(last=False)
+
+        for label in labels:
+            self.set_image(label, photo)
+
+    @staticmethod
+    def set_image(label: tk.Label, photo: ImageTk.PhotoImage):
+        if label.winfo_exists():
+            label.configure(image=photo)
+            label.image = photo  # type: ignore # 保存引用, 防止被LRU淘汰后回收
+
+
+_icon_loader: Optional[IconLoader] = None
+
+
+def get_icon_loader() -> IconLoader:
+    """获取全局图标加载器"""
+    global _icon_loader
+    if _icon_loader is None:
+        _icon_loader = IconLoader()
+    return _icon_loader
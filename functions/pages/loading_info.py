@@ -48,6 +48,7 @@ class ModernSplashScreen:
         # 动画参数
         self.animation_running = True
         self.fade_in_complete = False
+        self.closing = False
 
     def center_window(self):
         """居中显示窗口"""
@@ -120,6 +121,8 @@ class ModernSplashScreen:
     def fade_in(self):
         """渐入动画"""
         def animate_fade_in(alpha=0.0):
+            if self.closing:
+                return
             if alpha < 1.0 and self.animation_running:
                 self.splash.attributes('-alpha', alpha)
                 self.splash.after(30, lambda: animate_fade_in(alpha + 0.05))
@@ -144,43 +147,11 @@ class ModernSplashScreen:
         
         # 显示版本信息
         self.splash.after(0, lambda: self.canvas.itemconfig(self.version_item, state='normal'))
-        
-        # 开始进度条动画
-        self.splash.after(500, self.start_progress_animation)
-
-    def start_progress_animation(self):
-        """开始进度条动画"""
-        def animate_progress(progress=0):
-            if progress <= 100 and self.animation_running:
-                # 更新进度条宽度
-                progress_width = 100 + (progress / 100) * 300
-                self.canvas.coords(self.progress_fg, 100, 240, progress_width, 250)
-                
-                # 更新进度文本
-                self.canvas.itemconfig(self.progress_text, text=f"{progress}%")
-                
-                # 更新副标题文本
-                status_texts = [
-                    "浮士德正在检查梅菲斯特的动向...",
-                    "加载巴士系统的配置文件...", 
-                    "准备经理面板界面组件...",
-                    "即将完成...",
-                    "欢迎您, 但丁。"
-                ]
-                status_index = min(len(status_texts) - 1, progress // 25)
-                self.canvas.itemconfig(self.subtitle_item, text=status_texts[status_index])
-                
-                # 继续动画
-                delay = 10 if progress < 80 else 30  # 最后阶段慢一点
-                self.splash.after(delay, lambda: animate_progress(progress + 1))
-            elif progress > 100:
-                # 进度完成，准备淡出
-                self.splash.after(500, self.fade_out)
-        
-        animate_progress()
 
     def fade_out(self):
         """淡出动画"""
+        self.closing = True
+
         def animate_fade_out(alpha=1.0):
             if alpha > 0.0 and self.animation_running:
                 self.splash.attributes('-alpha', alpha)
@@ -203,11 +174,15 @@ class ModernSplashScreen:
     def close(self):
         """关闭启动画面"""
         self.animation_running = False
-        self.splash.destroy()
+        if self.splash.winfo_exists():
+            self.splash.destroy()
 
     def update_status(self, text, progress=None):
-        """更新状态文本和进度"""
-        if hasattr(self, 'subtitle_item'):
+        """更新状态文本和进度, 只重绘不处理其他事件, 可以在启动任务之间调用"""
+        if not self.animation_running or not self.splash.winfo_exists():
+            return
+
+        if text and hasattr(self, 'subtitle_item'):
             self.canvas.itemconfig(self.subtitle_item, text=text)
         
         if progress is not None and hasattr(self, 'progress_fg'):
@@ -215,7 +190,12 @@ class ModernSplashScreen:
             self.canvas.coords(self.progress_fg, 100, 240, progress_width, 250)
             self.canvas.itemconfig(self.progress_text, text=f"{progress}%")
         
-        self.splash.update()
+        self.splash.update_idletasks()
+
+    def finish(self):
+        """启动完成, 显示欢迎语后淡出"""
+        self.update_status("欢迎您, 但丁。", 100)
+        self.splash.after(300, self.fade_out)
 
 # 使用方式示例
 def show_loading_page(root):
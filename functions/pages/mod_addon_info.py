@@ -2,8 +2,36 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import os
 import json
-from PIL import Image, ImageTk
+import threading
 from functions.addon.addon_ulit import AddonManager
+from functions.pages.icon_loader import get_icon_loader
+from functions.pages.card_list import CardList
+from functions.mod.mod_ulits import get_mod_priority
+from functions.modloader.mod_index import find_mod_conflicts, sort_mod_archives
+
+# 各mod文件涉及的对象, 文件没有变化时直接复用
+MOD_CONFLICT_CACHE_PATH = "cache/mod_conflicts.json"
+# 冲突报告中最多列出的条数
+MAX_CONFLICT_LINES = 15
+
+
+def get_dir_fingerprint(base_dir, info_name):
+    """目录下各子文件夹及其信息文件、图标的修改时间, 用于判断列表是否需要刷新"""
+    if not os.path.exists(base_dir):
+        return ()
+    fingerprint = []
+    for item in sorted(os.listdir(base_dir)):
+        item_path = os.path.join(base_dir, item)
+        if not os.path.isdir(item_path):
+            continue
+        mtimes = []
+        for name in (info_name, 'icon.png'):
+            try:
+                mtimes.append(os.path.getmtime(os.path.join(item_path, name)))
+            except OSError:
+                mtimes.append(None)
+        fingerprint.append((item, *mtimes))
+    return tuple(fingerprint)
 
 class ModAddonManagerPage:
     def __init__(self, parent_frame, bg_color, lighten_bg_color):
@@ -13,6 +41,9 @@ class ModAddonManagerPage:
         self.lighten_bg_color = lighten_bg_color
         self.addon_manager = AddonManager([])
         self.mods_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'mods')
+        # 目录指纹, 切换标签页时没有变化就不重新扫描
+        self.addons_fingerprint = None
+        self.mods_fingerprint = None
         self.create_widgets()
 
         self.refresh_addons_tab()
@@ -41,74 +72,41 @@ class ModAddonManagerPage:
         addons_frame = ttk.Frame(self.notebook)
         self.notebook.add(addons_frame, text="🔌 插件管理")
         
-        # 创建滚动区域
-        canvas = tk.Canvas(addons_frame, bg=self.bg_color, highlightthickness=0)
-        scrollbar = ttk.Scrollbar(addons_frame, orient="vertical", command=canvas.yview)
-        scrollable_frame = tk.Frame(canvas, bg=self.bg_color)
-        
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
-        
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-        
-        # 绑定鼠标滚轮事件
-        def _on_mousewheel(event):
-            canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-        canvas.bind("<MouseWheel>", _on_mousewheel)
-        scrollable_frame.bind("<MouseWheel>", _on_mousewheel)
-        
-        # 显示插件列表
-        self.show_addons(scrollable_frame)
-        
-        # 打包滚动区域
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        # 卡片列表只创建可见部分, 刷新时复用未变化的卡片
+        self.addon_list = CardList(addons_frame, self.bg_color, self.create_addon_card,
+                                   key=lambda addon: addon['name'])
+        self.addon_list.pack()
     
     def create_new_mods_tab(self):
         """创建新Mod架构管理标签页"""
         mods_frame = ttk.Frame(self.notebook)
         self.notebook.add(mods_frame, text="🎮 Mod管理")
         
-        # 创建滚动区域
-        canvas = tk.Canvas(mods_frame, bg=self.bg_color, highlightthickness=0)
-        scrollbar = ttk.Scrollbar(mods_frame, orient="vertical", command=canvas.yview)
-        scrollable_frame = tk.Frame(canvas, bg=self.bg_color)
-        
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
-        
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-        
-        # 绑定鼠标滚轮事件
-        def _on_mousewheel(event):
-            canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-        canvas.bind("<MouseWheel>", _on_mousewheel)
-        scrollable_frame.bind("<MouseWheel>", _on_mousewheel)
-        
-        # 显示Mod列表
-        self.show_mods(scrollable_frame)
-        
-        # 打包滚动区域
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        self.mod_list = CardList(mods_frame, self.bg_color, self.create_mod_card,
+                                 key=lambda mod: mod['name'])
+        self.mod_list.pack()
         
         # 创建状态栏
         status_frame = tk.Frame(mods_frame, bg=self.bg_color, height=25)
         status_frame.pack(fill=tk.X, side=tk.BOTTOM, pady=(10, 0))
         status_frame.pack_propagate(False)
         
+        conflict_button = tk.Button(status_frame,
+                                    text="⚠️ 检查冲突",
+                                    command=self.check_mod_conflicts,
+                                    font=('Microsoft YaHei UI', 9),
+                                    bg='#e67e22', fg='white',
+                                    relief='flat', padx=10)
+        conflict_button.pack(side=tk.RIGHT, padx=10)
+        
         self.status_var = tk.StringVar()
         self.status_var.set("就绪 - 双击Mod可查看详情")
         status_label = tk.Label(status_frame, textvariable=self.status_var,
                                font=('Microsoft YaHei UI', 9),
                                bg=self.bg_color, fg='#95a5a6', anchor=tk.W)
         status_label.pack(fill=tk.X, padx=10, pady=5)
+        
+        self.refresh_mods_tab()
     
     def create_styled_button(self, parent, text, command, color):
         """创建样式统一的按钮"""
@@ -144,167 +142,154 @@ class ModAddonManagerPage:
             return f"#{r:02x}{g:02x}{b:02x}"
         return color
     
-    def show_addons(self, parent):
-        """显示插件列表"""
-        # 扫描插件
-        self.addon_manager.scan_addons()
-        addons = self.addon_manager.get_all_addons()
-        
-        if not addons:
-            return
-        
-        for addon in addons:
-            addon_frame = tk.Frame(parent, bg=self.bg_color, relief='raised', borderwidth=1)
-            addon_frame.pack(fill=tk.X, padx=10, pady=8, ipady=8, ipadx=8)
-            
-            # 插件头部（包含图标和标题）
-            header_frame = tk.Frame(addon_frame, bg=self.bg_color)
-            header_frame.pack(fill=tk.X, padx=15, pady=(5, 5))
-            
-            # 插件图标
-            icon_path = os.path.join(addon['path'], 'icon.png')
-            if os.path.exists(icon_path):
-                try:
-                    image = Image.open(icon_path)
-                    image = image.resize((64, 64), Image.Resampling.LANCZOS)
-                    icon = ImageTk.PhotoImage(image)
-                    icon_label = tk.Label(header_frame, image=icon, bg=self.bg_color)
-                    icon_label.image = icon  # type: ignore # 保存引用
-                    icon_label.pack(side=tk.LEFT, padx=(0, 10))
-                except:
-                    pass
-            
-            # 插件标题和版本
-            title_version_frame = tk.Frame(header_frame, bg=self.bg_color)
-            title_version_frame.pack(side=tk.LEFT, fill=tk.X, expand=True)
-            
-            # 插件标题
-            addon_name = addon['info'].get('name', addon['name'])
-            title_label = tk.Label(title_version_frame, 
-                                 text=addon_name,
-                                 font=('微软雅黑', 11, 'bold'),
-                                 bg=self.bg_color, fg='white')
-            title_label.pack(anchor=tk.W, pady=(0, 2))
-            
-            # 插件版本
-            version = addon['info'].get('addon_version', '未知版本')
-            version_label = tk.Label(title_version_frame, 
-                                   text=f"版本: {version}",
-                                   font=('微软雅黑', 9),
-                                   bg=self.bg_color, fg='#95a5a6')
-            version_label.pack(anchor=tk.W)
-            
-            # 插件描述
-            description = addon['info'].get('desc', '无描述')
-            desc_label = tk.Label(addon_frame, 
-                                text=description,
-                                font=('微软雅黑', 9),
-                                bg=self.bg_color, fg='#bdc3c7',
-                                wraplength=400, justify=tk.LEFT)
-            desc_label.pack(anchor=tk.W, padx=15, pady=(0, 5))
-            
-            # 插件作者
-            authors = addon['info'].get('authors', {})
-            if authors:
-                authors_frame = tk.Frame(addon_frame, bg=self.bg_color)
-                authors_frame.pack(fill=tk.X, padx=15, pady=(0, 5))
+    def create_addon_card(self, parent, addon):
+        """创建插件卡片, 由卡片列表负责显示"""
+        addon_frame = tk.Frame(parent, bg=self.bg_color, relief='raised', borderwidth=1)
+        
+        # 插件头部（包含图标和标题）
+        header_frame = tk.Frame(addon_frame, bg=self.bg_color)
+        header_frame.pack(fill=tk.X, padx=15, pady=(5, 5))
+        
+        # 插件图标, 在后台解码并缓存
+        icon_path = os.path.join(addon['path'], 'icon.png')
+        if os.path.exists(icon_path):
+            icon_label = tk.Label(header_frame, bg=self.bg_color)
+            icon_label.pack(side=tk.LEFT, padx=(0, 10))
+            get_icon_loader().attach(icon_label, path=icon_path)
+        
+        # 插件标题和版本
+        title_version_frame = tk.Frame(header_frame, bg=self.bg_color)
+        title_version_frame.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        # 插件标题
+        addon_name = addon['info'].get('name', addon['name'])
+        title_label = tk.Label(title_version_frame, 
+                             text=addon_name,
+                             font=('微软雅黑', 11, 'bold'),
+                             bg=self.bg_color, fg='white')
+        title_label.pack(anchor=tk.W, pady=(0, 2))
+        
+        # 插件版本
+        version = addon['info'].get('addon_version', '未知版本')
+        version_label = tk.Label(title_version_frame, 
+                               text=f"版本: {version}",
+                               font=('微软雅黑', 9),
+                               bg=self.bg_color, fg='#95a5a6')
+        version_label.pack(anchor=tk.W)
+        
+        # 插件描述
+        description = addon['info'].get('desc', '无描述')
+        desc_label = tk.Label(addon_frame, 
+                            text=description,
+                            font=('微软雅黑', 9),
+                            bg=self.bg_color, fg='#bdc3c7',
+                            wraplength=400, justify=tk.LEFT)
+        desc_label.pack(anchor=tk.W, padx=15, pady=(0, 5))
+        
+        # 插件作者
+        authors = addon['info'].get('authors', {})
+        if authors:
+            authors_frame = tk.Frame(addon_frame, bg=self.bg_color)
+            authors_frame.pack(fill=tk.X, padx=15, pady=(0, 5))
+            
+            authors_label = tk.Label(authors_frame, 
+                                   text="作者:",
+                                   font=('微软雅黑', 9, 'bold'),
+                                   bg=self.bg_color, fg='#ecf0f1')
+            authors_label.pack(anchor=tk.W, pady=(0, 2))
+            
+            for author_name, author_url in authors.items():
+                author_frame = tk.Frame(authors_frame, bg=self.bg_color)
+                author_frame.pack(anchor=tk.W, pady=1)
                 
-                authors_label = tk.Label(authors_frame, 
-                                       text="作者:",
-                                       font=('微软雅黑', 9, 'bold'),
-                                       bg=self.bg_color, fg='#ecf0f1')
-                authors_label.pack(anchor=tk.W, pady=(0, 2))
+                author_name_label = tk.Label(author_frame, 
+                                           text=author_name,
+                                           font=('微软雅黑', 9),
+                                           bg=self.bg_color, fg='#3498db',
+                                           cursor='hand2')
+                author_name_label.pack(side=tk.LEFT, padx=(0, 5))
+                author_name_label.bind('<Button-1>', lambda e, url=author_url: self.open_url(url))
                 
-                for author_name, author_url in authors.items():
-                    author_frame = tk.Frame(authors_frame, bg=self.bg_color)
-                    author_frame.pack(anchor=tk.W, pady=1)
-                    
-                    author_name_label = tk.Label(author_frame, 
-                                               text=author_name,
-                                               font=('微软雅黑', 9),
-                                               bg=self.bg_color, fg='#3498db',
-                                               cursor='hand2')
-                    author_name_label.pack(side=tk.LEFT, padx=(0, 5))
-                    author_name_label.bind('<Button-1>', lambda e, url=author_url: self.open_url(url))
-                    
-                    if author_url:
-                        url_label = tk.Label(author_frame, 
-                                           text=author_url,
-                                           font=('微软雅黑', 8),
-                                           bg=self.bg_color, fg='#95a5a6')
-                        url_label.pack(side=tk.LEFT)
-            
-            # 插件设置
-            settings = addon['info'].get('settings', {})
-            if settings:
-                settings_frame = tk.Frame(addon_frame, bg=self.lighten_bg_color, relief='groove', borderwidth=1)
-                settings_frame.pack(fill=tk.X, padx=15, pady=5, ipady=5, ipadx=5)
+                if author_url:
+                    url_label = tk.Label(author_frame, 
+                                       text=author_url,
+                                       font=('微软雅黑', 8),
+                                       bg=self.bg_color, fg='#95a5a6')
+                    url_label.pack(side=tk.LEFT)
+        
+        # 插件设置
+        settings = addon['info'].get('settings', {})
+        if settings:
+            settings_frame = tk.Frame(addon_frame, bg=self.lighten_bg_color, relief='groove', borderwidth=1)
+            settings_frame.pack(fill=tk.X, padx=15, pady=5, ipady=5, ipadx=5)
+            
+            settings_label = tk.Label(settings_frame, 
+                                    text="设置",
+                                    font=('微软雅黑', 10, 'bold'),
+                                    bg=self.lighten_bg_color, fg='white')
+            settings_label.pack(anchor=tk.W, pady=(0, 8))
+            
+            for setting_key, setting_value in settings.items():
+                setting_row = tk.Frame(settings_frame, bg=self.lighten_bg_color)
+                setting_row.pack(fill=tk.X, pady=3)
                 
-                settings_label = tk.Label(settings_frame, 
-                                        text="设置",
-                                        font=('微软雅黑', 10, 'bold'),
-                                        bg=self.lighten_bg_color, fg='white')
-                settings_label.pack(anchor=tk.W, pady=(0, 8))
+                setting_name_label = tk.Label(setting_row, 
+                                           text=setting_key,
+                                           font=('微软雅黑', 9),
+                                           bg=self.lighten_bg_color, fg='#ecf0f1',
+                                           width=20, anchor=tk.W)
+                setting_name_label.pack(side=tk.LEFT, padx=5)
                 
-                for setting_key, setting_value in settings.items():
-                    setting_row = tk.Frame(settings_frame, bg=self.lighten_bg_color)
-                    setting_row.pack(fill=tk.X, pady=3)
-                    
-                    setting_name_label = tk.Label(setting_row, 
-                                               text=setting_key,
-                                               font=('微软雅黑', 9),
-                                               bg=self.lighten_bg_color, fg='#ecf0f1',
-                                               width=20, anchor=tk.W)
-                    setting_name_label.pack(side=tk.LEFT, padx=5)
-                    
-                    if isinstance(setting_value, bool):
-                        var = tk.BooleanVar(value=setting_value)
-                        checkbox = tk.Checkbutton(setting_row, 
-                                                variable=var,
-                                                command=lambda a=addon, k=setting_key, v=var: self.on_addon_setting_change(a, k, v),
-                                                font=('Microsoft YaHei UI', 10),
-                                                bg=self.lighten_bg_color, fg='white',
-                                                selectcolor='#3498db',
-                                                activebackground=self.lighten_bg_color,
-                                                activeforeground='white')
-                        checkbox.pack(side=tk.LEFT, padx=5)
-                    else:
-                        entry = tk.Entry(setting_row, 
-                                       font=('Microsoft YaHei UI', 10),
-                                       width=30,
-                                       bg=self.bg_color, fg='white',
-                                       relief='flat', borderwidth=1)
-                        entry.insert(0, setting_value)
-                        entry.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
-                        entry.bind('<KeyRelease>', lambda e, a=addon, k=setting_key, ent=entry: self.on_addon_setting_change(a, k, ent))
-            
-            # 操作按钮
-            buttons_frame = tk.Frame(addon_frame, bg=self.bg_color)
-            buttons_frame.pack(fill=tk.X, padx=15, pady=5)
-            
-            run_button = tk.Button(buttons_frame, 
-                                 text="▶ 运行",
-                                 command=lambda a=addon['name']: self.run_addon(a),
-                                 font=('Microsoft YaHei UI', 9),
-                                 bg='#3498db', fg='white',
-                                 relief='flat', padx=10, pady=3)
-            run_button.pack(side=tk.LEFT, padx=5)
-            
-            open_folder_button = tk.Button(buttons_frame, 
-                                         text="📂 插件目录",
-                                         command=lambda p=addon['path']: self.open_addon_folder(p),
-                                         font=('Microsoft YaHei UI', 9),
-                                         bg='#f39c12', fg='white',
-                                         relief='flat', padx=10, pady=3)
-            open_folder_button.pack(side=tk.LEFT, padx=5)
-            
-            delete_button = tk.Button(buttons_frame, 
-                                    text="🗑️ 删除插件",
-                                    command=lambda a=addon['name']: self.delete_addon(a),
-                                    font=('Microsoft YaHei UI', 9),
-                                    bg='#e74c3c', fg='white',
-                                    relief='flat', padx=10, pady=3)
-            delete_button.pack(side=tk.LEFT, padx=5)
+                if isinstance(setting_value, bool):
+                    var = tk.BooleanVar(value=setting_value)
+                    checkbox = tk.Checkbutton(setting_row, 
+                                            variable=var,
+                                            command=lambda a=addon, k=setting_key, v=var: self.on_addon_setting_change(a, k, v),
+                                            font=('Microsoft YaHei UI', 10),
+                                            bg=self.lighten_bg_color, fg='white',
+                                            selectcolor='#3498db',
+                                            activebackground=self.lighten_bg_color,
+                                            activeforeground='white')
+                    checkbox.pack(side=tk.LEFT, padx=5)
+                else:
+                    entry = tk.Entry(setting_row, 
+                                   font=('Microsoft YaHei UI', 10),
+                                   width=30,
+                                   bg=self.bg_color, fg='white',
+                                   relief='flat', borderwidth=1)
+                    entry.insert(0, setting_value)
+                    entry.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+                    entry.bind('<KeyRelease>', lambda e, a=addon, k=setting_key, ent=entry: self.on_addon_setting_change(a, k, ent))
+        
+        # 操作按钮
+        buttons_frame = tk.Frame(addon_frame, bg=self.bg_color)
+        buttons_frame.pack(fill=tk.X, padx=15, pady=5)
+        
+        run_button = tk.Button(buttons_frame, 
+                             text="▶ 运行",
+                             command=lambda a=addon['name']: self.run_addon(a),
+                             font=('Microsoft YaHei UI', 9),
+                             bg='#3498db', fg='white',
+                             relief='flat', padx=10, pady=3)
+        run_button.pack(side=tk.LEFT, padx=5)
+        
+        open_folder_button = tk.Button(buttons_frame, 
+                                     text="📂 插件目录",
+                                     command=lambda p=addon['path']: self.open_addon_folder(p),
+                                     font=('Microsoft YaHei UI', 9),
+                                     bg='#f39c12', fg='white',
+                                     relief='flat', padx=10, pady=3)
+        open_folder_button.pack(side=tk.LEFT, padx=5)
+        
+        delete_button = tk.Button(buttons_frame, 
+                                text="🗑️ 删除插件",
+                                command=lambda a=addon['name']: self.delete_addon(a),
+                                font=('Microsoft YaHei UI', 9),
+                                bg='#e74c3c', fg='white',
+                                relief='flat', padx=10, pady=3)
+        delete_button.pack(side=tk.LEFT, padx=5)
+        
+        return addon_frame
     
     def on_addon_setting_change(self, addon, setting_key, value_var):
         """插件设置变更事件"""
@@ -350,12 +335,12 @@ class ModAddonManagerPage:
         import webbrowser
         webbrowser.open(url)
     
-    def show_mods(self, parent):
-        """显示新架构的Mod列表"""
+    def scan_mods(self):
+        """读取新架构的Mod列表"""
         # 确保mods目录存在
         if not os.path.exists(self.mods_dir):
             os.makedirs(self.mods_dir)
-            return
+            return []
         
         # 获取所有mod
         mods = []
@@ -375,172 +360,170 @@ class ModAddonManagerPage:
                     except:
                         pass
         
-        if not mods:
-            return
-        
-        for mod in mods:
-            mod_frame = tk.Frame(parent, bg=self.bg_color, relief='raised', borderwidth=1)
-            mod_frame.pack(fill=tk.X, padx=10, pady=8, ipady=8, ipadx=8)
-            
-            # Mod头部（包含图标和标题）
-            header_frame = tk.Frame(mod_frame, bg=self.bg_color)
-            header_frame.pack(fill=tk.X, padx=15, pady=(5, 5))
-            
-            # Mod图标
-            icon_path = os.path.join(mod['path'], 'icon.png')
-            if os.path.exists(icon_path):
-                try:
-                    image = Image.open(icon_path)
-                    image = image.resize((64, 64), Image.Resampling.LANCZOS)
-                    icon = ImageTk.PhotoImage(image)
-                    icon_label = tk.Label(header_frame, image=icon, bg=self.bg_color)
-                    icon_label.image = icon  # type: ignore # 保存引用
-                    icon_label.pack(side=tk.LEFT, padx=(0, 10))
-                except:
-                    pass
-            
-            # Mod标题和版本
-            title_version_frame = tk.Frame(header_frame, bg=self.bg_color)
-            title_version_frame.pack(side=tk.LEFT, fill=tk.X, expand=True)
-            
-            # Mod标题
-            mod_name = mod['info'].get('name', mod['name'])
-            title_label = tk.Label(title_version_frame, 
-                                 text=mod_name,
-                                 font=('微软雅黑', 11, 'bold'),
-                                 bg=self.bg_color, fg='white')
-            title_label.pack(anchor=tk.W, pady=(0, 2))
-            
-            # Mod版本
-            version = mod['info'].get('addon_version', '未知版本')
-            version_label = tk.Label(title_version_frame, 
-                                   text=f"版本: {version}",
-                                   font=('微软雅黑', 9),
-                                   bg=self.bg_color, fg='#95a5a6')
-            version_label.pack(anchor=tk.W)
-            
-            # Mod描述
-            description = mod['info'].get('desc', '无描述')
-            desc_label = tk.Label(mod_frame, 
-                                text=description,
-                                font=('微软雅黑', 9),
-                                bg=self.bg_color, fg='#bdc3c7',
-                                wraplength=400, justify=tk.LEFT)
-            desc_label.pack(anchor=tk.W, padx=15, pady=(0, 5))
-            
-            # Mod作者
-            authors = mod['info'].get('authors', {})
-            if authors:
-                authors_frame = tk.Frame(mod_frame, bg=self.bg_color)
-                authors_frame.pack(fill=tk.X, padx=15, pady=(0, 5))
-                
-                authors_label = tk.Label(authors_frame, 
-                                       text="作者:",
-                                       font=('微软雅黑', 9, 'bold'),
-                                       bg=self.bg_color, fg='#ecf0f1')
-                authors_label.pack(anchor=tk.W, pady=(0, 2))
+        return mods
+    
+    def create_mod_card(self, parent, mod):
+        """创建Mod卡片, 由卡片列表负责显示"""
+        mod_frame = tk.Frame(parent, bg=self.bg_color, relief='raised', borderwidth=1)
+        
+        # Mod头部（包含图标和标题）
+        header_frame = tk.Frame(mod_frame, bg=self.bg_color)
+        header_frame.pack(fill=tk.X, padx=15, pady=(5, 5))
+        
+        # Mod图标, 在后台解码并缓存
+        icon_path = os.path.join(mod['path'], 'icon.png')
+        if os.path.exists(icon_path):
+            icon_label = tk.Label(header_frame, bg=self.bg_color)
+            icon_label.pack(side=tk.LEFT, padx=(0, 10))
+            get_icon_loader().attach(icon_label, path=icon_path)
+        
+        # Mod标题和版本
+        title_version_frame = tk.Frame(header_frame, bg=self.bg_color)
+        title_version_frame.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        # Mod标题
+        mod_name = mod['info'].get('name', mod['name'])
+        title_label = tk.Label(title_version_frame, 
+                             text=mod_name,
+                             font=('微软雅黑', 11, 'bold'),
+                             bg=self.bg_color, fg='white')
+        title_label.pack(anchor=tk.W, pady=(0, 2))
+        
+        # Mod版本, 设置了优先级时一并显示
+        version = mod['info'].get('addon_version', '未知版本')
+        version_text = f"版本: {version}"
+        if 'priority' in mod['info']:
+            version_text += f"    优先级: {mod['info']['priority']}"
+        version_label = tk.Label(title_version_frame, 
+                               text=version_text,
+                               font=('微软雅黑', 9),
+                               bg=self.bg_color, fg='#95a5a6')
+        version_label.pack(anchor=tk.W)
+        
+        # Mod描述
+        description = mod['info'].get('desc', '无描述')
+        desc_label = tk.Label(mod_frame, 
+                            text=description,
+                            font=('微软雅黑', 9),
+                            bg=self.bg_color, fg='#bdc3c7',
+                            wraplength=400, justify=tk.LEFT)
+        desc_label.pack(anchor=tk.W, padx=15, pady=(0, 5))
+        
+        # Mod作者
+        authors = mod['info'].get('authors', {})
+        if authors:
+            authors_frame = tk.Frame(mod_frame, bg=self.bg_color)
+            authors_frame.pack(fill=tk.X, padx=15, pady=(0, 5))
+            
+            authors_label = tk.Label(authors_frame, 
+                                   text="作者:",
+                                   font=('微软雅黑', 9, 'bold'),
+                                   bg=self.bg_color, fg='#ecf0f1')
+            authors_label.pack(anchor=tk.W, pady=(0, 2))
+            
+            for author_name, author_url in authors.items():
+                author_frame = tk.Frame(authors_frame, bg=self.bg_color)
+                author_frame.pack(anchor=tk.W, pady=1)
                 
-                for author_name, author_url in authors.items():
-                    author_frame = tk.Frame(authors_frame, bg=self.bg_color)
-                    author_frame.pack(anchor=tk.W, pady=1)
-                    
-                    author_name_label = tk.Label(author_frame, 
-                                               text=author_name,
-                                               font=('微软雅黑', 9),
-                                               bg=self.bg_color, fg='#3498db',
-                                               cursor='hand2')
-                    author_name_label.pack(side=tk.LEFT, padx=(0, 5))
-                    author_name_label.bind('<Button-1>', lambda e, url=author_url: self.open_url(url))
-                    
-                    if author_url:
-                        url_label = tk.Label(author_frame, 
-                                           text=author_url,
-                                           font=('微软雅黑', 8),
-                                           bg=self.bg_color, fg='#95a5a6')
-                        url_label.pack(side=tk.LEFT)
-            
-            # Mod文件
-            file_names = mod['info'].get('file_names', [])
-            if file_names:
-                files_frame = tk.Frame(mod_frame, bg=self.bg_color)
-                files_frame.pack(fill=tk.X, padx=15, pady=(0, 5))
+                author_name_label = tk.Label(author_frame, 
+                                           text=author_name,
+                                           font=('微软雅黑', 9),
+                                           bg=self.bg_color, fg='#3498db',
+                                           cursor='hand2')
+                author_name_label.pack(side=tk.LEFT, padx=(0, 5))
+                author_name_label.bind('<Button-1>', lambda e, url=author_url: self.open_url(url))
                 
-                files_label = tk.Label(files_frame, 
-                                     text="文件:",
-                                     font=('微软雅黑', 9, 'bold'),
-                                     bg=self.bg_color, fg='#ecf0f1')
-                files_label.pack(anchor=tk.W, pady=(0, 2))
+                if author_url:
+                    url_label = tk.Label(author_frame, 
+                                       text=author_url,
+                                       font=('微软雅黑', 8),
+                                       bg=self.bg_color, fg='#95a5a6')
+                    url_label.pack(side=tk.LEFT)
+        
+        # Mod文件
+        file_names = mod['info'].get('file_names', [])
+        if file_names:
+            files_frame = tk.Frame(mod_frame, bg=self.bg_color)
+            files_frame.pack(fill=tk.X, padx=15, pady=(0, 5))
+            
+            files_label = tk.Label(files_frame, 
+                                 text="文件:",
+                                 font=('微软雅黑', 9, 'bold'),
+                                 bg=self.bg_color, fg='#ecf0f1')
+            files_label.pack(anchor=tk.W, pady=(0, 2))
+            
+            for file_name in file_names:
+                file_label = tk.Label(files_frame, 
+                                    text=f"  • {file_name}",
+                                    font=('微软雅黑', 9),
+                                    bg=self.bg_color, fg='#bdc3c7')
+                file_label.pack(anchor=tk.W)
+        
+        # Mod设置
+        settings = mod['info'].get('settings', {})
+        if settings:
+            settings_frame = tk.Frame(mod_frame, bg=self.lighten_bg_color, relief='groove', borderwidth=1)
+            settings_frame.pack(fill=tk.X, padx=15, pady=5, ipady=5, ipadx=5)
+            
+            settings_label = tk.Label(settings_frame, 
+                                    text="设置",
+                                    font=('微软雅黑', 10, 'bold'),
+                                    bg=self.lighten_bg_color, fg='white')
+            settings_label.pack(anchor=tk.W, pady=(0, 8))
+            
+            for setting_key, setting_value in settings.items():
+                setting_row = tk.Frame(settings_frame, bg=self.lighten_bg_color)
+                setting_row.pack(fill=tk.X, pady=3)
                 
-                for file_name in file_names:
-                    file_label = tk.Label(files_frame, 
-                                        text=f"  • {file_name}",
-                                        font=('微软雅黑', 9),
-                                        bg=self.bg_color, fg='#bdc3c7')
-                    file_label.pack(anchor=tk.W)
-            
-            # Mod设置
-            settings = mod['info'].get('settings', {})
-            if settings:
-                settings_frame = tk.Frame(mod_frame, bg=self.lighten_bg_color, relief='groove', borderwidth=1)
-                settings_frame.pack(fill=tk.X, padx=15, pady=5, ipady=5, ipadx=5)
+                setting_name_label = tk.Label(setting_row, 
+                                           text=setting_key,
+                                           font=('微软雅黑', 9),
+                                           bg=self.lighten_bg_color, fg='#ecf0f1',
+                                           width=20, anchor=tk.W)
+                setting_name_label.pack(side=tk.LEFT, padx=5)
                 
-                settings_label = tk.Label(settings_frame, 
-                                        text="设置",
-                                        font=('微软雅黑', 10, 'bold'),
-                                        bg=self.lighten_bg_color, fg='white')
-                settings_label.pack(anchor=tk.W, pady=(0, 8))
-                
-                for setting_key, setting_value in settings.items():
-                    setting_row = tk.Frame(settings_frame, bg=self.lighten_bg_color)
-                    setting_row.pack(fill=tk.X, pady=3)
-                    
-                    setting_name_label = tk.Label(setting_row, 
-                                               text=setting_key,
-                                               font=('微软雅黑', 9),
-                                               bg=self.lighten_bg_color, fg='#ecf0f1',
-                                               width=20, anchor=tk.W)
-                    setting_name_label.pack(side=tk.LEFT, padx=5)
-                    
-                    if isinstance(setting_value, bool):
-                        var = tk.BooleanVar(value=setting_value)
-                        checkbox = tk.Checkbutton(setting_row, 
-                                                variable=var,
-                                                command=lambda m=mod, k=setting_key, v=var: self.on_mod_setting_change(m, k, v),
-                                                font=('Microsoft YaHei UI', 10),
-                                                bg=self.lighten_bg_color, fg='white',
-                                                selectcolor='#3498db',
-                                                activebackground=self.lighten_bg_color,
-                                                activeforeground='white')
-                        checkbox.pack(side=tk.LEFT, padx=5)
-                    else:
-                        entry = tk.Entry(setting_row, 
-                                       font=('Microsoft YaHei UI', 10),
-                                       width=30,
-                                       bg=self.bg_color, fg='white',
-                                       relief='flat', borderwidth=1)
-                        entry.insert(0, setting_value)
-                        entry.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
-                        entry.bind('<KeyRelease>', lambda e, m=mod, k=setting_key, ent=entry: self.on_mod_setting_change(m, k, ent))
-            
-            # 操作按钮
-            buttons_frame = tk.Frame(mod_frame, bg=self.bg_color)
-            buttons_frame.pack(fill=tk.X, padx=15, pady=5)
-            
-            open_folder_button = tk.Button(buttons_frame, 
-                                         text="📂 打开文件夹",
-                                         command=lambda p=mod['path']: self.open_addon_folder(p),
-                                         font=('Microsoft YaHei UI', 9),
-                                         bg='#f39c12', fg='white',
-                                         relief='flat', padx=10, pady=3)
-            open_folder_button.pack(side=tk.LEFT, padx=5)
-            
-            delete_button = tk.Button(buttons_frame, 
-                                    text="🗑️ 删除Mod",
-                                    command=lambda m=mod['name']: self.delete_mod(m),
-                                    font=('Microsoft YaHei UI', 9),
-                                    bg='#e74c3c', fg='white',
-                                    relief='flat', padx=10, pady=3)
-            delete_button.pack(side=tk.LEFT, padx=5)
+                if isinstance(setting_value, bool):
+                    var = tk.BooleanVar(value=setting_value)
+                    checkbox = tk.Checkbutton(setting_row, 
+                                            variable=var,
+                                            command=lambda m=mod, k=setting_key, v=var: self.on_mod_setting_change(m, k, v),
+                                            font=('Microsoft YaHei UI', 10),
+                                            bg=self.lighten_bg_color, fg='white',
+                                            selectcolor='#3498db',
+                                            activebackground=self.lighten_bg_color,
+                                            activeforeground='white')
+                    checkbox.pack(side=tk.LEFT, padx=5)
+                else:
+                    entry = tk.Entry(setting_row, 
+                                   font=('Microsoft YaHei UI', 10),
+                                   width=30,
+                                   bg=self.bg_color, fg='white',
+                                   relief='flat', borderwidth=1)
+                    entry.insert(0, setting_value)
+                    entry.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+                    entry.bind('<KeyRelease>', lambda e, m=mod, k=setting_key, ent=entry: self.on_mod_setting_change(m, k, ent))
+        
+        # 操作按钮
+        buttons_frame = tk.Frame(mod_frame, bg=self.bg_color)
+        buttons_frame.pack(fill=tk.X, padx=15, pady=5)
+        
+        open_folder_button = tk.Button(buttons_frame, 
+                                     text="📂 打开文件夹",
+                                     command=lambda p=mod['path']: self.open_addon_folder(p),
+                                     font=('Microsoft YaHei UI', 9),
+                                     bg='#f39c12', fg='white',
+                                     relief='flat', padx=10, pady=3)
+        open_folder_button.pack(side=tk.LEFT, padx=5)
+        
+        delete_button = tk.Button(buttons_frame, 
+                                text="🗑️ 删除Mod",
+                                command=lambda m=mod['name']: self.delete_mod(m),
+                                font=('Microsoft YaHei UI', 9),
+                                bg='#e74c3c', fg='white',
+                                relief='flat', padx=10, pady=3)
+        delete_button.pack(side=tk.LEFT, padx=5)
+        
+        return mod_frame
     
     def on_mod_setting_change(self, mod, setting_key, value_var):
         """Mod设置变更事件"""
@@ -585,52 +568,64 @@ class ModAddonManagerPage:
                 except Exception as e:
                     messagebox.showerror("错误", f"删除Mod失败: {str(e)}")
     
-    def refresh_mods_tab(self):
-        """刷新Mod标签页"""
-        # 获取Mod标签页
-        mods_tab = self.notebook.nametowidget(self.notebook.tabs()[1])
-        
-        # 清空所有子控件
-        for widget in mods_tab.winfo_children():
-            widget.destroy()
-        
-        # 重新创建滚动区域
-        canvas = tk.Canvas(mods_tab, bg=self.bg_color, highlightthickness=0)
-        scrollbar = ttk.Scrollbar(mods_tab, orient="vertical", command=canvas.yview)
-        scrollable_frame = tk.Frame(canvas, bg=self.bg_color)
-        
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
-        
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-        
-        # 绑定鼠标滚轮事件
-        def _on_mousewheel(event):
-            canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-        canvas.bind("<MouseWheel>", _on_mousewheel)
-        scrollable_frame.bind("<MouseWheel>", _on_mousewheel)
-        
-        # 显示Mod列表
-        self.show_mods(scrollable_frame)
-        
-        # 打包滚动区域
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-        
-        # 重新创建状态栏
-        status_frame = tk.Frame(mods_tab, bg=self.bg_color, height=25)
-        status_frame.pack(fill=tk.X, side=tk.BOTTOM, pady=(10, 0))
-        status_frame.pack_propagate(False)
+    def check_mod_conflicts(self):
+        """在后台检查已启用的mod之间修改了同一对象的情况"""
+        # 文件路径 -> mod名称
+        archives = {}
+        priorities = {}
+        for mod in self.scan_mods():
+            if not mod['info'].get('settings', {}).get('enable', False):
+                continue
+            for file_name in mod['info'].get('file_names', []):
+                file_path = os.path.join(mod['path'], file_name)
+                if file_name.endswith('.carra2') and os.path.isfile(file_path):
+                    archives[file_path] = mod['info'].get('name', mod['name'])
+                    priorities[os.path.basename(file_name)] = get_mod_priority(mod['info'], mod['name'])
+        
+        self.status_var.set("正在检查Mod冲突...")
+        
+        def check():
+            try:
+                conflicts = find_mod_conflicts(sort_mod_archives(list(archives), priorities),
+                                               MOD_CONFLICT_CACHE_PATH)
+            except Exception as e:
+                print(f"检查Mod冲突失败: {e}")
+                conflicts = None
+            if self.parent.winfo_exists():
+                self.parent.after(0, lambda: self.show_mod_conflicts(conflicts, archives))
+        
+        threading.Thread(target=check, daemon=True).start()
+    
+    def show_mod_conflicts(self, conflicts, archives):
+        """显示冲突报告"""
+        if conflicts is None:
+            self.status_var.set("检查Mod冲突失败")
+            messagebox.showerror("错误", "检查Mod冲突失败")
+            return
+        if not conflicts:
+            self.status_var.set("没有发现Mod冲突")
+            messagebox.showinfo("Mod冲突", "已启用的Mod之间没有冲突")
+            return
         
-        self.status_var = tk.StringVar()
-        self.status_var.set("就绪 - 双击Mod可查看详情")
-        status_label = tk.Label(status_frame, textvariable=self.status_var,
-                               font=('Microsoft YaHei UI', 9),
-                               bg=self.bg_color, fg='#95a5a6', anchor=tk.W)
-        status_label.pack(fill=tk.X, padx=10, pady=5)
+        self.status_var.set(f"发现 {len(conflicts)} 组Mod冲突")
+        lines = []
+        for conflict in conflicts[:MAX_CONFLICT_LINES]:
+            first, second = (archives[path] for path in conflict['mods'])
+            lines.append(f"• {first} 与 {second}: {len(conflict['objects'])} 个对象, "
+                         f"生效: {archives[conflict['winner']]}")
+        if len(conflicts) > MAX_CONFLICT_LINES:
+            lines.append(f"... 另有 {len(conflicts) - MAX_CONFLICT_LINES} 组")
+        messagebox.showwarning("Mod冲突",
+                               "以下Mod修改了相同的对象:\n\n" + "\n".join(lines) +
+                               "\n\n可以在 mod_info.json 中设置 priority, 优先级高的Mod生效")
+    
+    def refresh_mods_tab(self):
+        """刷新Mod标签页, 目录没有变化时直接返回"""
+        fingerprint = get_dir_fingerprint(self.mods_dir, 'mod_info.json')
+        if fingerprint == self.mods_fingerprint:
+            return
+        self.mods_fingerprint = fingerprint
+        self.mod_list.set_items(self.scan_mods())
     
     def open_addon_folder(self, path):
         """打开插件文件夹"""
@@ -649,38 +644,15 @@ class ModAddonManagerPage:
                 messagebox.showerror("错误", f"删除插件 {addon_name} 失败")
     
     def refresh_addons_tab(self):
-        """刷新插件标签页"""
-        # 清空插件标签页
-        addons_tab = self.notebook.nametowidget(self.notebook.tabs()[0])
-        for widget in addons_tab.winfo_children():
-            widget.destroy()
-        
-        # 重新创建插件标签页内容
-        # 创建滚动区域
-        canvas = tk.Canvas(addons_tab, bg=self.bg_color, highlightthickness=0)
-        scrollbar = ttk.Scrollbar(addons_tab, orient="vertical", command=canvas.yview)
-        scrollable_frame = tk.Frame(canvas, bg=self.bg_color)
-        
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
-        
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-        
-        # 绑定鼠标滚轮事件
-        def _on_mousewheel(event):
-            canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-        canvas.bind("<MouseWheel>", _on_mousewheel)
-        scrollable_frame.bind("<MouseWheel>", _on_mousewheel)
-        
-        # 显示插件列表
-        self.show_addons(scrollable_frame)
-        
-        # 打包滚动区域
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        """刷新插件标签页, 目录没有变化时直接返回"""
+        fingerprint = get_dir_fingerprint(self.addon_manager.addons_dir, 'addon_info.json')
+        if fingerprint == self.addons_fingerprint:
+            return
+        self.addons_fingerprint = fingerprint
+        
+        # 扫描插件
+        self.addon_manager.scan_addons()
+        self.addon_list.set_items(self.addon_manager.get_all_addons())
 
     def refresh_all_tabs(self):
         """刷新所有标签页"""
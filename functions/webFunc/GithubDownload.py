@@ -1,3 +1,5 @@
+import os
+import json
 import requests
 import warnings
 import time
@@ -18,6 +20,7 @@ class ReleaseAsset:
     content_type: str
     download_count: int
     proxys: 'ProxyManager'
+    digest: str = ''  # GitHub 提供的 sha256, 格式为 "sha256:<hex>"
     
     @property
     def formatted_size(self) -> str:
@@ -71,18 +74,39 @@ class ReleaseInfo:
 
 
 class ProxyManager:
-    """简化的代理管理器"""
+    """
+    简化的代理管理器
+    代理列表与每个代理的表现记录(延迟EWMA、成功率、失败退避)持久化在磁盘上,
+    列表未过期时不再请求代理API, 请求时优先使用得分最高的几个代理.
+    """
+    
+    DEFAULT_PROXY = "https://gh-proxy.org/"
+    API_URL = "https://api.akams.cn/github"
+    SCOREBOARD_PATH = "cache/proxy_scoreboard.json"
+    LIST_TTL = 24 * 3600        # 代理列表缓存时间
+    EWMA_ALPHA = 0.3            # 延迟EWMA的平滑系数
+    BACKOFF_BASE = 60           # 首次失败后的退避秒数, 之后每次连续失败翻倍
+    BACKOFF_MAX = 6 * 3600
+    UNKNOWN_LATENCY = 5.0       # 没有记录的代理按该延迟估计
     
-    def __init__(self):
+    def __init__(self, scoreboard_path: str = SCOREBOARD_PATH):
         self.proxies: List[str] = []
         self.current_index: int = 0
         self.last_successful_proxy: Optional[str] = None  # 记录上一次成功的代理
+        self.scoreboard_path = scoreboard_path
+        self.scores: Dict[str, Dict[str, float]] = {}
+        self.fetched_at: float = 0
         self._initialize_proxies()
     
     def _initialize_proxies(self):
         """初始化代理列表"""
         # 添加默认代理
-        self.proxies.append("https://gh-proxy.org/")
+        self.proxies.append(self.DEFAULT_PROXY)
+        self._load_scoreboard()
+        
+        if len(self.proxies) > 1 and time.time() - self.fetched_at < self.LIST_TTL:
+            print(f"使用缓存的代理列表, 共 {len(self.proxies)} 个代理")
+            return
         
         # 尝试从API获取代理列表
         try:
@@ -92,9 +116,8 @@ class ProxyManager:
     
     def _fetch_proxies_from_api(self):
         """从API获取代理列表"""
-        api_url = "https://api.akams.cn/github"
         try:
-            response = requests.get(api_url, timeout=5)
+            response = requests.get(self.API_URL, timeout=5)
             response.raise_for_status()
             data = response.json()
             
@@ -109,12 +132,79 @@ class ProxyManager:
                         new_proxies.append(url)
                 
                 if new_proxies:
-                    self.proxies.extend(new_proxies)
+                    self.proxies = [self.DEFAULT_PROXY] + new_proxies
+                    self.fetched_at = time.time()
+                    self._save_scoreboard()
                     print(f"成功加载 {len(new_proxies)} 个代理")
                     
         except Exception as e:
             print(f"获取代理列表失败: {e}")
     
+    def _load_scoreboard(self):
+        """读取磁盘上的代理列表与得分记录"""
+        if not os.path.exists(self.scoreboard_path):
+            return
+        try:
+            with open(self.scoreboard_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.scores = data.get("scores", {})
+            self.fetched_at = data.get("fetched_at", 0)
+            for url in data.get("proxies", []):
+                if url not in self.proxies:
+                    self.proxies.append(url)
+        except Exception as e:
+            print(f"读取代理记录失败: {e}")
+    
+    def _save_scoreboard(self):
+        """保存代理列表与得分记录"""
+        try:
+            os.makedirs(os.path.dirname(self.scoreboard_path) or '.', exist_ok=True)
+            temp_path = self.scoreboard_path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "fetched_at": self.fetched_at,
+                    "proxies": self.proxies,
+                    "scores": self.scores
+                }, f, ensure_ascii=False, indent=4)
+            os.replace(temp_path, self.scoreboard_path)
+        except Exception as e:
+            print(f"保存代理记录失败: {e}")
+    
+    def record_success(self, proxy_url: str, latency: float):
+        """记录一次成功请求及其延迟"""
+        score = self.scores.setdefault(proxy_url, {})
+        previous = score.get("latency")
+        score["latency"] = latency if previous is None else \
+            self.EWMA_ALPHA * latency + (1 - self.EWMA_ALPHA) * previous
+        score["success"] = score.get("success", 0) + 1
+        score["fail_streak"] = 0
+        self._save_scoreboard()
+    
+    def record_failure(self, proxy_url: str):
+        """记录一次失败请求, 连续失败的代理退避时间指数增长"""
+        score = self.scores.setdefault(proxy_url, {})
+        score["failure"] = score.get("failure", 0) + 1
+        score["fail_streak"] = score.get("fail_streak", 0) + 1
+        score["last_failure"] = time.time()
+        self._save_scoreboard()
+    
+    def is_backing_off(self, proxy_url: str) -> bool:
+        """代理是否仍处于失败退避期"""
+        score = self.scores.get(proxy_url, {})
+        streak = score.get("fail_streak", 0)
+        if not streak:
+            return False
+        backoff = min(self.BACKOFF_BASE * 2 ** (streak - 1), self.BACKOFF_MAX)
+        return time.time() - score.get("last_failure", 0) < backoff
+    
+    def get_score(self, proxy_url: str) -> float:
+        """代理的期望延迟, 越小越好; 用成功率修正, 失败多的代理排在后面"""
+        score = self.scores.get(proxy_url, {})
+        success = score.get("success", 0)
+        failure = score.get("failure", 0)
+        success_rate = (success + 1) / (success + failure + 2)
+        return score.get("latency", self.UNKNOWN_LATENCY) / success_rate
+    
     def set_proxy_by_url(self, proxy_url: str):
         """根据代理URL设置当前代理，并记录为成功代理"""
         if proxy_url in self.proxies:
@@ -124,10 +214,13 @@ class ProxyManager:
         return False
     
     def get_proxies(self) -> List[str]:
-        """获取优先代理列表：上一次成功代理优先，然后是其他代理"""
-        result = self.proxies[self.current_index:] + self.proxies[:self.current_index]
+        """获取优先代理列表：上一次成功代理优先，其余按得分排序，处于退避期的代理排在最后"""
+        ranked = sorted(self.proxies, key=lambda url: (self.is_backing_off(url), self.get_score(url)))
+        if self.last_successful_proxy in ranked:
+            ranked.remove(self.last_successful_proxy)
+            ranked.insert(0, self.last_successful_proxy)
         
-        return result
+        return ranked
 
 class GitHubReleaseFetcher:
     """
@@ -161,6 +254,7 @@ class GitHubReleaseFetcher:
         
         # 线程池配置
         self.max_workers = 3  # 最大并发线程数
+        self.top_k = 2  # 优先尝试的代理数
         self.request_timeout = 8  # 单个请求超时时间
         
         # 忽略SSL警告
@@ -183,52 +277,29 @@ class GitHubReleaseFetcher:
         return api_url
     
     def _request_with_proxy(self, repo_owner: str, repo_name: str, endpoint: str, 
-                          proxy_url: str, timeout: float = None) -> Optional[Dict[str, Any]]: # type: ignore
-        """使用指定代理发送请求"""
+                          proxy_url: str, timeout: float = None, **kwargs) -> Optional[Dict[str, Any]]: # type: ignore
+        """使用指定代理发送请求, 返回 (数据, 代理, 耗时)"""
         if timeout is None:
             timeout = self.request_timeout
             
         api_url = self._build_api_url(repo_owner, repo_name, endpoint, proxy_url)
+        start_time = time.time()
         
         try:
-            response = self.session.get(api_url, timeout=timeout)
+            response = self.session.get(api_url, timeout=timeout, **kwargs)
             if response.status_code == 200:
-                return response.json(), proxy_url # type: ignore
+                return response.json(), proxy_url, time.time() - start_time # type: ignore
             else:
                 print(f"代理 {proxy_url} 返回状态码: {response.status_code}")
-                return None, proxy_url # type: ignore
+                return None, proxy_url, time.time() - start_time # type: ignore
                 
         except Exception as e:
             print(f"代理 {proxy_url} 请求失败: {e}")
-            return None, proxy_url # type: ignore
+            return None, proxy_url, time.time() - start_time # type: ignore
     
-    def _make_request(self, repo_owner: str, repo_name: str, endpoint: str, **kwargs) -> Optional[Dict[str, Any]]:
-        """
-        发送请求，使用线程池有限并发尝试代理
-        
-        Returns:
-            JSON响应数据，如果失败则返回None
-        """
-        if not self.use_proxy or not self.proxy_manager:
-            # 不使用代理，直接请求
-            api_url = self._build_api_url(repo_owner, repo_name, endpoint)
-            try:
-                response = self.session.get(api_url, timeout=30, **kwargs)
-                response.raise_for_status()
-                return response.json()
-            except Exception as e:
-                print(f"直接请求失败: {e}")
-                return None
-        
-        # 使用优先代理列表
-        proxies = self.proxy_manager.get_proxies()
-        
-        if not proxies:
-            print("没有可用的代理")
-            return None
-        
-        print(f"使用线程池（最大 {self.max_workers} 个线程）尝试 {len(proxies)} 个代理...")
-        
+    def _try_proxies(self, proxies: List[str], repo_owner: str, repo_name: str,
+                     endpoint: str, **kwargs) -> Optional[Dict[str, Any]]:
+        """在线程池中并发尝试一组代理, 返回第一个成功的结果并记录每个代理的表现"""
         executor = ThreadPoolExecutor(max_workers=self.max_workers)
         
         @contextmanager
@@ -250,7 +321,7 @@ class GitHubReleaseFetcher:
             for proxy_url in proxies:
                 future = executor.submit(
                     self._request_with_proxy, 
-                    repo_owner, repo_name, endpoint, proxy_url
+                    repo_owner, repo_name, endpoint, proxy_url, **kwargs
                 )
                 future_to_proxy[future] = proxy_url
             
@@ -258,23 +329,68 @@ class GitHubReleaseFetcher:
                 # 遍历完成的任务
                 for future in as_completed(future_to_proxy):
                     try:
-                        data, used_proxy = future.result()
+                        data, used_proxy, latency = future.result()
                         
                         if data is not None:
                             # 找到可用的代理
-                            self.proxy_manager.set_proxy_by_url(used_proxy)
-                            print(f"成功使用代理: {used_proxy}")
+                            self.proxy_manager.record_success(used_proxy, latency) # type: ignore
+                            self.proxy_manager.set_proxy_by_url(used_proxy) # type: ignore
+                            print(f"成功使用代理: {used_proxy} ({latency:.2f}s)")
                             return data
+                        self.proxy_manager.record_failure(used_proxy) # type: ignore
                             
                     except Exception as e:
                         proxy_url = future_to_proxy[future]
+                        self.proxy_manager.record_failure(proxy_url) # type: ignore
                         print(f"代理 {proxy_url} 任务异常: {e}")
                         
             except TimeoutError:
                 print(f"请求超时")
         
+        return None
+    
+    def _make_request(self, repo_owner: str, repo_name: str, endpoint: str, **kwargs) -> Optional[Dict[str, Any]]:
+        """
+        发送请求，先尝试得分最高的几个代理，全部失败后再用线程池有限并发尝试其余代理
+        
+        Returns:
+            JSON响应数据，如果失败则返回None
+        """
+        if not self.use_proxy or not self.proxy_manager:
+            # 不使用代理，直接请求
+            api_url = self._build_api_url(repo_owner, repo_name, endpoint)
+            try:
+                response = self.session.get(api_url, timeout=30, **kwargs)
+                response.raise_for_status()
+                return response.json()
+            except Exception as e:
+                print(f"直接请求失败: {e}")
+                return None
+        
+        # 使用优先代理列表
+        proxies = self.proxy_manager.get_proxies()
+        
+        if not proxies:
+            print("没有可用的代理")
+            return None
+        
+        top_proxies, rest_proxies = proxies[:self.top_k], proxies[self.top_k:]
+        # 处于退避期的代理只在没有其他选择时才尝试
+        rest_proxies = [url for url in rest_proxies if not self.proxy_manager.is_backing_off(url)] or rest_proxies
+        print(f"优先尝试 {len(top_proxies)} 个代理: {', '.join(top_proxies)}")
+        data = self._try_proxies(top_proxies, repo_owner, repo_name, endpoint, **kwargs)
+        if data is not None:
+            return data
+        
+        if rest_proxies:
+            print(f"使用线程池（最大 {self.max_workers} 个线程）尝试其余 {len(rest_proxies)} 个代理...")
+            data = self._try_proxies(rest_proxies, repo_owner, repo_name, endpoint, **kwargs)
+            if data is not None:
+                return data
+        
         print("所有代理尝试均失败")
-        return None    
+        return None
+    
     def get_latest_release(self, repo_owner: str, repo_name: str) -> Optional[ReleaseInfo]:
         """
         获取最新release的完整信息
@@ -414,7 +530,8 @@ class GitHubReleaseFetcher:
                 download_url=true_download_url,
                 content_type=asset.get('content_type', 'application/octet-stream'),
                 download_count=asset.get('download_count', 0),
-                proxys=proxys # type: ignore
+                proxys=proxys, # type: ignore
+                digest=asset.get('digest') or ''
             ))
         
         # 创建ReleaseInfo对象
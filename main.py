@@ -1,28 +1,40 @@
+import sys
+
+# 启动性能分析需要在导入其他模块之前开始, 参数去掉后不影响命令行模式的判断
+PROFILE_STARTUP = '--profile-startup' in sys.argv
+if PROFILE_STARTUP:
+    sys.argv.remove('--profile-startup')
+    from functions.base.startup_profile import enable_startup_profile
+    enable_startup_profile()
+
 import tkinter as tk
 from tkinter import ttk, font, messagebox
 import os
+import re
+import time
+import queue
 import random
-import sys
-import json
-from PIL import Image, ImageTk, ImageFilter
-import pymysql
 import threading
+import importlib
 from subprocess import Popen
-from functions.pages.settings_page import init_settings_page
 from functions.base.settings_manager import get_settings_manager
 from functions.pages.loading_info import create_simple_splash
+from functions.base.startup import StartupOrchestrator
+from functions.base.startup_profile import get_startup_profiler, profile_step
 from functions.base.window_ulits import center_window
-from functions.dowloads.sql_manager import check_new_version, notify_new_version
 from functions.base.sound_ulits import play_sound
 from functions.addon.addon_ulit import AddonManager
 
-# 添加自定义汉化工具导入
-try:
-    sys.path.append('functions')
-    from functions.pages.custom_translation import open_custom_translation_tool
-except ImportError as e:
-    print(f"导入自定义汉化工具失败: {e}")
-    open_custom_translation_tool = None
+sys.path.append('functions')
+
+# PIL、pymysql、requests 以及各页面模块在用到时才导入, 不拖慢启动
+def check_new_version(current_version_name):
+    from functions.dowloads.sql_manager import check_new_version
+    return check_new_version(current_version_name)
+
+def notify_new_version(*args, **kwargs):
+    from functions.dowloads.sql_manager import notify_new_version
+    return notify_new_version(*args, **kwargs)
 
 dowloading = False
 root: tk.Tk = None # type: ignore
@@ -32,123 +44,139 @@ config_path = settings_manager.get_setting("game_path")
 bg_color:str = settings_manager.get_setting("bg_color") # type: ignore
 VERSION_INFO:str = settings_manager.get_setting("version_info") # type: ignore
 
+# 终端最多保留的行数, 超出时删除最早的内容
+TERMINAL_MAX_LINES = 5000
+# 终端从队列取出消息并显示的间隔(毫秒)
+TERMINAL_FLUSH_INTERVAL = 50
+
+# 根据关键字给消息添加表情符号, 按顺序匹配第一个
+TERMINAL_EMOJI_RULES = [(emoji, re.compile('|'.join(map(re.escape, keywords)))) for emoji, keywords in (
+    ("🚀", ["启动"]),
+    ("💡", ["提示", "提示信息"]),
+    ("⚠️", ["警告", "不存在", "warning"]),
+    ("❌", ["错误", "失败", "异常"]),
+    ("✅", ["成功", "完成", "已经"]),
+    ("🔄", ["正在", "加载中", "更新中"]),
+    ("📦", ["安装", "下载", "解压"]),
+)]
+
+# 根据表情符号确定消息级别(文本颜色)
+TERMINAL_LEVEL_RULES = [(level, re.compile('|'.join(map(re.escape, marks)))) for level, marks in (
+    ("error", ["❌"]),
+    ("success", ["✅"]),
+    ("warning", ["⚠️"]),
+    ("wait", ["🔄", "📦"]),
+)]
+
 class TerminalRedirector:
-    """重定向print输出到文本组件的类"""
+    """
+    重定向print输出到文本组件的类
+    任何线程的输出都只放入队列, 由 Tk 线程定时批量取出显示, 终端只保留最近的 TERMINAL_MAX_LINES 行
+    """
     def __init__(self, text_widget):
         self.text_widget = text_widget
         self.original_stdout = sys.stdout
         self.original_stderr = sys.stderr
         self.buffer = ""  # 缓冲区用于处理部分消息
+        self.lock = threading.Lock()
+        # (时间戳, 消息) 等待显示
+        self.pending = queue.Queue()
+        self.running = False
     
     def write(self, message):
-        """重定向write方法"""
+        """重定向write方法, 可以在任意线程调用"""
         if message:
-            # 添加到缓冲区
-            self.buffer += message
-            
-            # 如果缓冲区以换行符结尾，处理完整消息
-            if self.buffer.endswith('\n'):
+            with self.lock:
+                # 添加到缓冲区
+                self.buffer += message
+                
+                # 如果缓冲区以换行符结尾，处理完整消息
+                if not self.buffer.endswith('\n'):
+                    return
                 # 移除结尾的换行符
                 full_message = self.buffer.rstrip('\n')
-                if full_message:  # 只处理非空消息
-                    self._add_message_to_terminal(full_message)
                 # 清空缓冲区
                 self.buffer = ""
+            if full_message:  # 只处理非空消息
+                self._add_message_to_terminal(full_message)
     
     def _add_message_to_terminal(self, message):
-        """添加格式化消息到终端"""
-        message = self.process_message(message)
+        """把消息放入队列, 由 Tk 线程显示"""
+        if '\r' in message:
+            return
+        self.pending.put((time.strftime("%H:%M:%S"), message))
 
-        try:
-            if '\r' in message:
+    def drain(self):
+        """在 Tk 线程中取出队列中的所有消息, 一次性插入文本组件"""
+        if not self.running:
+            return
+
+        batch = []
+        while True:
+            try:
+                batch.append(self.pending.get_nowait())
+            except queue.Empty:
+                break
+        # 超出保留行数的消息不必插入
+        batch = batch[-TERMINAL_MAX_LINES:]
+
+        if batch:
+            try:
+                self.insert_batch(batch)
+            except tk.TclError:
+                # 窗口已经关闭
+                self.running = False
                 return
-            self.text_widget.config(state=tk.NORMAL)
-            
-            # 添加时间戳
-            import datetime
-            timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+
+        self.text_widget.after(TERMINAL_FLUSH_INTERVAL, self.drain)
+
+    def insert_batch(self, batch):
+        chunks = []
+        for timestamp, message in batch:
+            message = self.process_message(message)
             
             # 根据消息内容确定级别
-            level = "info"
-            if "❌" in message:
-                level = "error"
-            elif "✅" in message:
-                level = "success"
-            elif "⚠️" in message:
-                level = "warning"
-            elif ("🔄" in message) or ("📦" in message):
-                level = "wait"
+            level = next((level for level, pattern in TERMINAL_LEVEL_RULES if pattern.search(message)), "info")
             
-            # 插入带时间戳和颜色的消息
+            # 带时间戳和颜色的消息
             timestamp_str = f'[{timestamp}]' if '[INFO]' not in message else ''
-            self.text_widget.insert(tk.END, timestamp_str, "info")
-            self.text_widget.insert(tk.END, message + "\n", level)
-            
-            # 自动滚动到底部
-            self.text_widget.see(tk.END)
-            
-            # 禁用文本编辑
-            self.text_widget.config(state=tk.DISABLED)
-            
-            # 立即更新显示
-            self.text_widget.update_idletasks()
+            chunks += [timestamp_str, "info", message + "\n", level]
+
+        self.text_widget.config(state=tk.NORMAL)
+        self.text_widget.insert(tk.END, *chunks)
         
-        except:
-            pass
+        # 删除超出保留行数的旧内容, 最后一行是换行后的空行
+        line_count = int(self.text_widget.index('end-1c').split('.')[0]) - 1
+        if line_count > TERMINAL_MAX_LINES:
+            self.text_widget.delete('1.0', f'{line_count - TERMINAL_MAX_LINES + 1}.0')
+        
+        # 自动滚动到底部
+        self.text_widget.see(tk.END)
+        
+        # 禁用文本编辑
+        self.text_widget.config(state=tk.DISABLED)
 
     @staticmethod
     def process_message(message:str) -> str: # type: ignore
         """根据消息内容添加表情符号"""
-        emoji_dict = {
-            "🚀": [
-                "启动"
-            ],
-            "💡": [
-                "提示",
-                "提示信息",
-            ],
-            "⚠️": [
-                "警告",
-                "不存在",
-                "warning",
-            ],
-            "❌": [
-                "错误",
-                "失败",
-                "异常"
-            ],
-            "✅": [
-                "成功",
-                "完成",
-                "已经"
-            ],
-            "🔄": [
-                "正在",
-                "加载中",
-                "更新中"
-            ],
-            "📦": [
-                "安装",
-                "下载",
-                "解压"
-            ],
-        }
-        # 遍历字典，检查消息中是否包含关键字
-        for emoji, keywords in emoji_dict.items():
-            for keyword in keywords:
-                if keyword in message:
-                    return f"{emoji} {message}"
+        for emoji, pattern in TERMINAL_EMOJI_RULES:
+            if pattern.search(message):
+                return f"{emoji} {message}"
         return message
         
     def flush(self):
         """重定向flush方法"""
         # 处理缓冲区中剩余的消息
-        if self.buffer:
-            self._add_message_to_terminal(self.buffer)
-            self.buffer = ""
+        with self.lock:
+            message, self.buffer = self.buffer, ""
+        if message:
+            self._add_message_to_terminal(message)
     
     def start_redirect(self):
-        """开始重定向"""
+        """开始重定向, 需要在 Tk 线程调用"""
+        if not self.running:
+            self.running = True
+            self.drain()
         if not debug:
             sys.stdout = self
             sys.stderr = self
@@ -161,7 +189,7 @@ class TerminalRedirector:
         sys.stderr = self.original_stderr
 
 class FaustLauncherApp:
-    def __init__(self, root: tk.Tk, on_initialized=None):
+    def __init__(self, root: tk.Tk, on_initialized=None, splash=None):
         global bg_color
 
         self.root = root
@@ -183,7 +211,7 @@ class FaustLauncherApp:
         self.current_bg_index = 0
         self.current_bg_image = None
         self.current_blurred_bg = None
-        self.load_background_images()
+        self.rotate_job = None
         self.bg_color = bg_color
         self.lighten_bg_color = self.lighten_color(self.bg_color, 5)
         
@@ -212,14 +240,23 @@ class FaustLauncherApp:
         self.about_frame = tk.Frame(self.notebook, bg=self.bg_color)
         self.settings_frame = tk.Frame(self.notebook, bg=self.bg_color)
         
-        # 添加页面到分页控件
+        # 添加页面到分页控件, 主页以外的页面在第一次切换到时才创建
+        self.pages = {}
+        self.settings_page = None
+        self.mod_addon_page = None
+        self.download_center_page = None
         self.notebook.add(self.home_frame, text="🏘 主页")
-        self.notebook.add(self.features_frame, text="✈ 快捷方式")
-        self.notebook.add(self.tools_frame, text="🔨 工具页")
-        self.notebook.add(self.mod_addon_frame, text="🧩 插件&Mod")
-        self.notebook.add(self.download_center_frame, text="📦 下载中心")  # 新增下载中心标签页
-        self.notebook.add(self.settings_frame, text="⚙️ 设置")
-        self.notebook.add(self.about_frame, text="💻 关于")
+        self.register_page(self.features_frame, "✈ 快捷方式", self.init_features_page)
+        self.register_page(self.tools_frame, "🔨 工具页", self.init_tools_page,
+                           ['functions.fancy.dialog_colorful', 'functions.pages.select_font',
+                            'functions.translate.auto_translate_gui'])
+        self.register_page(self.mod_addon_frame, "🧩 插件&Mod", self.init_mod_addon_page,
+                           ['functions.pages.mod_addon_info'])
+        self.register_page(self.download_center_frame, "📦 下载中心", self.init_download_center_page,
+                           ['functions.pages.download_center'])  # 新增下载中心标签页
+        self.register_page(self.settings_frame, "⚙️ 设置", self.init_settings_page,
+                           ['functions.pages.settings_page'])
+        self.register_page(self.about_frame, "💻 关于", self.init_about_page)
         
         # 绑定分页切换事件
         self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
@@ -233,32 +270,91 @@ class FaustLauncherApp:
         root.protocol("WM_DELETE_WINDOW", check_close)
 
         # 设置样式
-        self.set_styles()
+        with profile_step('FaustLauncherApp.set_styles'):
+            self.set_styles()
 
-        # 初始化各页面
-        self.init_home_page()
-        self.init_features_page()
-        self.init_tools_page()  # 工具页初始化
-        self.init_mod_addon_page()  # 插件&mod管理页初始化
-        self.init_download_center_page()  # 下载中心页面初始化
-        self.init_settings_page()
-        self.init_about_page()
-        self.init_tray()
-        
-        # 启动背景轮换
-        self.start_background_rotation()
-        
-        # 设置终端重定向
-        self.setup_terminal_redirect()
-        
         # 保存初始化完成回调
         self.on_initialized = on_initialized
-        
-        # 延迟调用初始化完成回调，确保界面完全渲染
-        self.root.after(500, self._notify_initialized)
+        self.addon_items = []
+        self.addon_manager: AddonManager = None # type: ignore
+
+        # 按依赖关系调度启动任务, 关键任务完成后立即显示主窗口
+        self.startup = StartupOrchestrator(self.root,
+                                           on_progress=splash.update_status if splash else None,
+                                           on_ready=self._notify_initialized)
+        self.add_startup_tasks()
+        self.startup.run()
+
+    def add_startup_tasks(self):
+        """声明启动任务, I/O 任务在线程池中并发运行, 界面任务在 Tk 线程中运行"""
+        add = self.startup.add
+
+        # 后台任务
+        add('background_scan', self.load_background_images, text="读取背景图片...")
+        add('background_prepare', lambda: self.prepare_background_image(800, 700),
+            deps=['background_scan'], text="处理背景图片...")
+        add('addon_scan', lambda: AddonManager(self.addon_items), critical=False, text="扫描插件...")
+        add('version_check', lambda: check_new_version(VERSION_INFO), critical=False,
+            text="浮士德正在检查梅菲斯特的动向...")
+
+        # 界面任务, 其他页面在第一次切换到时创建
+        add('home', self.init_home_page, ui=True, text="准备经理面板界面组件...")
+        add('terminal', self.setup_terminal_redirect, deps=['home'], ui=True, text="启用终端重定向...")
+        add('background', lambda: self.show_background_image(self.startup.result('background_prepare')),
+            deps=['background_prepare'], ui=True, text="显示背景图片...")
+
+        # 插件可能操作界面, 在 Tk 线程中运行; 托盘菜单需要等插件注册完菜单项
+        add('addon_run', self.run_addons, deps=['addon_scan'], ui=True, critical=False, text="载入插件...")
+        add('tray', self.init_tray, deps=['addon_run'], critical=False, text="初始化托盘...")
+
+    def register_page(self, frame, text, builder, modules=()):
+        """
+        注册一个延迟创建的页面
+        
+        Args:
+            frame: 页面所在的标签页框架
+            text: 标签页标题
+            builder: 创建页面内容的方法
+            modules: 页面用到的模块, 主界面显示后在后台预先导入
+        """
+        self.notebook.add(frame, text=text)
+        self.pages[str(frame)] = {'builder': builder, 'modules': list(modules), 'built': False}
+
+    def ensure_page(self, frame) -> bool:
+        """页面尚未创建时立即创建, 返回是否是本次创建的"""
+        page = self.pages.get(str(frame))
+        if not page or page['built']:
+            return False
+        page['built'] = True
+        page['builder']()
+        return True
+
+    def preload_page_modules(self):
+        """在后台导入各页面用到的模块, 第一次切换页面时不再等待导入"""
+        def worker():
+            for page in self.pages.values():
+                for module in page['modules']:
+                    try:
+                        importlib.import_module(module)
+                    except Exception as e:
+                        print(f"预先导入 {module} 失败: {e}")
+        threading.Thread(target=worker, daemon=True).start()
+
+    def run_addons(self):
+        """运行扫描到的插件"""
+        self.addon_manager = self.startup.result('addon_scan')
+        self.addon_manager.run_all_addon()
+
+    def quit_app(self):
+        """托盘退出: os._exit 会跳过 atexit, 先写回未写回的下载次数"""
+        web_trigger = sys.modules.get('functions.base.web_trigger')
+        if web_trigger:
+            web_trigger.flush_pending_download_counts()
+        os._exit(0)
 
     def init_tray(self):
         """初始化托盘程序"""
+        from PIL import Image
         ico = Image.open("assets/images/icon/icon.ico")
         import pystray, threading
 
@@ -267,15 +363,10 @@ class FaustLauncherApp:
             pystray.MenuItem('隐藏', self.root.withdraw),
         ]
 
-        addon_items = []
-
-        self.addon_manager = AddonManager(addon_items)
-        self.addon_manager.run_all_addon()
-
-        addon_menu = pystray.Menu(*addon_items)
+        addon_menu = pystray.Menu(*self.addon_items)
         root_menu = pystray.MenuItem("插件", action=addon_menu)
         menu_items.append(root_menu)
-        menu_items.append(pystray.MenuItem('退出', lambda:os._exit(0)))
+        menu_items.append(pystray.MenuItem('退出', self.quit_app))
 
         menu = pystray.Menu(*menu_items)
         self.tray = pystray.Icon(
@@ -292,15 +383,18 @@ class FaustLauncherApp:
         """通知应用程序初始化完成"""
         # 确保界面已经完全渲染
         self.root.update_idletasks()
-        self.root.update()
         
         # 调用初始化完成回调
         if self.on_initialized:
             self.on_initialized()
+
+        # 空闲时预先导入其他页面的模块
+        self.root.after(1000, self.preload_page_modules)
     
     def init_settings_page(self):
         """初始化设置页面"""
         try:
+            from functions.pages.settings_page import init_settings_page
             self.settings_page = init_settings_page(self.settings_frame, self.bg_color, self.lighten_bg_color)
         except Exception as e:
             print(f"初始化设置页面失败: {e}")
@@ -440,6 +534,12 @@ class FaustLauncherApp:
 
     def open_custom_translation_tool(self):
         """打开自定义汉化工具"""
+        try:
+            from functions.pages.custom_translation import open_custom_translation_tool
+        except ImportError as e:
+            print(f"导入自定义汉化工具失败: {e}")
+            open_custom_translation_tool = None
+
         if open_custom_translation_tool:
             try:
                 open_custom_translation_tool(self)
@@ -470,10 +570,12 @@ class FaustLauncherApp:
         """标签页切换时的动画效果"""
         # play_sound("assets/voices/click.wav")
 
-        # 获取当前选中的标签页
-        current_tab = self.notebook.index(self.notebook.select())
+        # 获取当前选中的标签页, 第一次切换到时创建页面
+        current_tab = self.notebook.select()
+        if self.ensure_page(current_tab):
+            return
 
-        if current_tab == 3:
+        if current_tab == str(self.mod_addon_frame) and self.mod_addon_page:
             print("切换到插件&Mod管理页，正在刷新数据...")
             self.mod_addon_page.refresh_all_tabs()
 
@@ -492,66 +594,79 @@ class FaustLauncherApp:
         else:
             print(f"找到 {len(self.background_images)} 张背景图片")
     
+    def prepare_background_image(self, width, height):
+        """随机选择背景图片并缩放、模糊, 不涉及界面, 可以在后台线程调用"""
+        if not self.background_images:
+            return None
+        try:
+            from PIL import Image, ImageFilter
+
+            # 随机选择一张图片
+            bg_path = random.choice(self.background_images)
+            # print(f"加载背景图片: {bg_path}")
+            
+            # 打开图片
+            image = Image.open(bg_path)
+            
+            # 计算缩放比例，保持图片比例
+            img_width, img_height = image.size
+            width_ratio = width / img_width
+            height_ratio = height / img_height
+            scale_ratio = max(width_ratio, height_ratio)  # 确保图片覆盖整个窗口
+            
+            # 计算缩放后的尺寸
+            new_width = int(img_width * scale_ratio)
+            new_height = int(img_height * scale_ratio)
+            
+            # 缩放图片
+            image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+            
+            # 应用高斯模糊效果, 并计算居中位置
+            blurred_image = image.filter(ImageFilter.GaussianBlur(radius=5))
+            return blurred_image, (width - new_width) // 2, (height - new_height) // 2
+        except Exception as e:
+            print(f"加载背景图片失败: {e}")
+            return None
+
+    def show_background_image(self, prepared):
+        """在Canvas上显示处理好的背景图片, 没有图片时使用默认背景颜色"""
+        if not prepared:
+            self.bg_canvas.configure(bg=bg_color)
+            return
+        
+        blurred_image, x_position, y_position = prepared
+        from PIL import ImageTk
+        
+        # 转换为PhotoImage
+        bg_image = ImageTk.PhotoImage(blurred_image)
+        
+        # 保存图片引用
+        self.current_bg_image = bg_image
+        
+        # 清除Canvas上的旧图片
+        self.bg_canvas.delete("all")
+        
+        # 在Canvas上居中显示模糊背景图片
+        self.bg_canvas.create_image(x_position, y_position, 
+                                  anchor=tk.NW, 
+                                  image=bg_image,
+                                  tags="background")
+        
+        # 每30秒更换一次背景
+        if self.rotate_job is None:
+            self.rotate_job = self.root.after(30000, self.rotate_background)
+    
     def set_background_image(self):
         """设置背景图片 - 居中显示，并添加模糊效果"""
-        if self.background_images:
-            try:
-                # 随机选择一张图片
-                bg_path = random.choice(self.background_images)
-                # print(f"加载背景图片: {bg_path}")
-                
-                # 打开图片
-                image = Image.open(bg_path)
-                
-                # 获取窗口大小
-                width = self.root.winfo_width() or 900
-                height = self.root.winfo_height() or 700
-                
-                # 确保图片大小合理
-                if width < 100: width = 900
-                if height < 100: height = 700
-                
-                # 计算缩放比例，保持图片比例
-                img_width, img_height = image.size
-                width_ratio = width / img_width
-                height_ratio = height / img_height
-                scale_ratio = max(width_ratio, height_ratio)  # 确保图片覆盖整个窗口
-                
-                # 计算缩放后的尺寸
-                new_width = int(img_width * scale_ratio)
-                new_height = int(img_height * scale_ratio)
-                
-                # 缩放图片
-                image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-                
-                # 应用高斯模糊效果
-                blurred_image = image.filter(ImageFilter.GaussianBlur(radius=5))
-                
-                # 转换为PhotoImage
-                bg_image = ImageTk.PhotoImage(blurred_image)
-                
-                # 保存图片引用
-                self.current_bg_image = bg_image
-                
-                # 清除Canvas上的旧图片
-                self.bg_canvas.delete("all")
-                
-                # 计算居中位置
-                x_position = (width - new_width) // 2
-                y_position = (height - new_height) // 2
-                
-                # 在Canvas上居中显示模糊背景图片
-                self.bg_canvas.create_image(x_position, y_position, 
-                                          anchor=tk.NW, 
-                                          image=bg_image,
-                                          tags="background")
-            except Exception as e:
-                print(f"加载背景图片失败: {e}")
-                # 使用默认背景颜色
-                self.bg_canvas.configure(bg=bg_color)
-        else:
-            # 使用默认背景颜色
-            self.bg_canvas.configure(bg=bg_color)
+        # 获取窗口大小
+        width = self.root.winfo_width() or 900
+        height = self.root.winfo_height() or 700
+        
+        # 确保图片大小合理
+        if width < 100: width = 900
+        if height < 100: height = 700
+        
+        self.show_background_image(self.prepare_background_image(width, height))
     
     def start_background_rotation(self):
         """开始背景轮换"""
@@ -560,9 +675,8 @@ class FaustLauncherApp:
     
     def rotate_background(self):
         """轮换背景图片"""
+        self.rotate_job = None
         self.set_background_image()
-        # 每30秒更换一次背景
-        self.root.after(30000, self.rotate_background)
 
     def set_styles(self):
         """设置应用程序的样式"""
@@ -1009,7 +1123,8 @@ class FaustLauncherApp:
             if file_path:
                 settings_manager.set_setting("game_path", file_path.replace('LimbusCompany.exe', ''))
                 settings_manager.save_settings()
-                self.settings_page.refresh_all_displays()
+                if self.settings_page:
+                    self.settings_page.refresh_all_displays()
 
                 has_update, latest_info = check_new_version(version_info)
                 notify_new_version(latest_info, '当前为最新版本', self.root)
@@ -1018,14 +1133,8 @@ class FaustLauncherApp:
                 print("错误: 未选择游戏文件")
                 os._exit(-1)
 
-        # 或者单独检测
-        has_update, latest_info = check_new_version(version_info)
-        if has_update:
-            print(f"启动器的新版本已经发布: {latest_info['version_name']}") # type: ignore
-            notify_new_version(latest_info, root = self.root)
-
-        else:
-            print("当前启动器已是最新版本")
+        # 新版本检测在启动时已于后台进行, 完成后再提示
+        self.startup.when_done('version_check', self.report_new_version)
 
         # 检查是否有命令行参数
         if len(sys.argv) > 1 or not os.path.exists("lang/LLC_zh-CN"):
@@ -1036,7 +1145,15 @@ class FaustLauncherApp:
         if not os.path.exists("assets/Font/Context/ChineseFont.ttf"):
             print("错误: 未找到字体文件 Font/Context/ChineseFont.ttf\n请尝试手动添加或者使用汉化更新修复")
 
-        self.root.after(1000, self.start_background_rotation)
+    def report_new_version(self, task):
+        """提示后台检测到的新版本"""
+        has_update, latest_info = task.result or (False, None)
+        if has_update:
+            print(f"启动器的新版本已经发布: {latest_info['version_name']}") # type: ignore
+            notify_new_version(latest_info, root = self.root)
+
+        else:
+            print("当前启动器已是最新版本")
         
     def folder_link(self):
         # 先要求用户分别选择两个路径，然后根据其生成文件夹超链接指令，然后以管理员身份执行
@@ -1141,14 +1258,15 @@ def handle_dowload(obj = None, need_run_game=False):
         from functions.dowloads.dow_ulits import check_need_up_translate
         need_update = check_need_up_translate()
 
-        # 把 'lang\LimbusCompany_Data\Lang\LLC_zh-CN' 复制到游戏目录下的 'lang' 文件夹 并删除 LimbusCompany_Data 文件夹
+        # 把 'lang\LimbusCompany_Data\Lang\LLC_zh-CN' 移动到游戏目录下的 'lang' 文件夹 并删除 LimbusCompany_Data 文件夹
         import shutil
+        from functions.dowloads.dow_ulits import move_tree
 
         if need_update:
             print("检测到新的汉化版本，准备更新汉化文件...")
             if os.path.exists(dowload_path + '/LimbusCompany_Data/Lang/LLC_zh-CN'): # type: ignore
-                shutil.copytree(dowload_path + '/LimbusCompany_Data/Lang/LLC_zh-CN', lang_path, dirs_exist_ok=True) # type: ignore
-                print("文件夹复制完成")
+                move_tree(dowload_path + '/LimbusCompany_Data/Lang/LLC_zh-CN', lang_path) # type: ignore
+                print("文件夹移动完成")
             else:
                 print("错误: 未找到 lang 下的 LLC_zh-CN 文件夹")
         else:
@@ -1186,79 +1304,29 @@ def handle_dowload(obj = None, need_run_game=False):
 
 def run_game(obj:None):
     global config_path, settings_manager
-    # 复制 lang 下的 LLC_zh-CN 文件夹到游戏目录下的 LimbusCompany_Data/Lang 文件夹 下
+    # 构建 lang 下的 LLC_zh-CN 文件夹到游戏目录下的 LimbusCompany_Data/Lang 文件夹 下
     import shutil
-    # 尝试删除原有的 LimbusCompany_Data/Lang/LLC_zh-CN 文件夹
-    if os.path.exists(os.path.join(config_path, 'LimbusCompany_Data/Lang/LLC_zh-CN')): # type: ignore
-        print("删除原有的 LimbusCompany_Data/Lang/LLC_zh-CN 文件夹")
-        shutil.rmtree(os.path.join(config_path, 'LimbusCompany_Data/Lang/LLC_zh-CN'), ignore_errors=True) # type: ignore
+    from functions.base.lang_builder import create_lang_builder, copy_if_changed
 
-    print(f"开始复制 lang 下的 LLC_zh-CN 文件夹到游戏目录下的 {config_path}")
-    try:
-        shutil.copytree('lang/LLC_zh-CN', os.path.join(config_path, 'LimbusCompany_Data/Lang/LLC_zh-CN'), dirs_exist_ok=True) # type: ignore
-        print("汉化复制完成")
-    except Exception as e:
-        print(f"效用汉化复制文件夹时出错: {e}")
-        return
+    target_path = os.path.join(config_path, 'LimbusCompany_Data/Lang/LLC_zh-CN') # type: ignore
 
-    # 根据 lang/changes.json 更新 LimbusCompany_Data/Lang/LLC_zh-CN 里的数据
-    print("开始应用自定义汉化修改...")
+    # 自定义汉化修改与各项美化在内存中一次性完成, 每个文件只读写一次
+    # 构建清单记录了每个文件的输入哈希, 未改变的文件不会重新生成
+    print(f"开始构建汉化到游戏目录下的 {config_path}")
     try:
-        # 检查changes.json文件是否存在
-        changes_file = "lang/changes.json"
-        if os.path.exists(changes_file):
-            # 加载changes.json
-            with open(changes_file, 'r', encoding='utf-8') as f:
-                changes_data = json.load(f)
-            
-            if changes_data:
-                print(f"找到 {len(changes_data)} 个文件的修改记录")
-                
-                # 遍历changes.json中的每个文件修改记录
-                for relative_path, file_changes in changes_data.items():
-                    # 构建完整的文件路径
-                    lang_file_path = os.path.join("lang", relative_path)
-                    game_file_path = os.path.join(config_path, "LimbusCompany_Data", "Lang", relative_path) # type: ignore
-                    
-                    # 检查游戏目录中的文件是否存在
-                    if os.path.exists(game_file_path):
-                        print(f"应用修改到: {relative_path}")
-                        
-                        # 读取游戏目录中的原始文件
-                        with open(game_file_path, 'r', encoding='utf-8') as f:
-                            original_data = json.load(f)
-                        
-                        # 应用修改
-                        modified_data = apply_changes_to_data(original_data, file_changes)
-                        
-                        # 保存修改后的文件
-                        with open(game_file_path, 'w', encoding='utf-8') as f:
-                            json.dump(modified_data, f, ensure_ascii=False, indent=4)
-                        
-                        print(f"文件 {relative_path} 修改已应用")
-                    else:
-                        print(f"警告: 游戏目录中未找到文件 {relative_path}")
-            else:
-                print("没有自定义汉化修改需要应用")
-        else:
-            print("没有找到changes.json文件，跳过自定义汉化修改")
+        builder = create_lang_builder(settings_manager, 'lang/LLC_zh-CN', target_path)
+        if not builder.build():
+            return
     except Exception as e:
-        print(f"应用自定义汉化修改时出错: {e}")
-    
-    # 气泡渐变色处理
-    if settings_manager.get_setting('enable_text_gradient'):
-        from functions.fancy.dialog_colorful import main as handle_colorful
-        handle_colorful()
-        print("气泡渐变色处理完成")
+        print(f"应用美化功能时出错: {e}")
+        from tkinter import messagebox
+        messagebox.showerror("错误", f"应用美化功能时出错: {str(e)}\n可能是汉化包不完整导致的...\n请尝试使用汉化更新修复.")
+        return
 
     # 复制字体文件夹到汉化目录下
     print("开始复制字体文件夹到汉化目录下...")
     try:
-        if os.path.exists(config_path + 'LimbusCompany_Data/Lang/LLC_zh-CN/Font'): # type: ignore
-            # 创建Font文件夹
-            os.makedirs(config_path + 'LimbusCompany_Data/Lang/LLC_zh-CN/Font', exist_ok=True) # type: ignore
-
-        shutil.copytree('assets/Font', config_path + 'LimbusCompany_Data/Lang/LLC_zh-CN/Font', dirs_exist_ok=True) # type: ignore
+        shutil.copytree('assets/Font', config_path + 'LimbusCompany_Data/Lang/LLC_zh-CN/Font', dirs_exist_ok=True, copy_function=copy_if_changed) # type: ignore
         print("字体文件夹复制完成")
     except Exception as e:
         print(f"复制字体文件夹时出错: {e}")
@@ -1267,169 +1335,65 @@ def run_game(obj:None):
     from functions.dowloads.zeroasso_dow import create_config_file
     create_config_file(settings_manager.get_setting('game_path'))
 
-    try:
-        # 是否设置用户名称
-        if settings_manager.get_setting('enable_show_user_name'):
-            set_user_name()
-
-        # 是否进行 EGO 样式美化
-        if settings_manager.get_setting('enable_ego_style'):
-            from functions.fancy.EGO_colorful import main as apply_ego_style
-            apply_ego_style()
-
-        # 技能描述美化
-        if settings_manager.get_setting('enable_skill_style'):
-            from functions.fancy.skill_info import handle_skill
-            handle_skill(config_path + 'LimbusCompany_Data/Lang/LLC_zh-CN/') # type: ignore
-
-        if settings_manager.get_setting('enable_speical_tip'):
-            from functions.fancy.hint_set import simple_replace
-            simple_replace(config_path + 'LimbusCompany_Data/Lang/LLC_zh-CN/BattleHint.json') # type: ignore
-
-    except Exception as e:
-        print(f"应用美化功能时出错: {e}")
-        from tkinter import messagebox
-        messagebox.showerror("错误", f"应用美化功能时出错: {str(e)}\n可能是汉化包不完整导致的...\n请尝试使用汉化更新修复.")
-
-    print("运行插件注册的启动事件...")
-    threading.Thread(target=obj.addon_manager.run_game_start_event).start() # type: ignore
+    # 插件在后台载入, 尚未载入完成时没有启动事件
+    if obj.addon_manager: # type: ignore
+        print("运行插件注册的启动事件...")
+        threading.Thread(target=obj.addon_manager.run_game_start_event).start() # type: ignore
 
     # 载入mod并启动游戏
     from functions.base.load_mod import main as load_mod_and_launch
     load_mod_and_launch(config_path + 'LimbusCompany.exe') # type: ignore
 
-def set_user_name():
-    """设置用户名称到 UserInfo_Friends.json 中"""
-    global settings_manager, config_path
-    user_name = settings_manager.get_setting('user_name')
-    from json import dump, load
-    datalist = load(open(f'{config_path}LimbusCompany_Data/Lang/LLC_zh-CN/UserInfo_Friends.json','r',encoding='utf-8'))
-    for data in datalist['dataList']:
-        if data['id'] == 'Uid_Copy':
-            data['content'] = f'{user_name}'
-    dump(datalist, indent=4, fp=open(f'{config_path}LimbusCompany_Data/Lang/LLC_zh-CN/UserInfo_Friends.json','w',encoding='utf-8'))
-
-# 应用changes.json修改的辅助函数
-def apply_changes_to_data(original_data, changes):
-    """递归应用修改到数据 - 适配新的修改记录结构（包含id）"""
-
-    print(f"应用用户自定义json修改: {type(original_data)}")
-
-    if isinstance(original_data, dict) and isinstance(changes, dict):
-        result = {}
-        for key, value in original_data.items():
-            if key in changes:
-                # 如果changes中有对应的键，应用修改
-                if isinstance(value, (dict, list)) and isinstance(changes[key], (dict, list)):
-                    result[key] = apply_changes_to_data(value, changes[key])
-                else:
-                    result[key] = changes[key]
-            else:
-                result[key] = value
-        return result
-    elif isinstance(original_data, list) and isinstance(changes, list):
-        result = []
-        
-        # 检查是否是包含id的字典列表的特殊修改记录
-        if (len(original_data) > 0 and isinstance(original_data[0], dict) and 
-            'id' in original_data[0] and len(changes) > 0 and 
-            isinstance(changes[0], dict) and 'id' in changes[0]):
-            
-            # 对于包含id的字典列表，根据id进行匹配修改
-            original_dict = {item['id']: item for item in original_data if 'id' in item}
-            
-            for change_item in changes:
-                if isinstance(change_item, dict) and 'id' in change_item:
-                    change_id = change_item['id']
-                    
-                    if change_id in original_dict:
-                        # 找到对应的原始项
-                        original_item = original_dict[change_id]
-                        
-                        if 'action' in change_item:
-                            # 处理特殊操作
-                            if change_item['action'] == 'deleted':
-                                # 删除项，不添加到结果中
-                                continue
-                            elif change_item['action'] == 'added':
-                                # 新增项，直接添加到结果中
-                                result.append(change_item.get('changes', change_item))
-                                continue
-                        
-                        # 应用修改
-                        if 'changes' in change_item:
-                            # 有具体的修改内容
-                            modified_item = apply_changes_to_data(original_item, change_item['changes'])
-                            result.append(modified_item)
-                        else:
-                            # 没有具体修改内容，使用原始项
-                            result.append(original_item)
-                    else:
-                        # 新增项（id不在原始数据中）
-                        if 'action' in change_item and change_item['action'] == 'added':
-                            result.append(change_item.get('changes', change_item))
-                        else:
-                            # 未知情况，保留原始项
-                            result.append(original_dict.get(change_id, change_item))
-            
-            # 添加未被修改的原始项
-            for original_item in original_data:
-                if isinstance(original_item, dict) and 'id' in original_item:
-                    original_id = original_item['id']
-                    if original_id not in [item['id'] for item in changes if isinstance(item, dict) and 'id' in item]:
-                        result.append(original_item)
-                else:
-                    # 对于不包含id的项，直接添加
-                    result.append(original_item)
-            
-            return result
-        else:
-            # 对于普通的列表，使用原来的逻辑
-            for i, item in enumerate(original_data):
-                if i < len(changes):
-                    if isinstance(item, (dict, list)) and isinstance(changes[i], (dict, list)):
-                        result.append(apply_changes_to_data(item, changes[i]))
-                    else:
-                        result.append(changes[i])
-                else:
-                    result.append(item)
-            return result
-    else:
-        return original_data
-
 def main():
     """主函数"""
     global root
 
+    profiler = get_startup_profiler()
+
     # 创建主窗口
-    root = tk.Tk()
-    root.withdraw()  # 先隐藏主窗口
+    with profile_step('tk.Tk'):
+        root = tk.Tk()
+        root.withdraw()  # 先隐藏主窗口
 
     # 创建启动画面
-    splash, splash_root = create_simple_splash(root)
+    with profile_step('create_simple_splash'):
+        splash, splash_root = create_simple_splash(root)
 
     
     # 定义应用程序初始化完成回调
     def on_app_initialized():
-        """应用程序初始化完成后的回调"""
-        # 确保主窗口已经完全显示
-        root.update_idletasks()
-        root.update()
-        
-        # 等待一小段时间确保界面完全渲染
-        root.after(3000, lambda: root.deiconify())
+        """关键启动任务完成后的回调, 立即显示主窗口"""
+        root.deiconify()
+        if profiler:
+            # 绘制完主窗口后记录首次绘制时间
+            root.update_idletasks()
+            profiler.mark('first_paint')
+        splash.finish()
 
         ws_path = settings_manager.get_setting("welcome_sound")
-        root.after(3000, lambda: play_sound(ws_path))
+        play_sound(ws_path)
 
         # 检查设置
-        root.after(3300, app.check_settings)
-
-    # 创建应用程序实例，传入初始化完成回调
-    app = FaustLauncherApp(root, on_initialized=on_app_initialized)
+        root.after(300, app.check_settings)
+
+    # 创建应用程序实例，传入初始化完成回调, 启动进度显示在启动画面上
+    with profile_step('FaustLauncherApp.__init__'):
+        app = FaustLauncherApp(root, on_initialized=on_app_initialized, splash=splash)
+
+    if profiler:
+        def save_startup_profile():
+            """启动任务全部完成后保存性能报告"""
+            profiler.mark('startup_complete')
+            profiler.record_tasks(app.startup)
+            profiler.uninstall()
+            profiler.save()
+        app.startup.on_complete = save_startup_profile
     
     # 启动主循环
     root.mainloop()
 
 if __name__ == "__main__":
+    # 打包后使用多进程构建汉化时需要
+    import multiprocessing
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -0,0 +1,135 @@
+"""
+下载次数写回的测试, 使用本地的笔记接口替身, 不访问网络
+
+    python -m unittest tests.test_web_trigger
+"""
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+from functions.base import web_trigger
+from functions.webFunc import Webnote
+
+
+class FakeNoteServer:
+    """
+    笔记接口替身: /info 返回内容与 note_token, /save 校验 note_token 后保存并更换 note_token
+    reject_saves: 接下来拒绝的保存次数(返回 status 0, 模拟其他人先写入)
+    drop_saves: 接下来保存成功但不返回响应就断开连接的次数
+    """
+
+    def __init__(self, items):
+        pages = [{'content': json.dumps({'total_page': 1})}, {'content': json.dumps(items)}]
+        self.content = json.dumps(pages)
+        self.token = 0
+        self.saves = 0
+        self.reject_saves = 0
+        self.drop_saves = 0
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def reply(self, data):
+                body = json.dumps(data).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                form = {k: v[0] for k, v in parse_qs(self.rfile.read(length).decode()).items()}
+                with server.lock:
+                    if self.path.endswith('/info'):
+                        self.reply({'status': 1, 'data': server.note_data()})
+                        return
+                    if server.reject_saves or form.get('note_token') != str(server.token):
+                        server.reject_saves = max(0, server.reject_saves - 1)
+                        server.token += 1
+                        self.reply({'status': 0})
+                        return
+                    server.content = form['note_content']
+                    server.token += 1
+                    server.saves += 1
+                    if server.drop_saves:
+                        server.drop_saves -= 1
+                        self.close_connection = True
+                        self.connection.close()
+                        return
+                    self.reply({'status': 1})
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def note_data(self):
+        return {
+            'created_time': '', 'expire_time': 0, 'last_read_time': '', 'log_list': [],
+            'note_content': self.content, 'note_id': '1', 'note_token': str(self.token),
+            'read_count': 0, 'updated_time': str(self.token)
+        }
+
+    def counts(self):
+        items = json.loads(json.loads(self.content)[1]['content'])
+        return {item['name']: item.get('download_count', 0) for item in items}
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class DownloadCountTest(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeNoteServer([{'name': 'a', 'download_count': 10}, {'name': 'b'}]).__enter__()
+        self.api_url = Webnote.API_URL
+        Webnote.API_URL = f"http://127.0.0.1:{self.server.httpd.server_address[1]}/netcut/note"
+        self.trigger = web_trigger.WebTrigger()
+
+    def tearDown(self):
+        for timer in self.trigger.flush_timers.values():
+            if timer:
+                timer.cancel()
+        Webnote.API_URL = self.api_url
+        self.server.__exit__()
+
+    def test_counts_coalesced_into_one_save(self):
+        for name in ('a', 'a', 'b', 'a', 'b'):
+            self.trigger.add_download_nummber_mod(name)
+        self.assertTrue(self.trigger.flush_download_counts('mod'))
+        self.assertEqual(self.server.saves, 1)
+        self.assertEqual(self.server.counts(), {'a': 13, 'b': 2})
+
+    def test_rejected_save_is_retried(self):
+        self.server.reject_saves = 1
+        self.trigger.add_download_nummber_mod('a')
+        self.assertTrue(self.trigger.flush_download_counts('mod'))
+        self.assertEqual(self.server.counts()['a'], 11)
+
+    def test_ambiguous_save_is_not_repeated(self):
+        # 保存已生效但响应丢失, 重试会重复计数
+        self.server.drop_saves = 1
+        self.trigger.add_download_nummber_mod('a')
+        self.assertFalse(self.trigger.flush_download_counts('mod'))
+        self.assertEqual(self.trigger.pending_counts['mod'], {})
+        self.assertTrue(self.trigger.flush_download_counts('mod'))
+        self.assertEqual(self.server.saves, 1)
+        self.assertEqual(self.server.counts()['a'], 11)
+
+    def test_pending_counts_flushed_before_exit(self):
+        # 托盘退出使用 os._exit, 不会等待写回定时器或 atexit
+        self.trigger.add_download_nummber_mod('b')
+        web_trigger.flush_pending_download_counts()
+        self.assertEqual(self.server.counts()['b'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()